@@ -31,9 +31,13 @@ def init_session_state():
 
 @st.cache_resource
 def startup_sync():
+    # 실거래 적재는 백그라운드 작업으로 실행하고 기존 DB로 즉시 서비스 (v5.1)
     try:
-        from services.csv_processor import process_csv_files
-        process_csv_files()
+        from services.ingest_job import ingest_job
+        from services.inbox_watcher import inbox_watcher
+        ingest_job.start(trigger="startup")
+        # 수신 폴더(data/inbox)에 떨군 국토부 파일은 감시자가 자동 적재 후 보관 폴더로 이동
+        inbox_watcher.start()
     except Exception as e:
         print(f"Startup Sync Error: {e}")
 
@@ -3,6 +3,61 @@ import pandas as pd
 import numpy as np
 import time
 
+def render_ingest_job():
+    """실거래 적재 백그라운드 작업 상태 표시 및 재실행 (UI를 잠그지 않음)"""
+    from services.ingest_job import ingest_job, STAGE_LABELS
+    job = ingest_job.status()
+    status = job["status"]
+
+    if status == "running":
+        stage = STAGE_LABELS.get(job["stage"], job["stage"])
+        ratio = job["done"] / job["total"] if job["total"] else 0.0
+        label = f"⏳ {stage} {job['done']}/{job['total']}"
+        if job["current_file"]:
+            label += f" · {job['current_file']}"
+        st.progress(min(ratio, 1.0), text=label)
+        st.caption(f"시작: {job['started_at']} ({job['trigger']})")
+        if st.button("↻ 진행 상태 새로고침", use_container_width=True):
+            st.rerun()
+    elif status == "error":
+        st.error(f"❌ 동기화 오류: {job['error']}")
+    elif status == "done":
+        st.success(f"✅ 실거래 데이터 동기화 완료 ({job['finished_at']})")
+
+    summary = job["summary"]
+    if summary and status != "running":
+        st.caption(f"최근 적재: 신규 파일 {summary.get('ingested', 0)} / 건너뜀 {summary.get('skipped', 0)} · "
+                   f"매매 {summary.get('sale_rows', 0):,}건 · 전월세 {summary.get('lease_rows', 0):,}건 · "
+                   f"격리 {sum(summary.get('quarantined', {}).values()):,}건 · {summary.get('elapsed_sec', 0)}초")
+        for err in summary.get("errors", []):
+            st.caption(f"⚠️ {err}")
+
+    from services.inbox_watcher import inbox_watcher
+    waiting = inbox_watcher.pending_files()
+    st.caption(f"📂 수신 폴더 {'감시 중' if inbox_watcher.is_running() else '중지'}: "
+               f"{inbox_watcher.inbox_dir.name}/ 대기 {len(waiting)}건 (최근 확인 {inbox_watcher.last_poll or '-'})")
+
+    from services.db_svc import db_svc
+    pool = db_svc.connection_stats()
+    st.caption(f"🗄️ DB 연결 풀: 연결 {pool['opened']}회 열림 / 재사용 {pool['reused']:,}회 · "
+               f"쿼리 {pool['queries']:,}건 · 누적 {pool['total_ms']:,}ms (평균 {pool['avg_ms'] or 0}ms)")
+    from services.stats_svc import stats_svc
+    cache = stats_svc.cache_stats()
+    st.caption(f"⚡ 단지 통계 캐시: 적중 {cache['hits']:,} / 미스 {cache['misses']:,} "
+               f"(적중률 {(cache['hit_rate'] or 0) * 100:.0f}%) · {cache['size']:,}/{cache['maxsize']:,}건 · "
+               f"퇴출 {cache['evictions']:,} · 세대 무효화 {cache['invalidations']:,}")
+    from services.comps_store import comps_store
+    comps = comps_store.info()
+    if comps["loaded"]:
+        st.caption(f"🧮 비교사례 메모리: {comps['rows']:,}건 / {comps['complexes']:,}개 단지 · {comps['mb']}MB "
+                   f"(세대 {comps['generation']}, {comps['loaded_at']} 적재)")
+
+    if st.button("🔄 실거래 데이터 실시간 동기화", use_container_width=True, type="secondary",
+                 disabled=status == "running"):
+        if ingest_job.start(trigger="admin"):
+            st.toast("📊 백그라운드 동기화를 시작했습니다.", icon="🔄")
+        st.rerun()
+
 def render(properties: dict = {}):
     # 0. Session State Safety Initialization (v4.30)
     if "redirect_to" not in st.session_state: st.session_state["redirect_to"] = None
@@ -54,18 +109,11 @@ def render(properties: dict = {}):
 
         # 3. MOLIT Transaction Data CSV (New v4.30)
         try:
-            import os
-            import json
-            from pathlib import Path
-            data_dir = Path("data")
-            all_transactions = []
-            for f in os.listdir(data_dir):
-                if f.endswith(".json") and "실거래가" in f:
-                    with open(data_dir / f, "r", encoding="utf-8") as jf:
-                        all_transactions.extend(json.load(jf))
+            # 컬럼형 캐시(Arrow IPC, memory-map)에서 로드 (v5.1)
+            from services.columnar_cache import load_all_snapshots
+            df_molit = load_all_snapshots()
             
-            if all_transactions:
-                df_molit = pd.DataFrame(all_transactions)
+            if not df_molit.empty:
                 csv_molit = df_molit.to_csv(index=False).encode('utf-8-sig')
                 st.download_button(
                     label="📊 MOLIT 실거래 종합 다운로드",
@@ -77,19 +125,9 @@ def render(properties: dict = {}):
         except:
             pass
 
-        # 4. Sync Database (New v4.30 Accurate Mode)
+        # 4. Sync Database (v5.1 백그라운드 작업)
         st.markdown("---")
-        if st.button("🔄 실거래 데이터 실시간 동기화", use_container_width=True, type="secondary"):
-            with st.spinner("📊 CSV 데이터를 분석하여 DB에 적재 중..."):
-                try:
-                    from services.csv_processor import process_csv_files
-                    process_csv_files()
-                    st.success("✅ 실거래 데이터 동기화 완료!")
-                    st.balloons()
-                    time.sleep(1)
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"❌ 동기화 오류: {str(e)}")
+        render_ingest_job()
 
         st.markdown("---")
         st.info("💡 **Tip**: 아래 표 우측 상단의 아이콘을 클릭하여 직접 CSV로 저장할 수도 있습니다.")
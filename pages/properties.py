@@ -14,6 +14,14 @@ def render(properties: dict):
 
     st.markdown("---")
 
+    # 페이지에 보일 매물 전체의 점수를 한 번에 계산 (실거래 통계 조회 1회, v5.1)
+    shown = []
+    for complex_name, items in properties.items():
+        for item in items[:3]:
+            item["district"] = complex_name.split(" ")[0]
+            shown.append(item)
+    scores = iter(local_market_svc.calculate_decision_scores(shown))
+
     for complex_name, items in properties.items():
         st.markdown(f"""
             <div style="background:rgba(212, 175, 55, 0.1); border-left:5px solid #d4af37; padding:10px 20px; border-radius:4px; margin:30px 0 20px 0;">
@@ -24,9 +32,8 @@ def render(properties: dict):
         cols = st.columns(3)
         for i, item in enumerate(items[:3]):
             with cols[i]:
-                # Calculate Decision Score & Risks
-                item["district"] = complex_name.split(" ")[0]
-                score_data = local_market_svc.calculate_decision_score(item["id"], item)
+                # Decision Score (일괄 계산 결과를 순서대로 사용) & Risks
+                score_data = next(scores)
                 score = score_data["score"]
                 risks = local_market_svc.get_risk_status(item["district"])
                 
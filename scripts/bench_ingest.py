@@ -0,0 +1,231 @@
+"""
+실거래 적재 파이프라인 벤치마크 (v5.1)
+합성 국토부 파일(scripts/molit_synth.py)을 규모별로 생성하고, 규모마다 새 프로세스 + 빈 DB에서
+process_csv_files -> build_db_stats / build_lease_stats 전체 재빌드 -> stats_svc 조회를 순서대로 측정.
+단계별 소요 시간, rows/sec, 누적 최대 RSS를 기록하여 어느 규모에서 병목이 생기는지 확인
+
+사용 예:
+    python scripts/bench_ingest.py --sizes 10k,1m --formats csv,xlsx --workers 1,4
+결과: data/bench/bench_YYYYmmdd_HHMMSS.json (+ 표 출력)
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(BASE_DIR, "data", "bench")
+QUERY_SAMPLES = 200
+
+def peak_rss_mb():
+    """
+    현재 프로세스 + 종료된 자식 프로세스(병렬 워커) 중 최대 RSS (MB)
+    resource가 없는 Windows는 psutil의 현재 프로세스 최대 작업 집합(peak_wset), 둘 다 없으면 None
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / 1024 / 1024, 1)
+    scale = 1 / 1024 / 1024 if sys.platform == "darwin" else 1 / 1024  # macOS는 bytes, Linux는 KB
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(max(self_rss, child_rss), 1)
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, fn, rows=None):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        self.stages[name] = {
+            "sec": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 1) if rows and elapsed > 0 else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        return result
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))] if values else None
+
+def run_one(files, rows, workers, json_files=()):
+    """
+    [자식 프로세스] MARKET_DB_PATH가 가리키는 빈 DB에 대해 단계별 측정 후 결과 dict 반환
+    (DB 초기화가 import 시점에 일어나므로 환경변수는 부모가 설정)
+    """
+    sys.path.insert(0, BASE_DIR)
+    timer = StageTimer()
+    db_svc = timer.run("db_init", lambda: __import__("services.db_svc", fromlist=["db_svc"]).db_svc)
+    from services.csv_processor import process_csv_files, build_db_stats, build_lease_stats, build_monthly_stats
+    from services.stats_svc import stats_svc
+
+    summary = timer.run("ingest", lambda: process_csv_files(files=files, workers=workers), rows=rows)
+    with db_svc.write_snapshot() as conn:
+        timer.run("rt_stats_full", lambda: build_db_stats(conn), rows=summary["sale_rows"])
+        timer.run("lease_stats_full", lambda: build_lease_stats(conn), rows=summary["lease_rows"])
+        timer.run("monthly_stats_full", lambda: build_monthly_stats(conn, db_path=db_svc.db_path), rows=summary["sale_rows"])
+        from services.decay_stats import build_decay_stats
+        timer.run("decay_stats_full", lambda: build_decay_stats(conn, db_path=db_svc.db_path), rows=summary["sale_rows"])
+    conn = db_svc.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM transactions")
+        tx_rows = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT m.complex_name FROM complex_master m
+            WHERE EXISTS (SELECT 1 FROM rt_stats s WHERE s.complex_id = m.complex_id)
+            ORDER BY random() LIMIT ?
+        """, (QUERY_SAMPLES,))
+        names = [r[0] for r in cursor.fetchall()]
+    finally:
+        conn.close()
+
+    # 조회 지연 (단지명 -> rt_stats), 건별 ms 분포
+    latencies = []
+    def _queries():
+        for name in names:
+            t0 = time.perf_counter()
+            stats_svc.get_complex_stats(name)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    timer.run("complex_stats_queries", _queries, rows=len(names))
+    timer.run("lease_ratio_queries", lambda: [stats_svc.get_lease_ratios(n) for n in names], rows=len(names))
+    timer.run("decayed_level_queries", lambda: stats_svc.get_decayed_levels_many([(n, None) for n in names]), rows=len(names))
+
+    # 분석 집계: SQLite+pandas 경로 vs DuckDB(Parquet 사본) 경로, 전체/필터 조회
+    from services.analytics_svc import AnalyticsService
+    engines = {"sqlite": AnalyticsService(engine="sqlite"), "duckdb": AnalyticsService(engine="auto")}
+    if engines["duckdb"].engine == "duckdb":
+        timer.run("analytics_export", engines["duckdb"].export_snapshot, rows=tx_rows)
+    else:
+        engines.pop("duckdb")
+    # 월별 트렌드 (monthly_stats 합산): 전체 / 단지 1곳
+    timer.run("market_trends", stats_svc.get_market_trends, rows=tx_rows)
+    timer.run("market_trends_complex", lambda: [stats_svc.get_market_trends(complex_name=n) for n in names],
+              rows=len(names))
+    conn = db_svc.get_connection()
+    try:
+        row = conn.execute("SELECT dong FROM complex_master WHERE dong IS NOT NULL GROUP BY dong "
+                           "ORDER BY COUNT(*) DESC LIMIT 1").fetchone()
+        dong = row[0] if row else None
+    finally:
+        conn.close()
+    for label, analytics in engines.items():
+        timer.run(f"{label}_trends", analytics.trends, rows=tx_rows)
+        timer.run(f"{label}_trends_filtered", lambda: analytics.trends(dong=dong, area_min=60, area_max=85), rows=tx_rows)
+        timer.run(f"{label}_percentiles", lambda: analytics.percentiles(group_by="dong"), rows=tx_rows)
+        timer.run(f"{label}_cohorts", lambda: analytics.cohort_trends(cohort="area_band"), rows=tx_rows)
+
+    if json_files:
+        from services import columnar_cache
+        if columnar_cache.HAS_PYARROW:
+            timer.run("json_to_arrow", lambda: [columnar_cache.convert_snapshot(p) for p in json_files], rows=rows)
+            timer.run("arrow_load", lambda: [columnar_cache.load_snapshot(p) for p in json_files], rows=rows)
+
+    return {
+        "stages": timer.stages,
+        "query_ms": {"p50": round(_percentile(latencies, 0.5) or 0, 3),
+                     "p95": round(_percentile(latencies, 0.95) or 0, 3), "samples": len(latencies)},
+        "summary": {k: summary.get(k) for k in ("ingested", "total_rows", "sale_rows", "lease_rows",
+                                               "duplicate_rows", "quarantined", "errors")},
+        "db_mb": round(os.path.getsize(db_svc.db_path) / 1e6, 1),
+        "db_pool": db_svc.connection_stats(),
+    }
+
+def bench_case(size, fmt, workers, keep=False, bad_ratio=0.002, seed=42):
+    """규모/형식/워커 수 하나를 임시 디렉터리에서 측정 (생성 시간 포함)"""
+    sys.path.insert(0, BASE_DIR)
+    from scripts.molit_synth import generate, parse_rows
+
+    rows = parse_rows(size)
+    work = tempfile.mkdtemp(prefix=f"bench_{size}_{fmt}_")
+    try:
+        t0 = time.perf_counter()
+        files = generate(os.path.join(work, "in"), rows, fmt, bad_ratio=bad_ratio, seed=seed)
+        gen_sec = time.perf_counter() - t0
+        ingest_files = [p for p in files if not p.endswith(".json")]
+        json_files = [p for p in files if p.endswith(".json")]
+
+        env = dict(os.environ, MARKET_DB_PATH=os.path.join(work, "market_data.db"),
+                   MOLIT_CACHE_DIR=os.path.join(work, "columnar"), PYTHONWARNINGS="ignore")
+        payload = json.dumps({"files": ingest_files, "json_files": json_files,
+                              "rows": rows * 2, "workers": workers})
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-one", payload],
+                              env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {"size": size, "format": fmt, "workers": workers, "error": proc.stderr.strip()[-2000:]}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result.update({"size": size, "rows": rows * 2, "format": fmt, "workers": workers,
+                       "generate_sec": round(gen_sec, 3),
+                       "input_mb": round(sum(os.path.getsize(p) for p in files) / 1e6, 1)})
+        return result
+    finally:
+        if not keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+def print_table(results):
+    print(f"{'size':>6} {'fmt':>5} {'w':>2} {'ingest s':>9} {'rows/s':>9} {'rt_stats s':>10} "
+          f"{'q p50 ms':>9} {'q p95 ms':>9} {'peak MB':>8}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['size']:>6} {r['format']:>5} {r['workers']:>2}  ERROR: {r['error'].splitlines()[-1]}")
+            continue
+        st = r["stages"]
+        peaks = [s["peak_rss_mb"] for s in st.values() if s["peak_rss_mb"] is not None]
+        peak = max(peaks) if peaks else "-"
+        print(f"{r['size']:>6} {r['format']:>5} {r['workers']:>2} {st['ingest']['sec']:>9} "
+              f"{st['ingest']['rows_per_sec']:>9} {st['rt_stats_full']['sec']:>10} "
+              f"{r['query_ms']['p50']:>9} {r['query_ms']['p95']:>9} {peak:>8}")
+
+def print_analytics_table(results):
+    """분석 집계 단계별 소요 시간 (엔진별 비교)"""
+    queries = ["trends", "trends_filtered", "percentiles", "cohorts"]
+    print(f"\n{'size':>6} {'engine':>7} " + " ".join(f"{q + ' ms':>18}" for q in queries))
+    for r in results:
+        st = r.get("stages", {})
+        for engine in ("sqlite", "duckdb"):
+            if f"{engine}_trends" in st:
+                cells = " ".join(f"{st[f'{engine}_{q}']['sec'] * 1000:>18.1f}" for q in queries)
+                print(f"{r['size']:>6} {engine:>7} {cells}")
+        if "analytics_export" in st:
+            print(f"{r['size']:>6} {'export':>7} {st['analytics_export']['sec'] * 1000:>18.1f}  (세대당 1회 Parquet 내보내기)")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--run-one":
+        args = json.loads(sys.argv[2])
+        print(json.dumps(run_one(args["files"], args["rows"], args["workers"], args["json_files"]), ensure_ascii=False))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="실거래 적재/통계/조회 벤치마크")
+    parser.add_argument("--sizes", default="10k", help="종류별 행 수 목록 (예: 10k,1m,10m)")
+    parser.add_argument("--formats", default="csv", help="csv,xlsx,json 중 선택 (json은 Arrow 캐시 변환 측정)")
+    parser.add_argument("--workers", default="1", help="적재 워커 수 목록 (예: 1,4)")
+    parser.add_argument("--bad-ratio", type=float, default=0.002)
+    parser.add_argument("--keep", action="store_true", help="생성 파일/DB를 지우지 않음")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes.split(","):
+        for fmt in args.formats.split(","):
+            for w in [int(x) for x in args.workers.split(",")]:
+                print(f"▶ {size} / {fmt} / workers={w} ...", flush=True)
+                results.append(bench_case(size, fmt, w, keep=args.keep, bad_ratio=args.bad_ratio))
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    out = os.path.join(BENCH_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out, "w", encoding="utf-8") as jf:
+        json.dump(results, jf, ensure_ascii=False, indent=2)
+    print_table(results)
+    print_analytics_table(results)
+    print(f"결과 저장: {out}")
@@ -0,0 +1,334 @@
+"""
+국토부 실거래가 공개시스템 양식의 합성 데이터 생성기 (v5.1 벤치마크용)
+- 매매/전월세 CSV(cp949, 안내문 머리말 포함) / XLSX / JSON 스냅샷
+- 서울 25개 구 다수 단지, 면적 구성·층·기간 추세·직거래 할인·해제 거래 반영
+- bad_ratio 비율로 깨진 행(누락 날짜, 문자 면적, 비공개 금액, 잘린 행 등) 삽입
+
+사용 예:
+    python scripts/molit_synth.py --rows 1m --format csv --out /tmp/molit
+"""
+import argparse
+import io
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+SALE_HEADER = ["NO", "시군구", "번지", "본번", "부번", "단지명", "전용면적(㎡)", "계약년월", "계약일", "거래금액(만원)",
+               "동", "층", "매수자", "매도자", "건축년도", "도로명", "해제사유발생일", "거래유형", "중개사소재지", "등기일자"]
+LEASE_HEADER = ["NO", "시군구", "번지", "본번", "부번", "단지명", "전월세구분", "전용면적(㎡)", "계약년월", "계약일",
+                "보증금(만원)", "월세금(만원)", "층", "건축년도", "도로명", "계약기간", "계약구분", "갱신요구권 사용",
+                "종전계약 보증금(만원)", "종전계약 월세(만원)"]
+
+# 구별 ㎡당 매매가 기준(만원)과 대표 법정동
+GU_TABLE = [
+    ("강남구", 2600, ["대치동", "개포동", "도곡동", "압구정동", "역삼동", "삼성동", "일원동"]),
+    ("서초구", 2500, ["반포동", "잠원동", "서초동", "방배동"]),
+    ("송파구", 1900, ["잠실동", "신천동", "가락동", "문정동", "오금동"]),
+    ("용산구", 2000, ["이촌동", "한남동", "도원동"]),
+    ("성동구", 1600, ["옥수동", "금호동4가", "행당동", "성수동1가"]),
+    ("마포구", 1500, ["아현동", "공덕동", "상암동", "도화동"]),
+    ("양천구", 1500, ["목동", "신정동"]),
+    ("영등포구", 1300, ["여의도동", "당산동5가", "신길동"]),
+    ("광진구", 1300, ["자양동", "광장동", "구의동"]),
+    ("동작구", 1300, ["흑석동", "사당동", "상도동"]),
+    ("강동구", 1300, ["고덕동", "명일동", "암사동", "둔촌동"]),
+    ("종로구", 1200, ["평창동", "무악동"]),
+    ("중구", 1200, ["신당동", "만리동2가"]),
+    ("서대문구", 1000, ["북아현동", "홍제동", "남가좌동"]),
+    ("동대문구", 950, ["전농동", "답십리동", "이문동"]),
+    ("성북구", 900, ["길음동", "돈암동", "정릉동"]),
+    ("강서구", 950, ["마곡동", "가양동", "등촌동"]),
+    ("은평구", 850, ["응암동", "불광동", "진관동"]),
+    ("관악구", 850, ["봉천동", "신림동"]),
+    ("구로구", 850, ["신도림동", "구로동", "개봉동"]),
+    ("금천구", 700, ["독산동", "시흥동"]),
+    ("노원구", 750, ["상계동", "중계동", "하계동"]),
+    ("도봉구", 650, ["창동", "방학동", "쌍문동"]),
+    ("강북구", 650, ["미아동", "번동"]),
+    ("중랑구", 700, ["면목동", "신내동", "묵동"]),
+]
+BRANDS = ["래미안", "힐스테이트", "자이", "푸르지오", "아이파크", "e편한세상", "롯데캐슬", "더샵", "SK뷰",
+          "우성", "현대", "삼성", "한신", "쌍용", "신동아", "두산위브", "센트레빌", "한양", "미성", "선경"]
+# 합성 단지명 접두어: 실제 단지명("대치래미안" 등)과 별칭/부분 일치로 섞이지 않도록 표시
+SYNTH_NAME_PREFIX = "합성"
+AREA_MENU = np.array([39.95, 49.94, 59.96, 76.79, 84.97, 101.93, 114.86, 134.95, 164.97, 198.32])
+ROADS = ["로", "대로", "길"]
+
+PREAMBLE = [
+    "□ 본 서비스에서 제공하는 정보는 법적인 효력이 없으므로 참고용으로만 활용하시기 바랍니다.",
+    "□ 신고정보가 실시간 변경, 해제되어 제공시점에 따라 공개건수 및 내용이 상이할 수 있는 점 참고하시기 바랍니다.",
+    "□ 본 자료는 계약일 기준입니다. (※ 7월 계약, 8월 신고건 → 7월 거래건으로  제공)",
+    "□ 통계자료 활용시에는 수치가 왜곡될 수 있으니 참고자료로만 활용하시기  바라며,  외부 공개시에는 반드시 신고일 기준으로 집계되는 공식통계를 이용하여 주시기 바랍니다.",
+    "",
+    "* 국토교통부 실거래가 공개시스템의 궁금하신 점이나 문의사항은 콜센터 1533-2949로 연락 주시기 바랍니다.",
+    "□ 검색조건",
+    "계약일자 : {start} ~ {end}",
+    "실거래구분 : 아파트({kind})",
+    "주소구분 : 지번주소",
+    "시도 : 서울특별시",
+    "시군구 : 전체",
+    "읍면동 : 전체",
+    "면적 : 전체",
+    "금액선택 : 전체",
+]
+
+XLSX_MAX_ROWS = 1_000_000  # 엑셀 시트 한도(1,048,576행) 아래로 파일 분할
+CHUNK = 200_000
+
+def parse_rows(text) -> int:
+    """'10k', '1m', '10m', '25000' -> 행 수"""
+    text = str(text).strip().lower().replace("_", "")
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+def make_complexes(n, rng) -> pd.DataFrame:
+    """단지 목록 (구/동/이름/지번/건축년도/㎡당 기준가/최고층/면적 구성)"""
+    gu_idx = rng.integers(0, len(GU_TABLE), n)
+    rows = []
+    for i, g in enumerate(gu_idx):
+        gu, base, dongs = GU_TABLE[g]
+        dong = dongs[rng.integers(0, len(dongs))]
+        stem = dong.replace("동", "")[:2]
+        name = f"{SYNTH_NAME_PREFIX}{stem}{BRANDS[rng.integers(0, len(BRANDS))]}"
+        if rng.random() < 0.4:
+            name += f"{rng.integers(1, 9)}차"
+        areas = np.sort(rng.choice(len(AREA_MENU), size=rng.integers(2, 6), replace=False))
+        rows.append({
+            "gu": gu, "dong": dong, "name": f"{name}({i})" if rng.random() < 0.05 else name,
+            "bonbun": int(rng.integers(1, 1500)), "bubun": int(rng.integers(0, 60)) if rng.random() < 0.3 else 0,
+            "built": int(rng.integers(1978, 2024)),
+            "ppsqm": float(base * rng.lognormal(0, 0.25)),
+            "max_floor": int(rng.integers(5, 50)),
+            "areas": AREA_MENU[areas],
+            "road": f"{stem}{ROADS[rng.integers(0, 3)]} {rng.integers(1, 300)}",
+        })
+    df = pd.DataFrame(rows)
+    # 같은 동에 같은 이름이 생기면 차수로 구분
+    dup = df.duplicated(["dong", "name"], keep="first")
+    df.loc[dup, "name"] = df.loc[dup, "name"] + df.index[dup].astype(str) + "단지"
+    return df
+
+def _sample_trades(n, complexes, rng, start, days):
+    """공통 거래 골격 (단지, 계약일, 면적, 층, 시세 기준 ㎡당 가격)"""
+    # 거래가 일부 대단지에 몰리는 분포 (Zipf 가중)
+    weights = 1.0 / np.arange(1, len(complexes) + 1) ** 0.8
+    c_idx = rng.choice(len(complexes), size=n, p=weights / weights.sum())
+    c = complexes.iloc[c_idx].reset_index(drop=True)
+    offset = rng.integers(0, days, n)
+    t_date = pd.to_datetime(start) + pd.to_timedelta(offset, unit="D")
+    area_choice = [a[rng.integers(0, len(a))] for a in c["areas"]]
+    area = np.round(np.array(area_choice) + rng.normal(0, 0.05, n), 2)
+    floor = np.maximum(1, (rng.random(n) * c["max_floor"].to_numpy()).astype(int) + 1)
+    # 연 6% 상승 추세 + 고층 프리미엄 + 개별 잡음
+    trend = 1 + 0.06 * offset / 365
+    ppsqm = c["ppsqm"].to_numpy() * trend * (1 + 0.004 * floor) * rng.lognormal(0, 0.07, n)
+    return c, t_date, area, floor, ppsqm
+
+def _common_columns(c, t_date, area, floor, start_no):
+    n = len(c)
+    return {
+        "NO": np.arange(start_no, start_no + n),
+        "시군구": "서울특별시 " + c["gu"] + " " + c["dong"],
+        "번지": c["bonbun"].astype(str) + np.where(c["bubun"] > 0, "-" + c["bubun"].astype(str), ""),
+        "본번": c["bonbun"].astype(str).str.zfill(4),
+        "부번": c["bubun"].astype(str).str.zfill(4),
+        "단지명": c["name"],
+        "전용면적(㎡)": pd.Series(area).map("{:.4f}".format),
+        "계약년월": t_date.strftime("%Y%m"),
+        "계약일": t_date.strftime("%d"),
+        "층": floor.astype(str),
+        "건축년도": c["built"].astype(str),
+        "도로명": c["road"],
+    }
+
+def _won(x):
+    return pd.Series(np.round(x).astype("int64")).map("{:,}".format)
+
+def sale_chunk(n, complexes, rng, start, days, start_no=1) -> pd.DataFrame:
+    c, t_date, area, floor, ppsqm = _sample_trades(n, complexes, rng, start, days)
+    direct = rng.random(n) < 0.05
+    # 직거래 절반은 특수관계 저가 거래 (시세의 60~85%)
+    discount = np.where(direct & (rng.random(n) < 0.5), rng.uniform(0.6, 0.85, n), 1.0)
+    price = np.round(ppsqm * area * discount / 100) * 100
+    cancelled = rng.random(n) < 0.03
+    cancel_date = (t_date + pd.to_timedelta(rng.integers(5, 60, n), unit="D")).strftime("%Y%m%d")
+    reg_date = (t_date + pd.to_timedelta(rng.integers(30, 90, n), unit="D")).strftime("%y.%m.%d")
+    cols = _common_columns(c, t_date, area, floor, start_no)
+    cols.update({
+        "거래금액(만원)": _won(price),
+        "동": "-",
+        "매수자": np.where(rng.random(n) < 0.9, "개인", "법인"),
+        "매도자": np.where(rng.random(n) < 0.9, "개인", "법인"),
+        "해제사유발생일": np.where(cancelled, cancel_date, "-"),
+        "거래유형": np.where(direct, "직거래", "중개거래"),
+        "중개사소재지": np.where(direct, "-", "서울 " + c["gu"]),
+        "등기일자": np.where(rng.random(n) < 0.6, reg_date, "-"),
+    })
+    return pd.DataFrame(cols)[SALE_HEADER]
+
+def lease_chunk(n, complexes, rng, start, days, start_no=1) -> pd.DataFrame:
+    c, t_date, area, floor, ppsqm = _sample_trades(n, complexes, rng, start, days)
+    jeonse = ppsqm * area * rng.uniform(0.42, 0.62, n)
+    wolse = rng.random(n) < 0.45
+    deposit = np.where(wolse, jeonse * rng.uniform(0.05, 0.5, n), jeonse)
+    rent = np.where(wolse, (jeonse - deposit) * rng.uniform(0.04, 0.055, n) / 12, 0)
+    deposit = np.round(deposit / 100) * 100
+    renewal = rng.random(n) < 0.3
+    end = (t_date + pd.DateOffset(years=2))
+    cols = _common_columns(c, t_date, area, floor, start_no)
+    cols.update({
+        "전월세구분": np.where(wolse, "월세", "전세"),
+        "보증금(만원)": _won(deposit),
+        "월세금(만원)": _won(rent),
+        "계약기간": t_date.strftime("%Y%m") + "~" + end.strftime("%Y%m"),
+        "계약구분": np.where(renewal, "갱신", "신규"),
+        "갱신요구권 사용": np.where(renewal & (rng.random(n) < 0.6), "사용", "-"),
+        "종전계약 보증금(만원)": np.where(renewal, _won(deposit * 0.95), ""),
+        "종전계약 월세(만원)": np.where(renewal, _won(rent * 0.95), ""),
+    })
+    return pd.DataFrame(cols)[LEASE_HEADER]
+
+def corrupt(df, ratio, rng):
+    """
+    ratio 비율의 행을 국토부 원본에서 실제로 보이는 형태로 훼손. 잘라낼 행 번호(set) 반환
+    (누락 계약년월 / 문자 면적 / 비공개 금액 / 잘린 행)
+    """
+    n_bad = int(len(df) * ratio)
+    if n_bad == 0:
+        return set()
+    idx = rng.choice(len(df), size=n_bad, replace=False)
+    kinds = rng.integers(0, 4, n_bad)
+    amount_col = "거래금액(만원)" if "거래금액(만원)" in df else "보증금(만원)"
+    df.iloc[idx[kinds == 0], df.columns.get_loc("계약년월")] = ""
+    df.iloc[idx[kinds == 1], df.columns.get_loc("전용면적(㎡)")] = "-"
+    df.iloc[idx[kinds == 2], df.columns.get_loc(amount_col)] = "비공개"
+    return set(idx[kinds == 3].tolist())
+
+def _chunks(kind, rows, complexes, rng, start, days):
+    make = sale_chunk if kind == "sale" else lease_chunk
+    done = 0
+    while done < rows:
+        n = min(CHUNK, rows - done)
+        yield make(n, complexes, rng, start, days, start_no=done + 1)
+        done += n
+
+def _preamble(kind, start, end):
+    label = "매매" if kind == "sale" else "전월세"
+    return [line.format(start=start, end=end, kind=label) for line in PREAMBLE]
+
+def write_csv(path, kind, rows, complexes, rng, start, days, bad_ratio=0.0, encoding="cp949"):
+    """국토부 CSV 내려받기와 같은 형식 (안내문 머리말 + 전체 따옴표 + cp949)"""
+    end = (pd.to_datetime(start) + pd.Timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    header = SALE_HEADER if kind == "sale" else LEASE_HEADER
+    with open(path, "w", encoding=encoding, errors="replace", newline="") as f:
+        for line in _preamble(kind, start, end):
+            f.write(f'"{line}"\n')
+        f.write(",".join(f'"{h}"' for h in header) + "\n")
+        for df in _chunks(kind, rows, complexes, rng, start, days):
+            truncated = corrupt(df, bad_ratio, rng)
+            buf = io.StringIO()
+            df.to_csv(buf, header=False, index=False, quoting=1, lineterminator="\n")
+            if truncated:
+                lines = buf.getvalue().split("\n")
+                for i in truncated:
+                    lines[i] = lines[i][: len(lines[i]) // 2]
+                f.write("\n".join(lines))
+            else:
+                f.write(buf.getvalue())
+    return [path]
+
+def write_xlsx(path, kind, rows, complexes, rng, start, days, bad_ratio=0.0):
+    """국토부 엑셀 내려받기 형식 (write_only 스트리밍, 시트 한도를 넘으면 _2, _3 파일로 분할)"""
+    from openpyxl import Workbook
+    end = (pd.to_datetime(start) + pd.Timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    header = SALE_HEADER if kind == "sale" else LEASE_HEADER
+    paths, wb, ws, in_sheet = [], None, None, 0
+    stem, ext = os.path.splitext(path)
+
+    def _open():
+        nonlocal wb, ws, in_sheet
+        target = path if not paths else f"{stem}_{len(paths) + 1}{ext}"
+        paths.append(target)
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        for line in _preamble(kind, start, end):
+            ws.append([line])
+        ws.append(header)
+        in_sheet = 0
+
+    _open()
+    for df in _chunks(kind, rows, complexes, rng, start, days):
+        truncated = corrupt(df, bad_ratio, rng)
+        for i, rec in enumerate(df.itertuples(index=False, name=None)):
+            if in_sheet >= XLSX_MAX_ROWS:
+                wb.save(paths[-1])
+                _open()
+            ws.append(rec[: len(rec) // 2] if i in truncated else rec)
+            in_sheet += 1
+    wb.save(paths[-1])
+    return paths
+
+def write_json(path, kind, rows, complexes, rng, start, days, bad_ratio=0.0):
+    """data/*.json 스냅샷과 같은 레코드 배열 (숫자 컬럼은 숫자형, date는 epoch ms)"""
+    numeric = ["NO", "본번", "부번", "건축년도", "계약년월", "계약일"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        first = True
+        for df in _chunks(kind, rows, complexes, rng, start, days):
+            corrupt(df, bad_ratio, rng)
+            out = df.copy()
+            for col in numeric:
+                out[col] = pd.to_numeric(out[col], errors="coerce").astype("Int64")
+            for col in ["전용면적(㎡)", "층", "거래금액(만원)", "보증금(만원)", "월세금(만원)"]:
+                if col in out:
+                    out[col] = pd.to_numeric(out[col].astype(str).str.replace(",", ""), errors="coerce")
+            ym = out["계약년월"].fillna(0).astype(str)
+            t_date = pd.to_datetime(ym + out["계약일"].fillna(1).astype(str).str.zfill(2),
+                                    format="%Y%m%d", errors="coerce")
+            out["date"] = ((t_date - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).astype("Int64")
+            body = out.to_json(orient="records", force_ascii=False)[1:-1]
+            if body:
+                f.write(("" if first else ",") + body)
+                first = False
+        f.write("]")
+    return [path]
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx, "json": write_json}
+
+def generate(out_dir, rows, fmt="csv", kinds=("sale", "lease"), complexes=None, days=730, end=None,
+             bad_ratio=0.002, seed=42):
+    """
+    out_dir에 형식별 합성 파일 생성. rows는 종류(매매/전월세)별 행 수. 생성된 파일 경로 목록 반환
+    파일명은 국토부 내려받기 규칙("아파트(매매)_실거래가_YYYYmmddHHMMSS.csv")을 따름
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    n_complex = complexes or int(np.clip(rows // 150, 50, 20_000))
+    cx = make_complexes(n_complex, rng)
+    end_day = pd.to_datetime(end or date.today())
+    start = (end_day - pd.Timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    paths = []
+    for i, kind in enumerate(kinds):
+        label = "매매" if kind == "sale" else "전월세"
+        stamp = (end_day + pd.Timedelta(seconds=seed * 100 + i)).strftime("%Y%m%d%H%M%S")
+        path = os.path.join(out_dir, f"아파트({label})_실거래가_{stamp}.{fmt}")
+        paths += WRITERS[fmt](path, kind, rows, cx, rng, start, days, bad_ratio)
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="국토부 실거래가 양식 합성 데이터 생성")
+    parser.add_argument("--rows", default="10k", help="종류별 행 수 (10k / 1m / 10m 또는 정수)")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--kinds", default="sale,lease", help="sale,lease 중 선택")
+    parser.add_argument("--complexes", type=int, default=None, help="단지 수 (기본: 행 수/150, 50~20,000)")
+    parser.add_argument("--days", type=int, default=730, help="계약일 분포 기간 (오늘까지)")
+    parser.add_argument("--bad-ratio", type=float, default=0.002, help="깨진 행 비율")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="data/synthetic")
+    args = parser.parse_args()
+    files = generate(args.out, parse_rows(args.rows), args.format, tuple(args.kinds.split(",")),
+                     args.complexes, args.days, bad_ratio=args.bad_ratio, seed=args.seed)
+    for p in files:
+        print(f"{p} ({os.path.getsize(p) / 1e6:.1f} MB)")
@@ -1,53 +1,44 @@
+import argparse
 import os
-import sqlite3
-import datetime
+import sys
+import tempfile
 
 # Robust path resolution (v4.32)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, "data", "market_data.db")
+sys.path.append(BASE_DIR)
 
-def seed_data():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Ensure tables exist (v4.33)
-    cursor.execute("CREATE TABLE IF NOT EXISTS complex_master (complex_id TEXT PRIMARY KEY, name TEXT, district TEXT, standard_name TEXT)")
-    cursor.execute("CREATE TABLE IF NOT EXISTS real_transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, complex_id TEXT, area_sqm REAL, price_won INTEGER, floor INTEGER, deal_date TEXT)")
-    cursor.execute("CREATE TABLE IF NOT EXISTS complex_stats (complex_id TEXT, area_bucket TEXT, rt_median_180d INTEGER, rt_count_180d INTEGER, rt_iqr INTEGER, last_updated TEXT, PRIMARY KEY(complex_id, area_bucket))")
+# 시드 기본 대상: 앱 운영 DB(data/market_data.db)와 분리된 개발용 DB
+PROD_DB_PATH = os.path.join(BASE_DIR, "data", "market_data.db")
+DEV_DB_PATH = os.path.join(BASE_DIR, "data", "dev_market_data.db")
 
-    # 1. 단지 마스터 정보 (표준화)
-    complexes = [
-        ('APT_RDP', '래미안대치팰리스', '대치동', '래미안대치팰리스'),
-        ('APT_SKV', '대치SK뷰', '대치동', '대치SK뷰'),
-        ('APT_ENM', '대치은마', '대치동', '대치은마')
-    ]
-    cursor.executemany("INSERT OR REPLACE INTO complex_master VALUES (?, ?, ?, ?)", complexes)
+def seed_data(rows=2000, seed=7):
+    """
+    개발용 시드 (v5.1): 합성 국토부 매매/전월세 CSV를 만들어 실제 적재 경로(process_csv_files)로 적재
+    대상 DB는 import 전에 MARKET_DB_PATH로 정해져 있어야 함 (__main__이 --target으로 설정).
+    합성 단지명은 molit_synth.SYNTH_NAME_PREFIX로 시작해 실제 단지와 섞이지 않음
+    """
+    from scripts.molit_synth import generate
+    from services.csv_processor import process_csv_files
+    from services.db_svc import db_svc
 
-    # 2. 최근 180일 실거래 샘플 데이터
-    # 래미안대치팰리스 84㎡ (중위가 약 32~34억 형성)
-    today = datetime.date.today()
-    transactions = []
-    
-    # 래미안대치팰리스 샘플 (15건)
-    for i in range(15):
-        date = today - datetime.timedelta(days=i*10)
-        price = 3300000000 + (i % 5) * 50000000 # 33억 ~ 35억 사이
-        transactions.append(('APT_RDP', 84.5, price, 10 + (i % 15), date.isoformat()))
-        
-    # 대치SK뷰 샘플 (10건)
-    for i in range(10):
-        date = today - datetime.timedelta(days=i*15)
-        price = 3100000000 + (i % 3) * 30000000 # 31억 ~ 32억 사이
-        transactions.append(('APT_SKV', 84.2, price, 5 + (i % 20), date.isoformat()))
-
-    cursor.executemany("""
-        INSERT INTO real_transactions (complex_id, area_sqm, price_won, floor, deal_date) 
-        VALUES (?, ?, ?, ?, ?)
-    """, transactions)
-
-    conn.commit()
-    conn.close()
-    print("Seed data inserted successfully.")
+    with tempfile.TemporaryDirectory(prefix="seed_") as work:
+        files = generate(work, rows, "csv", complexes=40, seed=seed)
+        summary = process_csv_files(files=files)
+    print(f"Seed data inserted successfully into {db_svc.db_path}. "
+          f"(매매 {summary['sale_rows']}건 / 전월세 {summary['lease_rows']}건)")
 
 if __name__ == "__main__":
-    seed_data()
+    parser = argparse.ArgumentParser(description="합성 실거래 데이터로 개발용 DB 시드")
+    parser.add_argument("--target", default=os.environ.get("MARKET_DB_PATH") or DEV_DB_PATH,
+                        help=f"시드할 DB 경로 (기본: MARKET_DB_PATH 또는 {DEV_DB_PATH})")
+    parser.add_argument("--force", action="store_true", help="운영 DB(data/market_data.db)에도 시드 허용")
+    parser.add_argument("--rows", type=int, default=2000, help="종류(매매/전월세)별 행 수")
+    args = parser.parse_args()
+
+    target = os.path.abspath(args.target)
+    if os.path.normcase(target) == os.path.normcase(os.path.abspath(PROD_DB_PATH)) and not args.force:
+        # 합성 거래는 운영 통계/점수에 섞인 뒤 깔끔하게 되돌릴 수 없음
+        parser.error(f"refusing to seed the production DB {target} without --force")
+    # db_svc는 import 시점에 경로를 정하므로 서비스 모듈을 불러오기 전에 설정
+    os.environ["MARKET_DB_PATH"] = target
+    seed_data(rows=args.rows)
@@ -1,6 +1,4 @@
 import os
-import sqlite3
-import pandas as pd
 import subprocess
 
 # Robust path resolution (v4.32)
@@ -9,43 +7,21 @@ DB_PATH = os.path.join(BASE_DIR, "data", "market_data.db")
 
 def update_complex_statistics():
     """
-    180일 실거래 데이터를 기반으로 중위값, 표본수, IQR(변동성)을 자동 계산하여 통계 테이블 업데이트
+    실거래 데이터를 기반으로 90/180/365/730일 중위값, 표본수, IQR(변동성)을 자동 계산하여 rt_stats 업데이트
+    (앱이 조회하는 market_data.db transactions 기준, csv_processor의 단일 통계 빌더 사용)
     """
-    conn = sqlite3.connect(DB_PATH)
-    
-    # 최근 180일 거래 데이터 로드
-    query = """
-    SELECT complex_id, area_sqm, price_won, deal_date 
-    FROM real_transactions 
-    WHERE deal_date >= date('now', '-180 days')
-    """
-    df = pd.read_sql_query(query, conn)
-    
-    if df.empty:
+    import sys
+    sys.path.append(BASE_DIR)
+    from services.db_svc import db_svc
+    from services.csv_processor import build_db_stats
+
+    with db_svc.write_snapshot() as conn:
+        updated = build_db_stats(conn)
+
+    if not updated:
         print("No transaction data Found.")
         return
-
-    # 면적별 버킷 생성 (84sqm -> 84버킷)
-    df['area_bucket'] = df['area_sqm'].round().astype(int).astype(str)
-    
-    # 통계 계산
-    stats = df.groupby(['complex_id', 'area_bucket']).agg(
-        rt_median_180d=('price_won', 'median'),
-        rt_count_180d=('price_won', 'count'),
-        rt_iqr=('price_won', lambda x: x.quantile(0.75) - x.quantile(0.25))
-    ).reset_index()
-    
-    # DB 업데이트
-    for _, row in stats.iterrows():
-        conn.execute("""
-            INSERT OR REPLACE INTO complex_stats 
-            (complex_id, area_bucket, rt_median_180d, rt_count_180d, rt_iqr, last_updated)
-            VALUES (?, ?, ?, ?, ?, datetime('now'))
-        """, (row.complex_id, row.area_bucket, int(row.rt_median_180d), int(row.rt_count_180d), int(row.rt_iqr)))
-    
-    conn.commit()
-    conn.close()
-    print("Market Statistics Updated Successfully.")
+    print(f"Market Statistics Updated Successfully. ({updated} rows)")
 
 def synthesize_shorts_ffmpeg(video_path, audio_path, script_lines, output_name):
     """
@@ -0,0 +1,67 @@
+"""
+분석 엔진 일치 검증 (v5.1)
+같은 게시 DB에서 analytics_svc의 SQLite+pandas 경로와 DuckDB 경로가 같은 프레임을 돌려주는지 비교
+(전체 / 동·면적 필터 / 동 안의 단지 / 결과가 없는 필터). duckdb가 없으면 SQLite 경로만 실행해 빈 결과 처리까지 확인
+불일치나 예외가 있으면 종료 코드 1
+
+사용 예:
+    MARKET_DB_PATH=/path/to/m.db python scripts/validate_analytics.py
+"""
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMPTY_DONG = "없는동"
+
+def cases(dong, name):
+    """(이름, 조회 함수 이름, 필터)"""
+    out = []
+    for query in ("trends", "percentiles", "cohort_trends"):
+        out.append((f"{query}", query, {}))
+        if dong:
+            out.append((f"{query}[dong]", query, {"dong": dong, "area_min": 60, "area_max": 85}))
+        if name:
+            out.append((f"{query}[complex]", query, {"complex_name": name, "dong": dong}))
+        out.append((f"{query}[empty]", query, {"dong": EMPTY_DONG}))
+    return out
+
+def run(engine, query, filters):
+    return getattr(engine, query)(**filters)
+
+if __name__ == "__main__":
+    sys.path.insert(0, BASE_DIR)
+    import pandas as pd
+    from services.analytics_svc import AnalyticsService
+    from services.db_svc import db_svc
+
+    conn = db_svc.get_connection()
+    try:
+        row = conn.execute("SELECT dong FROM complex_master WHERE dong IS NOT NULL GROUP BY dong "
+                           "ORDER BY COUNT(*) DESC LIMIT 1").fetchone()
+        dong = row[0] if row else None
+        row = conn.execute("SELECT complex_name FROM complex_master WHERE dong = ? ORDER BY complex_id LIMIT 1",
+                           (dong,)).fetchone()
+        name = row[0] if row else None
+    finally:
+        conn.close()
+    sqlite_engine = AnalyticsService(engine="sqlite")
+    duck_engine = AnalyticsService(engine="auto")
+    if duck_engine.engine != "duckdb":
+        print("  duckdb/pyarrow 없음: SQLite 경로만 검증")
+        duck_engine = None
+
+    failed = 0
+    for label, query, filters in cases(dong, name):
+        try:
+            expected = run(sqlite_engine, query, filters)
+            if duck_engine is not None:
+                # 정렬 순서는 양쪽 모두 그룹 키 기준, 부동소수 합산 순서 차이만 허용
+                pd.testing.assert_frame_equal(expected.reset_index(drop=True),
+                                              run(duck_engine, query, filters).reset_index(drop=True),
+                                              check_dtype=False, rtol=1e-9)
+            print(f"  {label:<24} ok ({len(expected)} rows)")
+        except Exception as e:
+            failed += 1
+            print(f"  {label:<24} FAIL {type(e).__name__}: {e}")
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
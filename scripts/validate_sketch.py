@@ -0,0 +1,103 @@
+"""
+분위수 스케치 정확도 검증 (v5.1)
+1) 합성 표본: 크기/분포별 값을 여러 조각(월)으로 나눠 스케치를 만들고 병합한 분위수를 np.quantile 참값과 비교
+2) 게시 DB: 임의 (단지, 면적 버킷, 기간)의 stats_svc.get_period_quantiles 결과를 원본 거래(hot + cold) 분위수와 비교
+상대 오차가 quantile_sketch.RELATIVE_ACCURACY를 넘거나 건수가 다르면 종료 코드 1
+
+사용 예:
+    python scripts/validate_sketch.py --samples 200
+    MARKET_DB_PATH=/path/to/m.db python scripts/validate_sketch.py --skip-synthetic
+"""
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QS = (0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+def _rel_err(estimates, exact) -> float:
+    return max(abs(e - x) / x for e, x in zip(estimates, exact))
+
+def validate_synthetic(seed=0) -> float:
+    """분포 x 표본 크기 x 조각 수 조합의 최대 상대 오차"""
+    import numpy as np
+    from services.quantile_sketch import QuantileSketch
+    rng = np.random.default_rng(seed)
+    dists = {
+        "lognormal": lambda n: rng.lognormal(21, 0.5, n),
+        "heavy_tail": lambda n: 3e8 * (1 + rng.pareto(1.5, n)),
+        "price_grid": lambda n: np.round(rng.lognormal(21, 0.3, n), -6),  # 백만원 단위 호가 (동일 값 다수)
+    }
+    worst = 0.0
+    for name, draw in dists.items():
+        for n in (1, 2, 3, 5, 10, 100, 1_000, 100_000):
+            for parts in (1, 12, 36):
+                values = draw(n)
+                sketch = QuantileSketch.merge_all(
+                    QuantileSketch.from_bytes(QuantileSketch.from_values(p).to_bytes())
+                    for p in np.array_split(values, parts))
+                err = _rel_err(sketch.quantiles(QS), np.quantile(values, QS))
+                worst = max(worst, err)
+        print(f"  synthetic {name:<10} worst rel err {worst:.5f}")
+    return worst
+
+def validate_db(samples, seed=0):
+    """(최대 상대 오차, 건수 불일치 수, 검증 수)"""
+    import random
+    import numpy as np
+    from services.db_svc import db_svc
+    from services.stats_svc import stats_svc
+    from services.partition_store import read_rows
+    from services.csv_processor import TX_COLUMNS, area_buckets
+
+    conn = db_svc.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT m.complex_name, s.complex_id, s.area_bucket, GROUP_CONCAT(s.month)
+            FROM monthly_stats s JOIN complex_master m ON m.complex_id = s.complex_id
+            WHERE s.area_bucket <> 'ALL' GROUP BY s.complex_id, s.area_bucket
+        """)
+        cells = cursor.fetchall()
+        rng = random.Random(seed)
+        rng.shuffle(cells)
+        worst, mismatched, checked = 0.0, 0, 0
+        for name, c_id, bucket, month_list in cells[:samples]:
+            # 거래가 있는 달 둘을 골라 그 사이 기간 (여러 달 스케치 병합)
+            months = sorted(rng.choices(month_list.split(","), k=2))
+            area = int(bucket.split("±")[0])
+            got = stats_svc.get_period_quantiles(name, area_min=area, area_max=area, start=months[0], end=months[1],
+                                                 q=QS)
+            rows = read_rows(cursor, db_svc.db_path, "transactions", TX_COLUMNS,
+                             f"{months[0]}-01", f"{months[1]}-31", [c_id]).drop_duplicates(TX_COLUMNS)
+            prices = rows.loc[area_buckets(rows["area_sqm"]) == bucket, "price_won"].to_numpy("float64") \
+                if not rows.empty else np.empty(0)
+            checked += 1
+            if got is None or len(prices) == 0:
+                mismatched += (got is None) != (len(prices) == 0)
+                continue
+            mismatched += got["count"] != len(prices)
+            worst = max(worst, _rel_err([got["quantiles"][q] for q in QS], np.quantile(prices, QS)))
+    finally:
+        conn.close()
+    print(f"  db {checked} windows, worst rel err {worst:.5f}, count mismatches {mismatched}")
+    return worst, mismatched, checked
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="분위수 스케치 정확도 검증")
+    parser.add_argument("--samples", type=int, default=200, help="DB에서 검증할 (단지, 버킷, 기간) 수")
+    parser.add_argument("--skip-synthetic", action="store_true")
+    parser.add_argument("--skip-db", action="store_true")
+    args = parser.parse_args()
+    sys.path.insert(0, BASE_DIR)
+    from services.quantile_sketch import RELATIVE_ACCURACY
+
+    failed = False
+    tolerance = RELATIVE_ACCURACY * (1 + 1e-9)
+    if not args.skip_synthetic:
+        failed |= validate_synthetic() > tolerance
+    if not args.skip_db:
+        worst, mismatched, _ = validate_db(args.samples)
+        failed |= worst > tolerance or mismatched > 0
+    print(f"{'FAIL' if failed else 'OK'} (허용 상대 오차 {RELATIVE_ACCURACY})")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,248 @@
+import os
+import threading
+from pathlib import Path
+import pandas as pd
+
+# Try to import duckdb, handle if missing (SQLite + pandas 집계로 Fallback)
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
+from services.columnar_cache import CACHE_DIR, HAS_PYARROW
+
+# 분석 엔진 선택: auto(duckdb 설치 시 사용) / sqlite (환경변수로 강제 가능)
+ANALYTICS_ENGINE = os.environ.get("MOLIT_ANALYTICS_ENGINE", "auto")
+EXPORT_DIR = CACHE_DIR / "analytics"
+DEFAULT_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# 전용면적 규모 구분 (주택 통계 기준: 60㎡ 이하 / 60~85 / 85~135 / 135 초과)
+AREA_BAND_SQL = """CASE WHEN area_sqm <= 60 THEN '60이하'
+                        WHEN area_sqm <= 85 THEN '60~85'
+                        WHEN area_sqm <= 135 THEN '85~135'
+                        ELSE '135초과' END"""
+COHORT_COLUMNS = {"area_band": AREA_BAND_SQL, "dong": "dong", "complex": "complex_name"}
+
+class AnalyticsService:
+    """
+    실거래 추이/분위수/코호트 집계 (v5.1)
+    OLTP 적재는 SQLite 그대로 두고, 집계는 게시 스냅샷 세대별 Parquet 사본을 DuckDB로 조회.
+    duckdb/pyarrow가 없으면 SQLite에서 필터된 행만 읽어 pandas로 같은 결과를 계산
+    """
+    def __init__(self, engine=ANALYTICS_ENGINE):
+        from services.db_svc import db_svc
+        self.db_svc = db_svc
+        self.engine = "duckdb" if engine != "sqlite" and HAS_DUCKDB and HAS_PYARROW else "sqlite"
+        self._lock = threading.Lock()
+        self._duck = None
+        self._duck_generation = None
+
+    # --- Parquet 사본 (DuckDB 전용) ---
+    def export_path(self, generation, name="sales") -> Path:
+        # 같은 경로의 다른 DB(벤치마크 등)와 섞이지 않도록 DB 파일명 포함
+        return EXPORT_DIR / f"{Path(self.db_svc.db_path).stem}_{name}_g{generation}.parquet"
+
+    def export_snapshot(self, generation=None) -> Path:
+        """
+        게시 스냅샷의 hot 매매 거래(단지명/동 포함)와 단지 목록을 Parquet로 1회 내보냄. 세대가 같으면 재사용
+        (과거 연도 cold 파티션은 이미 Parquet이므로 내보내지 않고 DuckDB가 직접 읽음)
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        generation = self.db_svc.generation() if generation is None else generation
+        out = self.export_path(generation)
+        if out.exists():
+            return out
+        conn = self.db_svc.get_connection()
+        try:
+            df = pd.read_sql_query("""
+                SELECT t.complex_id, m.complex_name, m.dong, t.trade_date, t.area_sqm, t.floor, t.price_won
+                FROM transactions t LEFT JOIN complex_master m ON m.complex_id = t.complex_id
+            """, conn)
+            master = pd.read_sql_query("SELECT complex_id, complex_name, dong FROM complex_master", conn)
+        finally:
+            conn.close()
+        df["trade_date"] = pd.to_datetime(df["trade_date"], errors="coerce").dt.date
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(master, preserve_index=False), self.export_path(generation, "complex"))
+        tmp = out.with_suffix(".parquet.tmp")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+        os.replace(tmp, out)
+        # 이전 세대 사본 정리
+        keep = {out, self.export_path(generation, "complex")}
+        for old in EXPORT_DIR.glob(f"{Path(self.db_svc.db_path).stem}_*_g*.parquet"):
+            if old not in keep:
+                old.unlink(missing_ok=True)
+        return out
+
+    def _cold_files(self, start=None, end=None) -> list:
+        """현재 스냅샷 manifest의 연도 파티션 중 기간과 겹치는 파일 경로"""
+        from services.partition_store import manifest, partition_dir
+        conn = self.db_svc.get_connection()
+        try:
+            files = manifest(conn.cursor(), "transactions", start, end)
+        finally:
+            conn.close()
+        base = partition_dir(self.db_svc.db_path)
+        return [str(base / f) for _, f, _, _, _ in files]
+
+    def _duck_cursor(self):
+        """현재 세대의 sales 뷰가 걸린 DuckDB 커서 (스레드별 cursor() 사용)"""
+        generation = self.db_svc.generation()
+        with self._lock:
+            if self._duck is None:
+                self._duck = duckdb.connect()
+            if self._duck_generation != generation:
+                quote = lambda p: "'" + str(p).replace("'", "''") + "'"
+                hot = self.export_snapshot(generation)
+                view = f"SELECT * FROM read_parquet({quote(hot)})"
+                cold = self._cold_files()
+                if cold:
+                    # cold 연도 파일은 거래일 min/max 통계로 DuckDB가 파일/row group 단위로 건너뜀
+                    view += f"""
+                        UNION ALL
+                        SELECT c.complex_id, m.complex_name, m.dong, CAST(c.trade_date AS DATE) AS trade_date,
+                               c.area_sqm, c.floor, c.price_won
+                        FROM read_parquet([{", ".join(quote(p) for p in cold)}]) c
+                        LEFT JOIN read_parquet({quote(self.export_path(generation, "complex"))}) m USING (complex_id)
+                    """
+                self._duck.execute(f"CREATE OR REPLACE VIEW sales AS {view}")
+                self._duck_generation = generation
+            return self._duck.cursor()
+
+    # --- 공통 필터 ---
+    def _filters(self, complex_name=None, dong=None, area_min=None, area_max=None, start=None, end=None):
+        """(WHERE 절, 파라미터, (start, end)). 단지명은 stats_svc와 같은 규칙으로 complex_id로 해석"""
+        clauses, params = [], []
+        if complex_name:
+            from services.stats_svc import stats_svc
+            conn = self.db_svc.get_connection()
+            try:
+                row = stats_svc._resolve_complex_id(conn.cursor(), complex_name, dong)
+            finally:
+                conn.close()
+            clauses.append("complex_id = ?")
+            params.append(row[0] if row else None)
+        if dong:
+            clauses.append("dong = ?")
+            params.append(dong)
+        if area_min is not None:
+            clauses.append("area_sqm >= ?")
+            params.append(float(area_min))
+        if area_max is not None:
+            clauses.append("area_sqm <= ?")
+            params.append(float(area_max))
+        if start:
+            clauses.append("trade_date >= ?")
+            params.append(str(start)[:10])
+        if end:
+            clauses.append("trade_date <= ?")
+            params.append(str(end)[:10])
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params, (start, end)
+
+    def _sqlite_rows(self, columns, where, params, span):
+        conn = self.db_svc.get_connection()
+        try:
+            # 기간과 겹치는 cold 연도 파티션만 임시 테이블로 올려 hot 테이블과 합침
+            from services.partition_store import read_cold
+            cursor = conn.cursor()
+            cold = read_cold(cursor, self.db_svc.db_path, "transactions",
+                             ["complex_id", "trade_date", "area_sqm", "price_won"], *span)
+            source = "transactions"
+            if not cold.empty:
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS cold_sales "
+                               "(complex_id TEXT, trade_date TEXT, area_sqm REAL, price_won INTEGER)")
+                cursor.execute("DELETE FROM cold_sales")
+                cursor.executemany("INSERT INTO cold_sales VALUES (?, ?, ?, ?)",
+                                   cold.astype(object).itertuples(index=False, name=None))
+                source = """(SELECT complex_id, trade_date, area_sqm, price_won FROM transactions
+                             UNION ALL SELECT * FROM temp.cold_sales)"""
+            try:
+                return pd.read_sql_query(f"""
+                    SELECT {columns} FROM (
+                        SELECT t.complex_id, m.complex_name, m.dong, t.trade_date, t.area_sqm, t.price_won
+                        FROM {source} t LEFT JOIN complex_master m ON m.complex_id = t.complex_id
+                    ){where}
+                """, conn, params=params)
+            finally:
+                if not cold.empty:
+                    cursor.execute("DELETE FROM cold_sales")
+        finally:
+            conn.close()
+
+    def _duck_query(self, sql, params):
+        # DuckDB는 trade_date가 DATE 타입이므로 문자열 날짜 파라미터를 캐스팅
+        sql = sql.replace("trade_date >= ?", "trade_date >= CAST(? AS DATE)").replace(
+            "trade_date <= ?", "trade_date <= CAST(? AS DATE)")
+        cursor = self._duck_cursor()
+        try:
+            return cursor.execute(sql, params).df()
+        finally:
+            cursor.close()
+
+    # --- 조회 API ---
+    def trends(self, **filters) -> pd.DataFrame:
+        """월별 매매 평균가/중위가/거래량 (date, mean, median, count)"""
+        where, params, span = self._filters(**filters)
+        if self.engine == "duckdb":
+            df = self._duck_query(f"""
+                SELECT strftime(trade_date, '%Y-%m') AS date, AVG(price_won) AS mean,
+                       MEDIAN(price_won) AS median, COUNT(*) AS count
+                FROM sales{where} GROUP BY 1 ORDER BY 1
+            """, params)
+        else:
+            rows = self._sqlite_rows("strftime('%Y-%m', trade_date) AS date, price_won", where, params, span)
+            # 결과가 0행이면 read_sql_query가 object 컬럼을 돌려주므로 DuckDB 경로와 같은 float로 맞춤
+            rows = rows.astype({"price_won": "float64"})
+            df = rows.groupby("date", sort=True)["price_won"].agg(["mean", "median", "count"]).reset_index()
+        df["count"] = df["count"].astype("int64")
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+    def percentiles(self, group_by="dong", q=DEFAULT_PERCENTILES, **filters) -> pd.DataFrame:
+        """그룹(dong/complex/area_band)별 ㎡당 가격 분위수 + 거래량 (p10, p25, ... 컬럼)"""
+        key = COHORT_COLUMNS[group_by]
+        where, params, span = self._filters(**filters)
+        names = [f"p{int(round(p * 100))}" for p in q]
+        if self.engine == "duckdb":
+            cols = ", ".join(f"quantile_cont(price_won / area_sqm, {p}) AS {n}" for p, n in zip(q, names))
+            df = self._duck_query(f"""
+                SELECT {key} AS {group_by}, {cols}, COUNT(*) AS count
+                FROM sales{where} GROUP BY 1 ORDER BY 1
+            """, params)
+        else:
+            rows = self._sqlite_rows(f"{key} AS {group_by}, price_won * 1.0 / area_sqm AS ppsqm", where, params, span)
+            if rows.empty:
+                # 빈 프레임의 groupby().quantile().unstack()은 분위수 컬럼을 만들지 못함
+                df = pd.DataFrame({group_by: pd.Series(dtype=object),
+                                   **{n: pd.Series(dtype="float64") for n in names},
+                                   "count": pd.Series(dtype="int64")})
+            else:
+                grouped = rows.astype({"ppsqm": "float64"}).groupby(group_by, sort=True)["ppsqm"]
+                df = grouped.quantile(list(q)).unstack()
+                df.columns = names
+                df = df.assign(count=grouped.size()).reset_index()
+        df["count"] = df["count"].astype("int64")
+        return df
+
+    def cohort_trends(self, cohort="area_band", **filters) -> pd.DataFrame:
+        """코호트(area_band/dong/complex)별 월별 ㎡당 중위가와 거래량 (date, cohort, median_ppsqm, count)"""
+        key = COHORT_COLUMNS[cohort]
+        where, params, span = self._filters(**filters)
+        if self.engine == "duckdb":
+            df = self._duck_query(f"""
+                SELECT strftime(trade_date, '%Y-%m') AS date, {key} AS cohort,
+                       MEDIAN(price_won / area_sqm) AS median_ppsqm, COUNT(*) AS count
+                FROM sales{where} GROUP BY 1, 2 ORDER BY 1, 2
+            """, params)
+        else:
+            rows = self._sqlite_rows(f"strftime('%Y-%m', trade_date) AS date, {key} AS cohort, "
+                                     f"price_won * 1.0 / area_sqm AS ppsqm", where, params, span)
+            df = (rows.astype({"ppsqm": "float64"}).groupby(["date", "cohort"], sort=True)["ppsqm"]
+                  .agg(median_ppsqm="median", count="count").reset_index())
+        df["count"] = df["count"].astype("int64")
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+analytics_svc = AnalyticsService()
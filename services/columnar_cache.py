@@ -0,0 +1,95 @@
+import json
+import os
+from pathlib import Path
+import pandas as pd
+
+# Try to import pyarrow, handle if missing (JSON 직접 로드로 Fallback)
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = BASE_DIR / "data"
+CACHE_DIR = Path(os.environ.get("MOLIT_CACHE_DIR", DATA_DIR / "columnar"))
+
+SNAPSHOT_PATTERN = "*실거래가*.json"
+# 반복 값이 많은 문자열 컬럼은 category(dictionary)로 저장
+CATEGORY_COLUMNS = ["시군구", "단지명", "도로명", "거래유형", "중개사소재지", "전월세구분", "계약구분",
+                    "매수자", "매도자", "매수", "매도", "갱신요구권사용", "갱신요구권 사용"]
+
+def _typed_frame(records) -> pd.DataFrame:
+    """국토부 JSON 레코드를 타입이 고정된 컬럼형 DataFrame으로 변환"""
+    df = pd.DataFrame(records)
+    for col in df.columns:
+        s = df[col]
+        if col == "date":
+            df[col] = pd.to_datetime(s, unit="ms", errors="coerce")
+        elif col in CATEGORY_COLUMNS:
+            df[col] = s.where(s.isna(), s.astype(str)).astype("category")
+        elif s.dtype == object:
+            # '번지'처럼 숫자/문자가 섞인 컬럼은 문자열로 통일
+            df[col] = s.where(s.isna(), s.astype(str))
+        elif pd.api.types.is_integer_dtype(s):
+            df[col] = pd.to_numeric(s, downcast="integer")
+    return df
+
+def cache_path(json_path) -> Path:
+    return CACHE_DIR / (Path(json_path).stem + ".arrow")
+
+def convert_snapshot(json_path) -> Path:
+    """JSON 스냅샷 하나를 Arrow IPC 파일로 1회 변환 (원본보다 최신 캐시가 있으면 건너뜀)"""
+    json_path = Path(json_path)
+    out = cache_path(json_path)
+    if out.exists() and out.stat().st_mtime >= json_path.stat().st_mtime:
+        return out
+
+    with open(json_path, "r", encoding="utf-8") as jf:
+        df = _typed_frame(json.load(jf))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # 무압축 IPC 파일이어야 memory-map 후 zero-copy로 읽을 수 있음
+    tmp = out.with_suffix(".arrow.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, out)
+    return out
+
+def build_cache(data_dir: Path = DATA_DIR) -> list:
+    """data/ 아래 모든 실거래가 JSON 스냅샷을 변환. 변환된 캐시 경로 목록 반환"""
+    if not HAS_PYARROW:
+        return []
+    return [convert_snapshot(p) for p in sorted(Path(data_dir).glob(SNAPSHOT_PATTERN))]
+
+def open_snapshot_table(json_path, columns=None):
+    """캐시 파일을 memory-map으로 열어 pyarrow Table 반환 (페이지 캐시 공유, 힙 복사 없음)"""
+    source = pa.memory_map(str(convert_snapshot(json_path)), "r")
+    table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+def load_snapshot(json_path, columns=None) -> pd.DataFrame:
+    """실거래가 스냅샷 하나를 DataFrame으로 로드 (pyarrow 없으면 JSON 직접 파싱)"""
+    if HAS_PYARROW:
+        return open_snapshot_table(json_path, columns).to_pandas()
+    with open(json_path, "r", encoding="utf-8") as jf:
+        df = _typed_frame(json.load(jf))
+    return df[columns] if columns else df
+
+def load_all_snapshots(data_dir: Path = DATA_DIR, columns=None) -> pd.DataFrame:
+    """data/ 아래 모든 실거래가 스냅샷을 하나의 DataFrame으로 결합"""
+    frames = []
+    for p in sorted(Path(data_dir).glob(SNAPSHOT_PATTERN)):
+        df = load_snapshot(p)
+        if columns:
+            df = df[[c for c in columns if c in df.columns]]
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    # 파일마다 카테고리 집합이 달라 concat 시 풀린 dtype을 복원
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
@@ -0,0 +1,136 @@
+import re
+import hashlib
+
+# 결정적 단지 ID (v5.1): "CMPX_" + blake2b(법정동|정규화 단지명) 12자리 hex
+ID_PREFIX = "CMPX_"
+ID_HEX_LEN = 12
+# 구버전 ID(f"CMPX_{abs(hash(name)) % 1000000}")는 최대 11자
+LEGACY_ID_MAX_LEN = len(ID_PREFIX) + 6
+
+_SPACE_RE = re.compile(r"[\s\"']+")
+_SUFFIX_RE = re.compile(r"(아파트|APT)$")
+
+def canonical_name(name: str) -> str:
+    """국토부 단지명 표기 차이를 흡수한 정규화 이름 ("대치 SK뷰아파트" -> "대치SK뷰")"""
+    s = _SPACE_RE.sub("", str(name)).upper()
+    stripped = _SUFFIX_RE.sub("", s)
+    return stripped if len(stripped) >= 2 else s
+
+def _alias_key(alias: str, dong: str) -> str:
+    return f"{dong}|{alias}"
+
+def make_complex_id(canonical_key: str, salt: int = 0) -> str:
+    """정규화 키로부터 프로세스와 무관하게 항상 같은 ID를 생성 (충돌 시 salt 증가)"""
+    raw = canonical_key if salt == 0 else f"{canonical_key}#{salt}"
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=ID_HEX_LEN // 2).hexdigest()
+    return f"{ID_PREFIX}{digest}"
+
+class ComplexRegistry:
+    """
+    단지명 별칭 -> complex_id 인메모리 사전 (complex_alias 테이블과 동기화)
+    적재 시 DB 왕복 없이 dict 조회만으로 ID를 해석하고, 새 별칭/단지는 flush()로 일괄 기록
+    """
+    def __init__(self):
+        self.aliases = {}       # "법정동|별칭" -> complex_id
+        self.keys = {}          # complex_id -> "법정동|정규화명" (충돌 검사용)
+        self._new_aliases = []  # (alias, dong, complex_id)
+        self._new_masters = []  # (complex_id, complex_name, dong)
+
+    @classmethod
+    def load(cls, cursor):
+        reg = cls()
+        reg.reload(cursor)
+        return reg
+
+    def reload(self, cursor):
+        """DB 기준으로 사전을 다시 구성 (롤백 후 미기록 별칭 폐기용)"""
+        self.__init__()
+        cursor.execute("SELECT complex_id, complex_name, dong FROM complex_master")
+        for c_id, c_name, dong in cursor.fetchall():
+            if c_name is not None:
+                self.keys.setdefault(c_id, _alias_key(canonical_name(c_name), dong or ""))
+        cursor.execute("SELECT alias, dong, complex_id FROM complex_alias")
+        for alias, dong, c_id in cursor.fetchall():
+            self.aliases[_alias_key(alias, dong)] = c_id
+
+    def _assign_id(self, canonical_key):
+        """(complex_id, 신규 여부) 반환. 다른 단지가 이미 쓰는 ID면 salt를 올려 재생성"""
+        salt = 0
+        c_id = make_complex_id(canonical_key)
+        while self.keys.get(c_id, canonical_key) != canonical_key:
+            salt += 1
+            c_id = make_complex_id(canonical_key, salt)
+        is_new = c_id not in self.keys
+        self.keys[c_id] = canonical_key
+        return c_id, is_new
+
+    def resolve(self, name: str, dong: str) -> str:
+        """원본 단지명(+법정동)을 canonical complex_id로 해석. 처음 보는 이름이면 별칭/단지를 등록"""
+        key = _alias_key(name, dong)
+        c_id = self.aliases.get(key)
+        if c_id is not None:
+            return c_id
+
+        canon = canonical_name(name)
+        canon_key = _alias_key(canon, dong)
+        c_id = self.aliases.get(canon_key)
+        if c_id is None:
+            c_id, is_new = self._assign_id(canon_key)
+            self.aliases[canon_key] = c_id
+            self._new_aliases.append((canon, dong, c_id))
+            if is_new:
+                self._new_masters.append((c_id, name, dong))
+        if key != canon_key:
+            self.aliases[key] = c_id
+            self._new_aliases.append((name, dong, c_id))
+        return c_id
+
+    def resolve_frame(self, frame):
+        """정제 프레임의 (단지명, 법정동)을 고유 조합 단위로만 해석하여 complex_id Series 반환"""
+        pairs = frame["dong"] + "|" + frame["complex_name"]
+        id_map = {}
+        for name, dong in frame[["complex_name", "dong"]].drop_duplicates().itertuples(index=False, name=None):
+            id_map[_alias_key(name, dong)] = self.resolve(name, dong)
+        return pairs.map(id_map)
+
+    def flush(self, cursor):
+        """새로 등록된 단지/별칭을 DB에 일괄 기록"""
+        if self._new_masters:
+            cursor.executemany("INSERT OR IGNORE INTO complex_master (complex_id, complex_name, dong) VALUES (?, ?, ?)",
+                               self._new_masters)
+        if self._new_aliases:
+            cursor.executemany("INSERT OR IGNORE INTO complex_alias (alias, dong, complex_id) VALUES (?, ?, ?)",
+                               self._new_aliases)
+        self._new_masters, self._new_aliases = [], []
+
+_LEGACY_ID_SQL = """
+    SELECT complex_id, complex_name, dong FROM complex_master
+    WHERE complex_id LIKE 'CMPX_%' AND length(complex_id) <= ? AND complex_name IS NOT NULL
+"""
+
+def has_legacy_ids(cursor) -> bool:
+    """재매핑할 구버전 ID가 남아 있는지 (시작 시 스냅샷 쓰기가 필요한지 판단용)"""
+    cursor.execute(_LEGACY_ID_SQL + " LIMIT 1", (LEGACY_ID_MAX_LEN,))
+    return cursor.fetchone() is not None
+
+def migrate_legacy_ids(conn):
+    """구버전 hash() 기반 ID를 결정적 ID로 재매핑 (같은 단지의 중복 ID도 하나로 통합)"""
+    cursor = conn.cursor()
+    cursor.execute(_LEGACY_ID_SQL, (LEGACY_ID_MAX_LEN,))
+    legacy = cursor.fetchall()
+    if not legacy:
+        return 0
+
+    reg = ComplexRegistry.load(cursor)
+    remap = [(reg.resolve(name, dong or "대치동"), old_id) for old_id, name, dong in legacy]
+    reg.flush(cursor)
+    # 자연키 유니크 인덱스와 충돌하는 행(통합된 중복 거래)은 구 ID 쪽을 삭제
+    cursor.executemany("UPDATE OR IGNORE transactions SET complex_id = ? WHERE complex_id = ?", remap)
+    old_ids = [(old_id,) for _, old_id in remap]
+    cursor.executemany("DELETE FROM transactions WHERE complex_id = ?", old_ids)
+    # 통계는 증분 재계산 대상이 아니므로 구 ID 행을 그대로 이관 (정확한 값은 --full 재빌드로 갱신)
+    cursor.executemany("UPDATE OR IGNORE rt_stats SET complex_id = ? WHERE complex_id = ?", remap)
+    cursor.executemany("DELETE FROM rt_stats WHERE complex_id = ?", old_ids)
+    cursor.executemany("DELETE FROM complex_master WHERE complex_id = ?", old_ids)
+    conn.commit()
+    return len(remap)
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from services.csv_processor import PYEONG_SQM, STATS_WINDOWS
+
+# 메모리 적재 범위: 통계 최대 기간 + 앱이 며칠 켜져 있어도 창이 비지 않도록 여유분
+LOAD_DAYS = max(STATS_WINDOWS) + 30
+
+# 한 세대의 배열 묶음 (교체 시 참조만 바꿔 끼우므로 조회 중인 스레드는 이전 묶음을 끝까지 사용)
+_Arrays = namedtuple("_Arrays", "generation complex_index offsets day area floor price bucket ppp aliases loaded_at")
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+def _day_ordinal(dates) -> np.ndarray:
+    """'YYYY-MM-DD' -> 1970-01-01 기준 일수 (int32)"""
+    return pd.to_datetime(pd.Series(dates), format="%Y-%m-%d", errors="coerce").to_numpy("datetime64[D]").astype("int32")
+
+def _today_ordinal(today=None) -> int:
+    return (today or datetime.now().date()).toordinal() - EPOCH_ORDINAL
+
+def _quantiles(values, qs) -> list:
+    """작은 표본용 선형 보간 분위수 (np.percentile/pandas quantile 기본값과 동일, 호출 오버헤드 없이)"""
+    s = sorted(values)
+    last = len(s) - 1
+    out = []
+    for q in qs:
+        h = last * q
+        lo = int(h)
+        out.append(s[lo] + (h - lo) * (s[min(lo + 1, last)] - s[lo]))
+    return out
+
+class CompsStore:
+    """
+    최근 실거래 비교사례 인메모리 저장소 (v5.1)
+    게시 스냅샷의 최근 거래를 (단지, 거래일) 순으로 정렬된 NumPy 배열로 들고,
+    단지 구간은 offsets로, 기간은 이진 탐색으로 잘라 SQLite 왕복 없이 통계를 계산.
+    스냅샷 세대가 바뀌면 백그라운드에서 다시 적재하고 그동안은 이전 배열로 응답
+    """
+    def __init__(self):
+        from services.db_svc import db_svc
+        self.db_svc = db_svc
+        self._arrays = None
+        self._lock = threading.Lock()
+        self._loading = None
+
+    def load(self) -> _Arrays:
+        """현재 스냅샷에서 배열을 만들어 교체 (호출 스레드에서 동기 실행)"""
+        generation = self.db_svc.generation()
+        conn = self.db_svc.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT complex_id, trade_date, area_sqm, floor, price_won FROM transactions
+                WHERE trade_date >= date('now', ?) ORDER BY complex_id, trade_date
+            """, (f"-{LOAD_DAYS} days",))
+            df = pd.DataFrame(cursor.fetchall(), columns=["complex_id", "trade_date", "area_sqm", "floor", "price_won"])
+            cursor.execute("SELECT alias, complex_id FROM complex_alias")
+            aliases = dict(cursor.fetchall())
+        finally:
+            conn.close()
+
+        area = df["area_sqm"].to_numpy("float64")
+        price = df["price_won"].to_numpy("int64")
+        codes, uniques = pd.factorize(df["complex_id"], sort=True)
+        # offsets[i]:offsets[i+1] 이 단지 i의 구간 (ORDER BY로 이미 단지 -> 거래일 순)
+        offsets = np.searchsorted(codes, np.arange(len(uniques) + 1)).astype("int64")
+        arrays = _Arrays(
+            generation=generation,
+            complex_index={c_id: i for i, c_id in enumerate(uniques)},
+            offsets=offsets,
+            day=_day_ordinal(df["trade_date"]),
+            area=area,
+            floor=df["floor"].fillna(0).to_numpy("int16"),
+            price=price,
+            # rt_stats 면적 버킷(반올림 ㎡)과 평당가를 미리 계산해 조회 시 마스크/평균만 수행
+            bucket=np.round(area).astype("int32"),
+            ppp=price / (area / PYEONG_SQM),
+            aliases=aliases,
+            loaded_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        self._arrays = arrays
+        return arrays
+
+    def _load_in_background(self):
+        def run():
+            try:
+                self.load()
+            except Exception as e:
+                print(f"Comps Store Load Error: {e}")
+            finally:
+                self._loading = None
+        with self._lock:
+            if self._loading is None:
+                self._loading = threading.Thread(target=run, name="comps-store", daemon=True)
+                self._loading.start()
+
+    def ready(self) -> bool:
+        """조회 가능하면 True. 미적재/세대 변경 시 백그라운드 적재를 시작 (미적재 상태면 False)"""
+        arrays = self._arrays
+        if arrays is None or arrays.generation != self.db_svc.generation():
+            self._load_in_background()
+        return arrays is not None
+
+    def resolve(self, complex_name):
+        """별칭 정확 일치(원본/정규화명)로 complex_id 해석. 없으면 None (부분 일치는 stats_svc의 FTS 검색 사용)"""
+        from services.complex_registry import canonical_name
+        aliases = self._arrays.aliases
+        return aliases.get(complex_name) or aliases.get(canonical_name(complex_name))
+
+    def comps(self, complex_id, days=730, area=None, tol=2.0, today=None):
+        """
+        단지의 최근 days일 거래 중 면적 area±tol 인 비교사례 (area 없으면 전체)
+        반환: (day, area, floor, price) 배열 튜플 (거래일 오름차순)
+        """
+        a = self._arrays
+        i = a.complex_index.get(complex_id)
+        if i is None:
+            empty = np.empty(0)
+            return empty, empty, empty, empty
+        lo, hi = a.offsets[i], a.offsets[i + 1]
+        start = lo + np.searchsorted(a.day[lo:hi], _today_ordinal(today) - days, side="left")
+        sl = slice(start, hi)
+        day, area_arr, floor, price = a.day[sl], a.area[sl], a.floor[sl], a.price[sl]
+        if area is not None:
+            mask = np.abs(area_arr - float(area)) <= tol
+            day, area_arr, floor, price = day[mask], area_arr[mask], floor[mask], price[mask]
+        return day, area_arr, floor, price
+
+    def window_stats(self, complex_id, area_bucket=84, window_days=730, today=None):
+        """
+        rt_stats와 같은 규칙(반올림 면적 = 버킷, 거래일이 오늘 기준 window_days 이내)의 통계를
+        get_complex_stats와 같은 dict로 반환. 거래가 없으면 None
+        """
+        a = self._arrays
+        i = a.complex_index.get(complex_id)
+        if i is None:
+            return None
+        lo, hi = a.offsets[i], a.offsets[i + 1]
+        start = lo + np.searchsorted(a.day[lo:hi], _today_ordinal(today) - window_days, side="left")
+        mask = a.bucket[start:hi] == int(round(area_bucket))
+        price = a.price[start:hi][mask].tolist()
+        if not price:
+            return None
+        q1, med, q3 = _quantiles(price, (0.25, 0.5, 0.75))
+        count = len(price)
+        return {
+            "median": float(int(med)),
+            "count": count,
+            # 표본 4건 미만은 IQR 신뢰 불가 -> 0 (rt_stats와 동일)
+            "iqr": float(int(q3 - q1)) if count >= 4 else 0.0,
+            "mean_ppp": round(float(a.ppp[start:hi][mask].mean()), 1),
+            "min": float(min(price)),
+            "max": float(max(price)),
+            "window_days": window_days,
+        }
+
+    def info(self) -> dict:
+        a = self._arrays
+        if a is None:
+            return {"loaded": False}
+        nbytes = sum(arr.nbytes for arr in (a.offsets, a.day, a.area, a.floor, a.price, a.bucket, a.ppp))
+        return {"loaded": True, "generation": a.generation, "rows": len(a.price), "complexes": len(a.complex_index),
+                "mb": round(nbytes / 1e6, 1), "loaded_at": a.loaded_at}
+
+comps_store = CompsStore()
@@ -1,22 +1,46 @@
 import pandas as pd
+import numpy as np
 import glob
 import os
 import json
 import sqlite3
 import hashlib
+import time
+import shutil
+import queue
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
 from datetime import datetime
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data"
 
+# 스트리밍 적재 설정: 청크당 행 수 / 인코딩·헤더 판별용 샘플 크기
+CHUNK_ROWS = 50_000
+SNIFF_BYTES = 64 * 1024
+# 병렬 적재: 워커별로 Writer에 넘기기 전 대기시킬 수 있는 정제 청크 수 (워커 메모리 ≈ (1 + 이 값) x CHUNK_ROWS)
+QUEUE_CHUNKS = 2
+QUEUE_POLL_SEC = 1.0
+
+# rt_stats 산출 기간 (일) / 1평 = 3.3058㎡
+STATS_WINDOWS = (90, 180, 365, 730)
+PYEONG_SQM = 3.3058
+# 전세가율/전환율 산출 기간 (일)
+LEASE_STATS_WINDOW = 730
+
 def calculate_sha256(file_path):
     sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        for byte_block in iter(lambda: f.read(1024 * 1024), b""):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
+def file_fingerprint(file_path):
+    """sha256 계산 전 사전 검사용 (파일명, 크기, mtime_ns) 지문"""
+    st = os.stat(file_path)
+    return os.path.basename(file_path), st.st_size, st.st_mtime_ns
+
 def area_bucket(area_sqm: float, tol: int = 2) -> str:
     if pd.isna(area_sqm): return "84±2"
     base = int(round(area_sqm))
@@ -27,195 +51,855 @@ def pick_column(df, candidates):
         if c in df.columns: return c
     return None
 
-def process_csv_files():
+HEADER_KEYWORDS = ['단지명', '아파트', '오피스텔', '건물명', '거래금액']
+NAME_CANDIDATES = ['단지명', '아파트', '오피스텔', '건물명', '상호', '단지']
+PRICE_CANDIDATES = ['거래금액(만원)', '보증금(만원)', '매매가', '거래금액', '가격', '금액']
+AREA_CANDIDATES = ['전용면적(㎡)', '전용면적', '평형', '계약면적(㎡)', '면적']
+YM_CANDIDATES = ['계약년월', '거래년월', '연월', '계약일자']
+DAY_CANDIDATES = ['계약일', '거래일', '날짜']
+DONG_CANDIDATES = ['법정동', '시군구', '지역', '주소', '동']
+
+# 전월세 전용 컬럼 (v5.1 임대 적재 경로)
+DEPOSIT_CANDIDATES = ['보증금(만원)', '보증금']
+MONTHLY_CANDIDATES = ['월세금(만원)', '월세(만원)', '월세금', '월세']
+LEASE_TYPE_CANDIDATES = ['전월세구분']
+PERIOD_CANDIDATES = ['계약기간']
+CONTRACT_TYPE_CANDIDATES = ['계약구분']
+RENEWAL_CANDIDATES = ['갱신요구권사용', '갱신요구권']
+PREV_DEPOSIT_CANDIDATES = ['종전계약보증금(만원)', '종전계약보증금']
+PREV_MONTHLY_CANDIDATES = ['종전계약월세(만원)', '종전계약월세']
+
+# 품질 검증용 컬럼 (해제 여부 / 중개·직거래 구분)
+CANCEL_CANDIDATES = ['해제사유발생일', '해제여부']
+TRADE_TYPE_CANDIDATES = ['거래유형', '거래구분']
+
+TX_COLUMNS = ['complex_id', 'trade_date', 'area_sqm', 'floor', 'price_won']
+LEASE_COLUMNS = ['complex_id', 'trade_date', 'area_sqm', 'floor', 'deposit_won', 'monthly_rent_won',
+                 'lease_type', 'contract_start', 'contract_end', 'contract_type', 'renewal_used',
+                 'prev_deposit_won', 'prev_monthly_won']
+
+def detect_columns(df):
+    """국토부 양식의 컬럼명을 표준 필드로 매핑 (v5.0 고도화 매칭 + 인덱스 Fallback)"""
+    cols = {
+        "name": pick_column(df, NAME_CANDIDATES),
+        "price": pick_column(df, PRICE_CANDIDATES),
+        "area": pick_column(df, AREA_CANDIDATES),
+        "ym": pick_column(df, YM_CANDIDATES),
+        "day": pick_column(df, DAY_CANDIDATES),
+        "dong": pick_column(df, DONG_CANDIDATES),
+        "floor": '층' if '층' in df.columns else None,
+        "deposit": pick_column(df, DEPOSIT_CANDIDATES),
+        "monthly": pick_column(df, MONTHLY_CANDIDATES),
+        "lease_type": pick_column(df, LEASE_TYPE_CANDIDATES),
+        "period": pick_column(df, PERIOD_CANDIDATES),
+        "contract_type": pick_column(df, CONTRACT_TYPE_CANDIDATES),
+        "renewal": pick_column(df, RENEWAL_CANDIDATES),
+        "prev_deposit": pick_column(df, PREV_DEPOSIT_CANDIDATES),
+        "prev_monthly": pick_column(df, PREV_MONTHLY_CANDIDATES),
+        "cancel": pick_column(df, CANCEL_CANDIDATES),
+        "trade_type": pick_column(df, TRADE_TYPE_CANDIDATES),
+    }
+    # 보증금 컬럼이 있고 매매 거래금액이 없으면 전월세 파일
+    is_lease = cols["deposit"] is not None and pick_column(df, ['거래금액(만원)', '거래금액', '매매가']) is None
+    cols["kind"] = "lease" if is_lease else "sale"
+
+    # 인덱스 기반 Fallback (표준 국토부 양식)
+    if not cols["name"] and len(df.columns) >= 10:
+        cols.update({
+            "name": df.columns[5], "area": df.columns[6], "ym": df.columns[7],
+            "day": df.columns[8], "price": df.columns[9], "dong": df.columns[1],
+        })
+    return cols
+
+def _clean_str(s):
+    return s.astype(str).str.strip()
+
+def _to_amount(s):
+    """'34,000' 같은 금액 문자열 컬럼 -> 숫자 (변환 불가 시 NaN)"""
+    return pd.to_numeric(_clean_str(s.astype(str).str.replace(',', '', regex=False).str.replace('"', '', regex=False)),
+                         errors='coerce')
+
+def _normalize_common(df, cols):
+    """매매/전월세 공통 필드(단지명, 법정동, 거래일, 면적, 층) 정제. (프레임, 유효 행 마스크) 반환"""
+    # 1. 단지명
+    names = _clean_str(df[cols["name"]])
+    valid = (names != '') & (names != 'nan') & (names.str.len() >= 2)
+
+    # 3. 날짜 (계약년월 + 계약일)
+    ym = _clean_str(df[cols["ym"]]).str.replace(r'\.0$', '', regex=True)
+    if cols["day"]:
+        d_val = _clean_str(df[cols["day"]]).str.replace(r'\.0$', '', regex=True)
+        d_str = d_val.str.zfill(2).where(d_val.str.isdigit(), "01").str[:2]
+    else:
+        d_str = pd.Series("01", index=df.index)
+    t_date = ym.str[:4] + "-" + ym.str[4:6] + "-" + d_str
+    # 누락/오류 날짜는 오늘 날짜로 채우지 않고 품질 검증 단계에서 BAD_DATE로 격리
+    t_date = t_date.where(ym.str.len() >= 6, None)
+
+    # 4. 면적 (숫자 추출, 실패 시 NaN -> BAD_AREA)
+    area_str = df[cols["area"]].astype(str).str.replace(',', '', regex=False)
+    area = pd.to_numeric(area_str.str.extract(r'(\d+\.?\d*)', expand=False), errors='coerce')
+
+    # 5. 층
+    if cols["floor"]:
+        floor = pd.to_numeric(_clean_str(df[cols["floor"]]), errors='coerce').fillna(0)
+    else:
+        floor = pd.Series(0, index=df.index)
+
+    # 6. 법정동 (주소의 마지막 토큰)
+    if cols["dong"]:
+        dong = df[cols["dong"]].astype(str).str.split().str[-1].fillna('대치동')
+    else:
+        dong = pd.Series('대치동', index=df.index)
+
+    out = pd.DataFrame({
+        "complex_name": names,
+        "dong": dong,
+        "trade_date": t_date,
+        "area_sqm": area.astype(float),
+        "floor": np.trunc(floor).astype('int64'),
+    })
+    # 7. 해제 여부 ('-' 외 날짜가 기재되면 해제된 계약) / 거래유형
+    if cols.get("cancel"):
+        cancel = _clean_str(df[cols["cancel"]])
+        out["cancelled"] = ~cancel.isin(["-", "", "nan", "None", "N"])
+    else:
+        out["cancelled"] = False
+    out["trade_type"] = _clean_str(df[cols["trade_type"]]) if cols.get("trade_type") else None
+    return out, valid
+
+def normalize_frame(df, cols):
+    """
+    원본 DataFrame을 컬럼 단위(벡터 연산)로 정제하여 적재용 프레임으로 변환 (v5.1 Bulk Engine)
+    반환 컬럼: complex_name, dong, trade_date, area_sqm, floor, price_won, cancelled, trade_type, reason
+    reason이 채워진 행(해제/날짜·면적·금액 오류)은 적재 시 quarantine으로 이동
+    """
+    from services.data_quality import sanity_reasons
+    out, valid = _normalize_common(df, cols)
+
+    # 2. 가격 (만원 단위 정수)
+    price = _to_amount(df[cols["price"]])
+    out["price_won"] = np.trunc(price).astype('Int64')
+    out["reason"] = sanity_reasons(out, price)
+    return out[valid]
+
+def normalize_lease_frame(df, cols):
+    """
+    전월세 원본을 벡터 연산으로 정제 (보증금/월세/계약기간/갱신요구권)
+    반환 컬럼: 공통 필드 + LEASE_COLUMNS (complex_id 제외) + reason
+    """
+    from services.data_quality import sanity_reasons
+    out, valid = _normalize_common(df, cols)
+
+    deposit = _to_amount(df[cols["deposit"]])
+    monthly = _to_amount(df[cols["monthly"]]).fillna(0) if cols["monthly"] else pd.Series(0.0, index=df.index)
+    out["deposit_won"] = np.trunc(deposit).astype('Int64')
+    out["monthly_rent_won"] = np.trunc(monthly).astype('int64')
+
+    # 전월세구분이 비어 있으면 월세 유무로 판정
+    derived = pd.Series(np.where(monthly > 0, "월세", "전세"), index=df.index)
+    if cols["lease_type"]:
+        lt = _clean_str(df[cols["lease_type"]])
+        out["lease_type"] = lt.where(lt.isin(["전세", "월세"]), derived)
+    else:
+        out["lease_type"] = derived
+
+    # 계약기간 "202602~202802" -> 2026-02 / 2028-02
+    if cols["period"]:
+        period = df[cols["period"]].astype(str).str.extract(r'(\d{4})(\d{2})\s*~\s*(\d{4})(\d{2})')
+        out["contract_start"] = (period[0] + "-" + period[1]).where(period[0].notna(), None)
+        out["contract_end"] = (period[2] + "-" + period[3]).where(period[2].notna(), None)
+    else:
+        out["contract_start"] = out["contract_end"] = None
+
+    if cols["contract_type"]:
+        ct = _clean_str(df[cols["contract_type"]])
+        out["contract_type"] = ct.where(ct.isin(["신규", "갱신"]), None)
+    else:
+        out["contract_type"] = None
+    out["renewal_used"] = (_clean_str(df[cols["renewal"]]) == "사용").astype(int) if cols["renewal"] else 0
+
+    for key, col in [("prev_deposit", "prev_deposit_won"), ("prev_monthly", "prev_monthly_won")]:
+        out[col] = np.trunc(_to_amount(df[cols[key]])).astype('Int64') if cols[key] else pd.NA
+    # 무보증 월세는 정상이므로 보증금+월세가 모두 없을 때만 BAD_PRICE
+    out["reason"] = sanity_reasons(out, deposit.add(monthly, fill_value=0).where(deposit.notna()))
+    return out[valid]
+
+def load_frame(cursor, frame, registry=None, touched=None, kind="sale", source_file=None, quarantined=None, months=None):
+    """
+    정제된 프레임을 executemany로 일괄 적재. 새로 적재된 거래 건수를 반환
+    자연키(단지, 거래일, 면적, 층, 가격)가 이미 있는 행은 ON CONFLICT DO NOTHING으로 건너뜀
+    (cold 파티션에 있는 과거 연도 행은 partition_store.drop_cold_duplicates로 먼저 제외)
+    touched(set)가 주어지면 적재 대상 (complex_id, area_bucket) 키를 기록 (증분 통계용)
+    months(set)가 주어지면 매매 적재 대상 (complex_id, area_bucket, 'YYYY-MM') 칸을 기록 (월별 통계 증분용)
+    kind="lease"면 lease_transactions에 적재 (매매 중위값 오염 방지)
+    품질 검증(해제/날짜·면적·금액 오류, 매매 ㎡당 가격 이상치)에 걸린 행은 quarantine에 기록하고
+    quarantined(dict)에 사유별 건수를 누적
+    """
+    from services.data_quality import flag_outliers, write_quarantine, REASON_OUTLIER
+    if frame.empty:
+        return 0
+    amount_col = "deposit_won" if kind == "lease" else "price_won"
+    counts = quarantined if quarantined is not None else {}
+
+    def _quarantine(rows):
+        # 이미 격리된 같은 거래는 새로 세지 않음 (적재 건수와 같이 중복 건수로 집계)
+        for reason, n in write_quarantine(cursor, rows, kind, source_file, amount_col).items():
+            if n:
+                counts[reason] = counts.get(reason, 0) + n
+
+    if "reason" in frame:
+        rejected = frame["reason"].notna()
+        if rejected.any():
+            _quarantine(frame[rejected])
+            frame = frame[~rejected]
+        if frame.empty:
+            return 0
+    # 단지 ID는 Writer 프로세스의 별칭 사전으로 고유 (단지명, 법정동) 단위로 한 번만 해석
+    if registry is None:
+        from services.complex_registry import ComplexRegistry
+        registry = ComplexRegistry.load(cursor)
+    frame = frame.assign(complex_id=registry.resolve_frame(frame))
+    registry.flush(cursor)
+    if kind != "lease":
+        detail = flag_outliers(cursor, frame)
+        if detail.notna().any():
+            _quarantine(frame[detail.notna()].assign(reason=REASON_OUTLIER, detail=detail))
+            frame = frame[detail.isna()]
+    # cold로 옮겨진 연도의 재적재분은 새 거래가 아니므로 적재/증분 통계 대상에서 제외 (중복 건수로 집계)
+    from services.db_svc import db_svc
+    from services.partition_store import drop_cold_duplicates
+    frame = drop_cold_duplicates(cursor, db_svc.db_path, "lease_transactions" if kind == "lease" else "transactions",
+                                 frame)
+    if frame.empty:
+        return 0
+    if touched is not None:
+        touched.update(zip(frame["complex_id"], area_buckets(frame["area_sqm"])))
+    if kind == "lease":
+        return load_lease_frame(cursor, frame)
+    if months is not None:
+        months.update(month_cells(frame))
+    cursor.executemany("""
+        INSERT INTO transactions (complex_id, trade_date, area_sqm, floor, price_won)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (complex_id, trade_date, area_sqm, floor, price_won) DO NOTHING
+    """, frame[TX_COLUMNS].astype(object).itertuples(index=False, name=None))
+    return cursor.rowcount
+
+def load_lease_frame(cursor, frame):
+    """complex_id가 해석된 전월세 프레임을 lease_transactions에 멱등 적재"""
+    rows = frame[LEASE_COLUMNS].astype(object)
+    rows = rows.where(rows.notna(), None)
+    cursor.executemany(f"""
+        INSERT INTO lease_transactions ({", ".join(LEASE_COLUMNS)})
+        VALUES ({", ".join("?" * len(LEASE_COLUMNS))})
+        ON CONFLICT (complex_id, trade_date, area_sqm, floor, deposit_won, monthly_rent_won) DO NOTHING
+    """, rows.itertuples(index=False, name=None))
+    return cursor.rowcount
+
+def sniff_csv(f, sample_bytes=SNIFF_BYTES):
+    """파일 앞부분(수 KB)만 읽어 인코딩과 헤더 행 위치를 판별. 실패 시 (None, -1)"""
+    with open(f, 'rb') as bf:
+        head = bf.read(sample_bytes)
+    # 잘린 멀티바이트 문자를 피하기 위해 마지막 줄바꿈까지만 사용
+    if len(head) == sample_bytes and b'\n' in head:
+        head = head[:head.rindex(b'\n')]
+
+    encodings = ['cp949', 'utf-8-sig', 'euc-kr', 'utf-8']
+    for strict in (True, False):
+        for enc in encodings:
+            try:
+                text = head.decode(enc, errors='strict' if strict else 'ignore')
+            except UnicodeDecodeError:
+                continue
+            for i, line in enumerate(text.splitlines()[:30]): # 상위 30줄 검사
+                if (line.count(',') > 5) and (any(k in line for k in HEADER_KEYWORDS)):
+                    return enc, i
+    return None, -1
+
+def iter_source_frames(f, chunksize=CHUNK_ROWS):
+    """CSV/Excel 원본을 헤더 위치를 찾아 chunksize 행 단위 DataFrame으로 순차 반환 (메모리 상한 고정)"""
+    filename = os.path.basename(f)
+    # 1-1. xlsx 처리: openpyxl read_only로 헤더 탐색과 데이터 스트리밍을 한 번의 순회로 수행
+    if filename.endswith('.xlsx'):
+        from services.xlsx_reader import iter_xlsx_frames
+        yield from iter_xlsx_frames(f, chunksize, keywords=HEADER_KEYWORDS, min_cells=6)
+        return
+
+    # 1-2. 구형 xls 처리 (openpyxl 미지원)
+    if filename.endswith('.xls'):
+        # 국토부 엑셀은 보통 첫 몇 줄이 헤더 정보일 수 있음
+        temp_df = pd.read_excel(f, nrows=20)
+        header_idx = 0
+        for i, row in temp_df.iterrows():
+            row_str = " ".join(map(str, row.values))
+            if any(k in row_str for k in HEADER_KEYWORDS):
+                # temp_df의 i번째 데이터 행 = 시트의 i+1번째 행
+                header_idx = i + 1
+                break
+        df = pd.read_excel(f, skiprows=header_idx)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+        return
+
+    # 2. CSV 처리 (스트리밍)
+    enc, header_idx = sniff_csv(f)
+    if enc is None:
+        return
+    yield from pd.read_csv(f, encoding=enc, skiprows=header_idx, on_bad_lines='skip',
+                           dtype=str, chunksize=chunksize)
+
+def iter_normalized_frames(f, chunksize=CHUNK_ROWS):
+    """원본 파일을 청크 단위로 읽어 (종류, 정제 프레임)을 순차 반환. 종류는 "sale"/"lease" (형식 오류 시 ValueError)"""
+    cols = None
+    for chunk in iter_source_frames(f, chunksize):
+        # 컬럼명 정제
+        chunk.columns = [str(c).strip().replace('"', '').replace(' ', '') for c in chunk.columns]
+        if cols is None:
+            cols = detect_columns(chunk)
+            if not all([cols["name"], cols["price"], cols["area"], cols["ym"]]):
+                raise ValueError(f"필수 컬럼 누락 ({cols['name']}, {cols['price']}, {cols['area']})")
+        if cols["kind"] == "lease":
+            yield "lease", normalize_lease_frame(chunk, cols)
+        else:
+            yield "sale", normalize_frame(chunk, cols)
+
+    if cols is None:
+        raise ValueError("데이터가 없거나 형식을 알 수 없음")
+
+def parse_file(f, chunks, chunksize=CHUNK_ROWS):
+    """
+    [프로세스 풀 워커] 파일 하나를 파싱/정제하여 청크마다 chunks 큐(크기 제한)로 보냄
+    큐가 차면 Writer가 소비할 때까지 대기하므로 파일 전체를 메모리에 올리지 않음.
+    끝에 ("done", None), 실패 시 ("error", 메시지)
+    """
+    try:
+        for item in iter_normalized_frames(f, chunksize):
+            chunks.put(("frame", item))
+    except Exception as e:
+        chunks.put(("error", str(e)))
+    else:
+        chunks.put(("done", None))
+
+def queued_frames(chunks, future):
+    """[단일 Writer] parse_file 워커가 보내는 (종류, 정제 프레임)을 순서대로 반환 (워커 오류는 ValueError)"""
+    while True:
+        try:
+            tag, payload = chunks.get(timeout=QUEUE_POLL_SEC)
+        except queue.Empty:
+            if future.done():
+                # 종료 표식 없이 끝난 워커 (프로세스 비정상 종료 등)
+                error = future.exception()
+                raise ValueError(str(error) if error else "파싱 워커가 결과 없이 종료됨")
+            continue
+        if tag == "done":
+            return
+        if tag == "error":
+            raise ValueError(payload)
+        yield payload
+
+def write_file(cursor, summary, f, file_hash, frames, registry=None, touched=None, months=None):
+    """[단일 Writer] 정제 프레임을 파일 단위 SAVEPOINT 안에서 적재하고 ingested_files 이력을 기록 (성공 여부 반환)"""
+    filename = os.path.basename(f)
+    rows_added = rows_read = 0
+    file_kind = "sale"
+    quarantined = {}
+    # 파일 단위 SAVEPOINT: 스트리밍 도중 실패하면 해당 파일의 부분 적재분만 되돌림
+    cursor.execute("SAVEPOINT ingest_file")
+    error = None
+    try:
+        # 같은 파일을 재적재하면 격리 이력도 새로 기록
+        cursor.execute("DELETE FROM quarantine WHERE source_file = ?", (filename,))
+        for kind, frame in frames:
+            # 데이터 정제 및 적재 (컬럼 단위 벡터 정제 + executemany)
+            rows_read += len(frame)
+            rows_added += load_frame(cursor, frame, registry, touched, kind, filename, quarantined, months)
+            file_kind = kind
+    except Exception as e:
+        error = str(e)
+    if error:
+        cursor.execute("ROLLBACK TO ingest_file")
+        if registry is not None:
+            registry.reload(cursor)
+        cursor.execute("RELEASE ingest_file")
+        summary["errors"].append(f"{filename}: {error}")
+        return False
+
+    # 파일 이력 기록 (다음 실행의 해시 생략용 크기/mtime 지문 포함)
+    _, size, mtime_ns = file_fingerprint(f)
+    cursor.execute("""
+        INSERT OR REPLACE INTO ingested_files (sha256, file_path, ingested_at, kind, file_size, file_mtime_ns)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (file_hash, filename, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), file_kind, size, mtime_ns))
+    cursor.execute("RELEASE ingest_file")
+    summary["lease_rows" if file_kind == "lease" else "sale_rows"] += rows_added
+    summary["ingested"] += 1
+    summary["total_rows"] += rows_added
+    rows_quarantined = sum(quarantined.values())
+    summary["duplicate_rows"] += rows_read - rows_added - rows_quarantined
+    for reason, n in quarantined.items():
+        summary["quarantined"][reason] = summary["quarantined"].get(reason, 0) + n
+    return True
+
+def purge_legacy_lease_rows(cursor, summary, f, registry, touched):
+    """
+    매매 경로(보증금 -> price_won)로 잘못 적재된 전월세 행을 자연키로 찾아 transactions에서 삭제
+    파일 단위 SAVEPOINT 안에서 실행하고, DB 오류는 해당 파일 삭제분만 되돌린 뒤 summary["errors"]에 기록
+    """
+    filename = os.path.basename(f)
+    removed = 0
+    cursor.execute("SAVEPOINT purge_file")
+    try:
+        for kind, frame in iter_normalized_frames(f):
+            if kind != "lease" or frame.empty:
+                continue
+            frame = frame[frame["reason"].isna()]
+            frame = frame.assign(complex_id=registry.resolve_frame(frame))
+            registry.flush(cursor)
+            touched.update(zip(frame["complex_id"], area_buckets(frame["area_sqm"])))
+            keys = frame[["complex_id", "trade_date", "area_sqm", "floor", "deposit_won"]].astype(object)
+            cursor.executemany("""
+                DELETE FROM transactions
+                WHERE complex_id = ? AND trade_date = ? AND area_sqm = ? AND floor = ? AND price_won = ?
+            """, keys.itertuples(index=False, name=None))
+            removed += cursor.rowcount
+    except sqlite3.Error as e:
+        cursor.execute("ROLLBACK TO purge_file")
+        registry.reload(cursor)
+        cursor.execute("RELEASE purge_file")
+        summary["errors"].append(f"{filename}: legacy lease purge failed: {e}")
+        return 0
+    cursor.execute("RELEASE purge_file")
+    return removed
+
+def process_csv_files(chunksize=CHUNK_ROWS, workers=1, full_stats=False, progress=None, files=None, archive_dir=None):
+    """
+    repo 루트(또는 files로 지정한 파일)의 국토부 CSV/Excel을 DB에 적재.
+    workers > 1 이면 파일별 파싱/정제를 프로세스 풀에서 병렬 수행하고, 현재 프로세스가 단일 Writer로 적재함
+    full_stats=True 이면 rt_stats를 전체 재빌드 (기본은 변경된 키만 증분 재계산)
+    progress(stage, done, total, file_path) 콜백으로 단계별 진행률을 보고 (백그라운드 작업용)
+    archive_dir 지정 시 처리가 끝난 파일을 archive_dir/YYYYMM/ (오류 파일은 archive_dir/failed/)로 이동 (inbox 감시용)
+    """
+    report = progress or (lambda *args: None)
     import sys
     sys.path.append(str(BASE_DIR))
     try:
         from services.db_svc import db_svc
     except ImportError:
         import db_svc
+    from services.complex_registry import ComplexRegistry
     
     # CSV 및 Excel 파일 모두 검색
-    data_files = glob.glob(str(BASE_DIR / "*.csv")) + glob.glob(str(BASE_DIR / "*.xlsx")) + glob.glob(str(BASE_DIR / "*.xls"))
-    summary = {"ingested": 0, "skipped": 0, "total_rows": 0, "errors": []}
+    if files is None:
+        data_files = glob.glob(str(BASE_DIR / "*.csv")) + glob.glob(str(BASE_DIR / "*.xlsx")) + glob.glob(str(BASE_DIR / "*.xls"))
+    else:
+        data_files = [str(f) for f in files]
+    summary = {"ingested": 0, "skipped": 0, "hash_skipped": 0, "total_rows": 0, "sale_rows": 0, "lease_rows": 0,
+               "duplicate_rows": 0, "quarantined": {}, "errors": [], "workers": workers}
+    started = time.perf_counter()
     
     conn = db_svc.get_connection()
     cursor = conn.cursor()
 
-    for f in data_files:
-        filename = os.path.basename(f)
+    # 중복 방지 체크: 크기/mtime 지문이 같으면 해시 생략, 아니면 파일 sha256 기준
+    cursor.execute("""
+        SELECT file_path, file_size, file_mtime_ns FROM ingested_files
+        WHERE kind IS NOT NULL AND file_size IS NOT NULL
+    """)
+    known = set(cursor.fetchall())
+    pending, legacy, refingerprint = [], [], []
+    for i, f in enumerate(data_files):
+        report("scan", i, len(data_files), f)
+        fingerprint = file_fingerprint(f)
+        if fingerprint in known:
+            summary["skipped"] += 1
+            summary["hash_skipped"] += 1
+            continue
         file_hash = calculate_sha256(f)
-        
-        # 중복 방지 체크
-        cursor.execute("SELECT 1 FROM ingested_files WHERE sha256 = ?", (file_hash,))
-        if cursor.fetchone():
+        cursor.execute("SELECT kind FROM ingested_files WHERE sha256 = ?", (file_hash,))
+        row = cursor.fetchone()
+        if row and row[0] is not None:
+            # 내용은 같고 위치/mtime만 바뀐 파일: 지문만 갱신
+            refingerprint.append(fingerprint + (file_hash,))
             summary["skipped"] += 1
             continue
+        if row:
+            # v5.0 이전 경로로 적재된 파일(kind 미기록)은 1회 재적재 (자연키로 중복 없음)
+            # 전월세 파일은 매매 경로로 들어간 행을 transactions에서 먼저 걷어냄
+            legacy.append(f)
+        pending.append((f, file_hash))
 
-        try:
-            df = None
-            # 1. Excel 처리
-            if filename.endswith(('.xlsx', '.xls')):
-                try:
-                    # 국토부 엑셀은 보통 첫 몇 줄이 헤더 정보일 수 있음
-                    temp_df = pd.read_excel(f, nrows=20)
-                    header_idx = 0
-                    for i, row in temp_df.iterrows():
-                        row_str = " ".join(map(str, row.values))
-                        if any(k in row_str for k in ['단지명', '아파트', '오피스텔', '건물명', '거래금액']):
-                            header_idx = i
-                            break
-                    df = pd.read_excel(f, skiprows=header_idx)
-                except Exception as e:
-                    summary["errors"].append(f"{filename} (Excel): {str(e)}")
-                    continue
-            
-            # 2. CSV 처리
+    conn.close()
+
+    # 쓰기는 게시 DB의 스테이징 사본에서 수행하고 완료 시 원자적으로 교체 (조회는 이전 스냅샷을 잠금 없이 계속 읽음)
+    # 새 파일/지문 갱신이 없고 전체 재빌드도 아니면 사본을 만들지 않음
+    failed = set()
+    if not pending and not refingerprint and not full_stats:
+        summary["stats_updated"] = summary["lease_stats_updated"] = summary["monthly_updated"] = 0
+        summary["decay_updated"] = 0
+        summary["compacted"] = {}
+    else:
+        with db_svc.write_snapshot() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            if refingerprint:
+                cursor.executemany("UPDATE ingested_files SET file_path = ?, file_size = ?, file_mtime_ns = ? WHERE sha256 = ?",
+                                   refingerprint)
+            registry = ComplexRegistry.load(cursor)
+            touched, months = set(), set()
+            # 이번 적재로 새로 들어간 거래 = 이 id 이후 (시간 감쇠 상태에 새 거래만 누적)
+            last_tx_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+            if legacy:
+                summary["purged_lease_rows"] = sum(purge_legacy_lease_rows(cursor, summary, f, registry, touched)
+                                                   for f in legacy)
+            report("ingest", 0, len(pending), None)
+            if workers > 1 and len(pending) > 1:
+                with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as pool:
+                    # 파일마다 크기 제한 큐: 워커는 청크 단위로 보내고, Writer는 제출 순서대로 파일 하나씩 소비
+                    # (풀은 제출 순으로 파일을 시작하므로 Writer가 기다리는 파일은 항상 실행 중이거나 끝난 상태)
+                    jobs = []
+                    for f, file_hash in pending:
+                        chunks = manager.Queue(maxsize=QUEUE_CHUNKS)
+                        jobs.append((f, file_hash, chunks, pool.submit(parse_file, f, chunks, chunksize)))
+                    for i, (f, file_hash, chunks, fut) in enumerate(jobs):
+                        report("ingest", i, len(pending), f)
+                        frames = queued_frames(chunks, fut)
+                        if not write_file(cursor, summary, f, file_hash, frames, registry=registry, touched=touched,
+                                          months=months):
+                            failed.add(f)
+                        # 적재 도중 실패한 파일도 워커가 끝나도록 남은 청크를 비움
+                        try:
+                            for _ in frames:
+                                pass
+                        except ValueError:
+                            pass
             else:
-                encodings = ['cp949', 'utf-8-sig', 'euc-kr', 'utf-8']
-                header_idx = -1
-                for enc in encodings:
-                    try:
-                        with open(f, 'r', encoding=enc, errors='ignore') as temp_f:
-                            lines = temp_f.readlines()
-                            for i, line in enumerate(lines[:30]): # 상위 30줄 검사
-                                if (line.count(',') > 5) and (any(k in line for k in ['단지명', '아파트', '오피스텔', '건물명', '거래금액'])):
-                                    header_idx = i
-                                    break
-                        if header_idx != -1:
-                            df = pd.read_csv(f, encoding=enc, skiprows=header_idx, on_bad_lines='skip')
-                            break
-                    except:
-                        continue
-            
-            if df is None or df.empty:
-                summary["errors"].append(f"{filename}: 데이터가 없거나 형식을 알 수 없음")
-                continue
+                for i, (f, file_hash) in enumerate(pending):
+                    report("ingest", i, len(pending), f)
+                    if not write_file(cursor, summary, f, file_hash, iter_normalized_frames(f, chunksize),
+                                      registry=registry, touched=touched, months=months):
+                        failed.add(f)
+                
+            # 전체 적재를 하나의 트랜잭션으로 커밋
+            conn.commit()
+            if legacy:
+                # 층 없이 적재됐던 구버전 행은 이번 재적재로 층이 있는 행과 중복되므로 격리
+                from services.data_quality import quarantine_legacy_rows
+                touched |= quarantine_legacy_rows(conn)
+            report("stats", len(pending), len(pending), None)
+            # 통계는 이번 적재로 변경된 (단지, 면적버킷)만 증분 재계산 (full_stats=True면 전체 재빌드)
+            summary["stats_updated"] = build_db_stats(conn, None if full_stats else touched)
+            # 전세가율/전환율은 매매·전월세 어느 쪽이 바뀌어도 영향을 받으므로 변경 단지 단위로 재계산
+            summary["lease_stats_updated"] = build_lease_stats(conn, None if full_stats else {c_id for c_id, _ in touched})
+            # 월별 트렌드는 이번 적재로 거래가 들어온 (단지, 면적버킷, 월)만 재계산
+            # (구버전 행 정리는 어느 달이 바뀌었는지 기록하지 않으므로 전체 재빌드)
+            summary["monthly_updated"] = build_monthly_stats(conn, None if full_stats or legacy else months,
+                                                             db_path=db_svc.db_path)
+            # 시간 감쇠 가격 상태: 새 거래만 기존 상태에 누적 (행이 삭제되는 구버전 정리/전체 재빌드 시 다시 계산)
+            from services.decay_stats import build_decay_stats
+            summary["decay_updated"] = build_decay_stats(conn, since_id=None if full_stats or legacy else last_tx_id,
+                                                         db_path=db_svc.db_path)
+            # 최근 3년 밖으로 밀려난 거래는 연도별 압축 Parquet(cold)로 이동해 hot 테이블 크기를 일정하게 유지
+            from services.partition_store import compact
+            summary["compacted"] = compact(conn, db_svc.db_path)
+        if summary["compacted"]:
+            from services.partition_store import remove_stale_files
+            conn = db_svc.get_connection()
+            try:
+                remove_stale_files(conn.cursor(), db_svc.db_path)
+            finally:
+                conn.close()
+    if archive_dir is not None:
+        summary["archived"] = archive_files(data_files, archive_dir, failed)
+
+    elapsed = time.perf_counter() - started
+    summary["elapsed_sec"] = round(elapsed, 3)
+    summary["rows_per_sec"] = round(summary["total_rows"] / elapsed, 1) if elapsed > 0 else 0.0
+    
+    # 적재 요약은 대상 DB 옆에 기록 (MARKET_DB_PATH로 다른 DB를 쓰면 운영 요약을 덮어쓰지 않음)
+    with open(Path(db_svc.db_path).parent / "csv_summary.json", "w", encoding="utf-8") as jf:
+        json.dump(summary, jf, ensure_ascii=False, indent=2)
+    return summary
+
+def archive_files(paths, archive_dir, failed=()):
+    """처리된 파일을 archive_dir/YYYYMM/ 으로, 실패한 파일은 archive_dir/failed/ 로 이동 (같은 이름이 있으면 시각 접미사)"""
+    moved = 0
+    stamp = datetime.now()
+    for f in paths:
+        if not os.path.exists(f):
+            continue
+        dest_dir = Path(archive_dir) / ("failed" if f in failed else stamp.strftime("%Y%m"))
+        os.makedirs(dest_dir, exist_ok=True)
+        dest = dest_dir / os.path.basename(f)
+        if dest.exists():
+            dest = dest_dir / f"{dest.stem}_{stamp.strftime('%Y%m%d%H%M%S')}{dest.suffix}"
+        shutil.move(f, dest)
+        moved += 1
+    return moved
+
+def area_buckets(area_series, tol: int = 2):
+    """area_bucket()의 벡터 버전 (round는 numpy/파이썬 모두 banker's rounding)"""
+    return np.round(area_series.astype(float)).astype('int64').astype(str) + f"±{tol}"
+
+def compute_window_stats(df, windows=STATS_WINDOWS):
+    """
+    (complex_id, area_bucket, trade_date, area_sqm, price_won) 프레임에서 기간별 통계를 한 번에 계산
+    기간마다 groupby + 벡터 분위수로 중위값/IQR/건수/평당가 평균/최저/최고를 산출
+    """
+    if df.empty:
+        return pd.DataFrame()
+    age = (pd.Timestamp(datetime.now().date()) - pd.to_datetime(df["trade_date"], errors="coerce")).dt.days
+    df = df.assign(ppp=df["price_won"] / (df["area_sqm"] / PYEONG_SQM), age=age)
+
+    results = []
+    for w in sorted(windows):
+        sub = df[df["age"] <= w]
+        if sub.empty:
+            continue
+        g = sub.groupby(["complex_id", "area_bucket"], sort=False)
+        q = g["price_won"].quantile([0.25, 0.5, 0.75]).unstack()
+        agg = g.agg(count=("price_won", "size"), mean_ppp=("ppp", "mean"),
+                    min_won=("price_won", "min"), max_won=("price_won", "max"))
+        agg["median_won"] = q[0.5]
+        # 표본 4건 미만은 IQR 신뢰 불가 -> 0
+        agg["iqr_won"] = (q[0.75] - q[0.25]).where(agg["count"] >= 4, 0)
+        agg["window_days"] = w
+        results.append(agg.reset_index())
+    if not results:
+        return pd.DataFrame()
+    return pd.concat(results, ignore_index=True)
+
+def build_db_stats(conn, keys=None, windows=STATS_WINDOWS):
+    """
+    rt_stats 재계산 (90/180/365/730일 등 여러 기간을 한 번의 조회로 산출)
+    keys가 None이면 전체 재빌드, 아니면 적재 시 변경된 (complex_id, area_bucket)만 재계산
+    """
+    cursor = conn.cursor()
+    max_window = max(windows)
+    if keys is None:
+        df = pd.read_sql_query("""
+            SELECT complex_id, trade_date, area_sqm, price_won FROM transactions
+            WHERE trade_date >= date('now', ?)
+        """, conn, params=(f"-{max_window} days",))
+    else:
+        if not keys:
+            return 0
+        # 변경된 단지의 거래만 임시 테이블 조인으로 조회
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS touched_keys (complex_id TEXT, area_bucket TEXT, PRIMARY KEY (complex_id, area_bucket))")
+        cursor.execute("DELETE FROM touched_keys")
+        cursor.executemany("INSERT OR IGNORE INTO touched_keys VALUES (?, ?)", keys)
+        df = pd.read_sql_query("""
+            SELECT t.complex_id, t.trade_date, t.area_sqm, t.price_won FROM transactions t
+            WHERE t.complex_id IN (SELECT complex_id FROM touched_keys)
+              AND t.trade_date >= date('now', ?)
+        """, conn, params=(f"-{max_window} days",))
+
+    df["area_bucket"] = area_buckets(df["area_sqm"]) if not df.empty else pd.Series(dtype=str)
+    if keys is not None and not df.empty:
+        df = df[pd.MultiIndex.from_frame(df[["complex_id", "area_bucket"]]).isin(list(keys))]
+    stats = compute_window_stats(df, windows)
 
-            # 컬럼명 정제
-            df.columns = [str(c).strip().replace('"', '').replace(' ', '') for c in df.columns]
-            
-            # --- 고도화된 컬럼 매칭 (v5.0 Upgrade) ---
-            name_col = pick_column(df, ['단지명', '아파트', '오피스텔', '건물명', '상호', '단지'])
-            price_col = pick_column(df, ['거래금액(만원)', '보증금(만원)', '매매가', '거래금액', '가격', '금액'])
-            area_col = pick_column(df, ['전용면적(㎡)', '전용면적', '평형', '계약면적(㎡)', '면적'])
-            ym_col = pick_column(df, ['계약년월', '거래년월', '연월', '계약일자'])
-            day_col = pick_column(df, ['계약일', '거래일', '날짜'])
-            dong_col = pick_column(df, ['법정동', '시군구', '지역', '주소', '동'])
-
-            # 인덱스 기반 Fallback (표준 국토부 양식)
-            if not name_col and len(df.columns) >= 10:
-                name_col = df.columns[5]
-                area_col = df.columns[6]
-                ym_col = df.columns[7]
-                day_col = df.columns[8]
-                price_col = df.columns[9]
-                dong_col = df.columns[1]
-
-            if not all([name_col, price_col, area_col, ym_col]):
-                summary["errors"].append(f"{filename}: 필수 컬럼 누락 ({name_col}, {price_col}, {area_col})")
+    # 대상 키의 기존 통계를 지우고 새로 기록 (기간 내 거래가 사라진 버킷 정리 포함)
+    if keys is None:
+        cursor.execute("DELETE FROM rt_stats")
+    else:
+        cursor.execute("DELETE FROM rt_stats WHERE (complex_id, area_bucket) IN (SELECT complex_id, area_bucket FROM touched_keys)")
+    if stats.empty:
+        conn.commit()
+        return 0
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    rows = zip(stats["complex_id"], stats["area_bucket"], stats["window_days"].astype(int),
+               stats["median_won"].astype('int64').tolist(), stats["count"].astype(int).tolist(),
+               stats["iqr_won"].astype('int64').tolist(), stats["mean_ppp"].round(1).tolist(),
+               stats["min_won"].astype('int64').tolist(), stats["max_won"].astype('int64').tolist())
+    cursor.executemany("""
+        INSERT OR REPLACE INTO rt_stats (complex_id, area_bucket, window_days, median_won, count, iqr_won,
+                                         mean_ppp, min_won, max_won, last_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [r + (today,) for r in rows])
+    conn.commit()
+    return len(stats)
+
+def month_cells(frame):
+    """매매 프레임 -> (complex_id, area_bucket, 'YYYY-MM') 칸 (monthly_stats 증분 재계산 키)"""
+    return zip(frame["complex_id"], area_buckets(frame["area_sqm"]), frame["trade_date"].astype(str).str[:7])
+
+# monthly_stats 집계 단계: 칸(동, 단지, 면적버킷) -> 단지 전체 -> 동 전체 -> 전체 ('ALL'로 표시)
+MONTHLY_KEYS = ["dong", "complex_id", "area_bucket", "month"]
+MONTHLY_ALL = "ALL"
+
+def compute_monthly_stats(df, keys=None):
+    """
+    (complex_id, dong, trade_date, area_sqm, price_won) 프레임 -> 단계별 월 통계 (MONTHLY_KEYS + 통계 컬럼)
+    상위 단계도 칸을 합치지 않고 원본 거래로 다시 집계하므로 중위가가 정확함
+    sketch 컬럼은 각 행의 가격 분위수 스케치(bytes): 달/칸을 합친 조회에서 병합해 분위수를 계산
+    keys(set)가 주어지면 해당 (dong, complex_id, area_bucket, month) 키에 속하는 거래만 집계
+    """
+    from services.quantile_sketch import group_sketches
+    if df.empty:
+        return pd.DataFrame()
+    df = df.assign(area_bucket=area_buckets(df["area_sqm"]), month=df["trade_date"].astype(str).str[:7],
+                   ppp=df["price_won"] / (df["area_sqm"] / PYEONG_SQM))
+    results = []
+    for n in range(4):
+        # 월을 제외한 키의 뒤쪽 n개를 'ALL'로 (0: 칸, 1: 단지 전체, 2: 동 전체, 3: 전체)
+        level = df.assign(**{col: MONTHLY_ALL for col in MONTHLY_KEYS[3 - n:3]}) if n else df
+        if keys is not None:
+            level = level[pd.MultiIndex.from_frame(level[MONTHLY_KEYS]).isin(list(keys))]
+            if level.empty:
                 continue
+        g = level.groupby(MONTHLY_KEYS, sort=False)
+        agg = g.agg(median_won=("price_won", "median"), mean_won=("price_won", "mean"),
+                    count=("price_won", "size"), mean_ppp=("ppp", "mean")).reset_index()
+        # sort=False 집계 순서 = ngroup 번호 순서
+        agg["sketch"] = group_sketches(g.ngroup().to_numpy(), level["price_won"].to_numpy("float64"), len(agg))
+        results.append(agg)
+    if not results:
+        return pd.DataFrame()
+    return pd.concat(results, ignore_index=True)
+
+def build_monthly_stats(conn, cells=None, db_path=None):
+    """
+    monthly_stats 재계산: 단계별 (동, 단지, 면적버킷, 월) 중위가/평균가/건수/평당가 평균 (v5.1)
+    cells가 None이면 cold 파티션까지 전체 재빌드, 아니면 주어진 (complex_id, area_bucket, 'YYYY-MM') 칸과
+    그 칸이 속한 단지/동/전체 월 집계만 재계산
+    """
+    from services.partition_store import read_rows
+    if db_path is None:
+        from services.db_svc import db_svc
+        db_path = db_svc.db_path
+    cursor = conn.cursor()
+    cursor.execute("SELECT complex_id, COALESCE(dong, '') FROM complex_master")
+    dongs = dict(cursor.fetchall())
+    keys = None
+    if cells is None:
+        df = read_rows(cursor, db_path, "transactions", TX_COLUMNS)
+    else:
+        if not cells:
+            return 0
+        # 전체/동 단계도 다시 집계해야 하므로 바뀐 달의 거래는 단지 구분 없이 읽음 (hot + 겹치는 cold 연도)
+        keys = set()
+        for c_id, bucket, month in cells:
+            dong = dongs.get(c_id, "")
+            keys.update([(dong, c_id, bucket, month), (dong, c_id, MONTHLY_ALL, month),
+                         (dong, MONTHLY_ALL, MONTHLY_ALL, month), (MONTHLY_ALL, MONTHLY_ALL, MONTHLY_ALL, month)])
+        months = sorted({m for _, _, m in cells})
+        df = read_rows(cursor, db_path, "transactions", TX_COLUMNS, f"{months[0]}-01", f"{months[-1]}-31")
+    # 압축 전 과거 연도 재적재분은 hot/cold 양쪽에 있을 수 있어 자연키로 한 번만 집계
+    df = df.drop_duplicates(TX_COLUMNS)
+    stats = compute_monthly_stats(df.assign(dong=df["complex_id"].map(dongs).fillna("")), keys)
+
+    # 대상 키의 기존 통계를 지우고 새로 기록 (거래가 모두 빠진 칸 정리 포함)
+    if keys is None:
+        cursor.execute("DELETE FROM monthly_stats")
+    else:
+        cursor.executemany("DELETE FROM monthly_stats WHERE dong = ? AND complex_id = ? AND area_bucket = ? AND month = ?",
+                           keys)
+    if stats.empty:
+        conn.commit()
+        return 0
 
-            # 3. 데이터 정제 및 적재
-            rows_added = 0
-            for idx, row in df.iterrows():
-                try:
-                    c_name = str(row[name_col]).strip()
-                    if not c_name or c_name == 'nan' or len(c_name) < 2: continue
-                    
-                    c_id = f"CMPX_{abs(hash(c_name)) % 1000000}"
-                    
-                    # 가격 변환 (만원 단위 정수)
-                    p_val = str(row[price_col]).replace(',', '').replace('"', '').strip()
-                    if not p_val or p_val == 'nan': continue
-                    price_val = int(float(p_val))
-                    
-                    # 날짜 변환
-                    ym_val = str(row[ym_col]).strip()
-                    d_val = str(row[day_col]).strip() if day_col else "01"
-                    if len(ym_val) >= 6:
-                        d_str = d_val.zfill(2) if d_val.isdigit() else "01"
-                        t_date = f"{ym_val[:4]}-{ym_val[4:6]}-{d_str[:2]}"
-                    else:
-                        t_date = datetime.now().strftime("%Y-%m-%d")
-
-                    # 면적 변환
-                    import re
-                    area_val = 84.0
-                    area_str = str(row[area_col]).replace(',', '')
-                    area_match = re.search(r'(\d+\.?\d*)', area_str)
-                    if area_match:
-                        area_val = float(area_match.group(1))
-
-                    floor_val = 0
-                    if '층' in df.columns:
-                        try: floor_val = int(float(str(row['층']).strip()))
-                        except: pass
-
-                    # DB 저장
-                    dong_val = str(row.get(dong_col, '대치동')).split()[-1]
-                    cursor.execute("INSERT OR IGNORE INTO complex_master (complex_id, complex_name, dong) VALUES (?, ?, ?)", 
-                                   (c_id, c_name, dong_val))
-                    
-                    cursor.execute("""
-                        INSERT INTO transactions (complex_id, trade_date, area_sqm, floor, price_won) 
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (c_id, t_date, area_val, floor_val, price_val))
-                    rows_added += 1
-                except Exception:
-                    continue
-
-            # 파일 이력 기록
-            cursor.execute("INSERT INTO ingested_files (sha256, file_path, ingested_at) VALUES (?, ?, ?)",
-                           (file_hash, filename, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-            summary["ingested"] += 1
-            summary["total_rows"] += rows_added
-            
-        except Exception as e:
-            summary["errors"].append(f"{filename}: {str(e)}")
-            
+    today = datetime.now().strftime("%Y-%m-%d")
+    # 평균은 조회 시 여러 칸을 건수 가중으로 합산할 수 있도록 반올림하지 않고 저장
+    rows = zip(stats["dong"], stats["complex_id"], stats["area_bucket"], stats["month"],
+               stats["median_won"].astype('int64').tolist(), stats["mean_won"].tolist(),
+               stats["count"].astype(int).tolist(), stats["mean_ppp"].tolist(), stats["sketch"])
+    cursor.executemany("""
+        INSERT OR REPLACE INTO monthly_stats (dong, complex_id, area_bucket, month, median_won, mean_won,
+                                              count, mean_ppp, sketch, last_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [r + (today,) for r in rows])
     conn.commit()
-    build_db_stats(conn)
-    conn.close()
-    
-    with open(DATA_DIR / "csv_summary.json", "w", encoding="utf-8") as jf:
-        json.dump(summary, jf, ensure_ascii=False, indent=2)
+    return len(stats)
 
-def build_db_stats(conn):
+def compute_lease_stats(lease, sale):
+    """
+    (complex_id, area_bucket) 및 단지 전체('ALL') 단위 전세가율·전월세 전환율 계산
+    전세가율 = 전세 보증금 ㎡당 중위값 / 매매 ㎡당 중위값
+    전환율 = 월세 * 12 / (전세 ㎡당 중위값 * 면적 - 월세 보증금) 의 중위값
+    """
+    def with_all(df):
+        return pd.concat([df, df.assign(area_bucket="ALL")], ignore_index=True)
+
+    keys = ["complex_id", "area_bucket"]
+    lease = with_all(lease.assign(ppsqm=lease["deposit_won"] / lease["area_sqm"]))
+    sale = with_all(sale.assign(ppsqm=sale["price_won"] / sale["area_sqm"]))
+
+    jeonse = lease[lease["lease_type"] == "전세"]
+    wolse = lease[lease["lease_type"] == "월세"]
+    j_med = jeonse.groupby(keys)["ppsqm"].median().rename("jeonse_ppsqm")
+    s_med = sale.groupby(keys)["ppsqm"].median().rename("sale_ppsqm")
+
+    wolse = wolse.join(j_med, on=keys)
+    gap = wolse["jeonse_ppsqm"] * wolse["area_sqm"] - wolse["deposit_won"]
+    wolse = wolse.assign(conv=(wolse["monthly_rent_won"] * 12 / gap).where(gap > 0))
+
+    stats = pd.concat([
+        jeonse.groupby(keys).agg(jeonse_count=("deposit_won", "size"), jeonse_median_won=("deposit_won", "median")),
+        wolse.groupby(keys).agg(
+            wolse_count=("deposit_won", "size"), wolse_deposit_median_won=("deposit_won", "median"),
+            wolse_rent_median_won=("monthly_rent_won", "median")),
+        wolse.groupby(keys)["conv"].median().rename("conversion_rate"),
+        sale.groupby(keys).size().rename("sale_count"),
+        (j_med / s_med).rename("jeonse_ratio"),
+    ], axis=1)
+    # 임대 거래가 있는 키만 유지
+    stats = stats[stats["jeonse_count"].notna() | stats["wolse_count"].notna()]
+    return stats.reset_index()
+
+def build_lease_stats(conn, complex_ids=None, window_days=LEASE_STATS_WINDOW):
+    """lease_stats(전세가율/전환율 사전 계산 테이블) 재계산. complex_ids가 주어지면 해당 단지만"""
     cursor = conn.cursor()
-    # 최근 2년 데이터로 통계 계산 (사용자 요청 반영: 신뢰도 향상)
-    cursor.execute("""
-        SELECT complex_id, area_sqm, price_won FROM transactions 
-        WHERE trade_date >= date('now', '-730 days')
-    """)
-    rows = cursor.fetchall()
-    
-    groups = {}
-    for c_id, area, price in rows:
-        bucket = area_bucket(area)
-        key = (c_id, bucket)
-        if key not in groups: groups[key] = []
-        groups[key].append(price)
-        
-    for (c_id, bucket), prices in groups.items():
-        if not prices: continue
-        prices_s = sorted(prices)
-        median = prices_s[len(prices_s)//2]
-        count = len(prices_s)
-        iqr = 0
-        if count >= 4:
-            q3 = prices_s[int(count*0.75)]
-            q1 = prices_s[int(count*0.25)]
-            iqr = q3 - q1
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO rt_stats (complex_id, area_bucket, window_days, median_won, count, iqr_won, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (c_id, bucket, 730, int(median), count, int(iqr), datetime.now().strftime("%Y-%m-%d")))
+    where = "WHERE trade_date >= date('now', ?)"
+    params = [f"-{window_days} days"]
+    if complex_ids is not None:
+        if not complex_ids:
+            return 0
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS touched_lease (complex_id TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM touched_lease")
+        cursor.executemany("INSERT OR IGNORE INTO touched_lease VALUES (?)", [(c,) for c in complex_ids])
+        where += " AND complex_id IN (SELECT complex_id FROM touched_lease)"
+
+    lease = pd.read_sql_query(f"""
+        SELECT complex_id, area_sqm, deposit_won, monthly_rent_won, lease_type
+        FROM lease_transactions {where}
+    """, conn, params=params)
+    sale = pd.read_sql_query(f"SELECT complex_id, area_sqm, price_won FROM transactions {where}", conn, params=params)
+    for df in (lease, sale):
+        df["area_bucket"] = area_buckets(df["area_sqm"]) if not df.empty else pd.Series(dtype=str)
+
+    if complex_ids is None:
+        cursor.execute("DELETE FROM lease_stats")
+    else:
+        cursor.execute("DELETE FROM lease_stats WHERE complex_id IN (SELECT complex_id FROM touched_lease)")
+    if lease.empty:
+        conn.commit()
+        return 0
+
+    stats = compute_lease_stats(lease, sale)
+    stats = stats.astype(object).where(stats.notna(), None)
+    today = datetime.now().strftime("%Y-%m-%d")
+    cursor.executemany("""
+        INSERT OR REPLACE INTO lease_stats (complex_id, area_bucket, window_days, jeonse_ratio, conversion_rate,
+            jeonse_count, wolse_count, sale_count, jeonse_median_won, wolse_deposit_median_won,
+            wolse_rent_median_won, last_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(r.complex_id, r.area_bucket, window_days, r.jeonse_ratio, r.conversion_rate,
+           int(r.jeonse_count or 0), int(r.wolse_count or 0), int(r.sale_count or 0),
+           r.jeonse_median_won, r.wolse_deposit_median_won, r.wolse_rent_median_won, today)
+          for r in stats.itertuples(index=False)])
     conn.commit()
+    return len(stats)
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="국토부 실거래가 CSV/Excel DB 적재")
+    parser.add_argument("--workers", type=int, default=1, help="파싱/정제 병렬 프로세스 수 (기본 1 = 순차)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="청크당 행 수")
+    parser.add_argument("--full", action="store_true", help="rt_stats 전체 재빌드 (기간 경과분 반영)")
+    args = parser.parse_args()
     try:
-        process_csv_files()
+        print(process_csv_files(chunksize=args.chunksize, workers=args.workers, full_stats=args.full))
     except Exception as e:
         print(f"Standalone execution error: {e}")
@@ -0,0 +1,178 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# 적재 전 품질 검증 (v5.1): 걸러낸 행은 사유 코드와 함께 quarantine 테이블로 이동
+REASON_CANCELLED = "CANCELLED"    # 해제사유발생일 기재 (계약 해제)
+REASON_BAD_DATE = "BAD_DATE"      # 계약년월/일 누락·형식 오류·미래/제도 시행 이전 날짜
+REASON_BAD_AREA = "BAD_AREA"      # 전용면적 누락·범위 밖
+REASON_BAD_PRICE = "BAD_PRICE"    # 거래금액/보증금 누락·0 이하
+REASON_OUTLIER = "OUTLIER"        # 단지 ㎡당 가격이 rolling IQR 울타리 밖
+REASON_DUPLICATE = "DUPLICATE"    # 구버전 적재분(층 미기록)과 중복
+
+MIN_AREA_SQM = 10.0
+MAX_AREA_SQM = 1000.0
+MIN_TRADE_DATE = "2006-01-01"     # 부동산 실거래가 신고제 시행
+
+# 단지별 ㎡당 가격 울타리: 거래일 기준 전후 6개월(365일 중심 창), 최소 표본 수
+OUTLIER_WINDOW_DAYS = 365
+OUTLIER_MIN_PERIODS = 8
+IQR_K = 3.0
+IQR_K_DIRECT = 1.5                # 직거래는 특수관계 저가 거래가 많아 더 좁은 울타리 적용
+IQR_FLOOR_RATIO = 0.05            # IQR이 0에 가까운 단지에서 정상 거래가 걸리지 않도록 하한
+
+QUARANTINE_COLUMNS = ["kind", "reason", "source_file", "complex_name", "dong", "trade_date",
+                      "area_sqm", "floor", "amount_won", "monthly_rent_won", "detail", "quarantined_at"]
+
+def sanity_reasons(frame, amount):
+    """
+    정제 프레임의 행별 거부 사유(Series, 정상 행은 None)를 벡터 연산으로 산출 (amount: 판정용 금액 Series)
+    우선순위: 해제 > 날짜 > 면적 > 금액
+    """
+    dates = pd.to_datetime(frame["trade_date"], format="%Y-%m-%d", errors="coerce")
+    today = pd.Timestamp(datetime.now().date())
+    bad_date = dates.isna() | (dates < pd.Timestamp(MIN_TRADE_DATE)) | (dates > today)
+    area = frame["area_sqm"]
+    bad_area = area.isna() | (area < MIN_AREA_SQM) | (area > MAX_AREA_SQM)
+    bad_amount = amount.isna() | (amount <= 0)
+    cancelled = frame["cancelled"] if "cancelled" in frame else pd.Series(False, index=frame.index)
+
+    reasons = np.select([cancelled.to_numpy(bool), bad_date.to_numpy(bool), bad_area.to_numpy(bool), bad_amount.to_numpy(bool)],
+                        [REASON_CANCELLED, REASON_BAD_DATE, REASON_BAD_AREA, REASON_BAD_PRICE], default="")
+    return pd.Series(reasons, index=frame.index).replace("", None)
+
+def rolling_fences(history):
+    """
+    (complex_id, trade_date, ppsqm) 프레임에 단지별 시간 중심 rolling IQR 울타리(q1, q3, iqr) 컬럼을 붙여 반환
+    표본이 OUTLIER_MIN_PERIODS 미만인 구간은 NaN (판정 보류)
+    """
+    df = history.assign(date=pd.to_datetime(history["trade_date"]))
+    df = df.sort_values(["complex_id", "date"], kind="stable")
+    roll = df.groupby("complex_id", sort=False).rolling(f"{OUTLIER_WINDOW_DAYS}D", on="date", center=True,
+                                                         min_periods=OUTLIER_MIN_PERIODS)["ppsqm"]
+    df["q1"] = roll.quantile(0.25).to_numpy()
+    df["q3"] = roll.quantile(0.75).to_numpy()
+    df["iqr"] = (df["q3"] - df["q1"]).clip(lower=IQR_FLOOR_RATIO * (df["q1"] + df["q3"]) / 2)
+    return df
+
+def flag_outliers(cursor, frame):
+    """
+    complex_id가 해석된 매매 프레임에서 ㎡당 가격 이상치 판정 근거(Series, 정상 행은 None) 반환
+    기준 분포는 DB에 이미 있는 같은 단지 거래(창 범위) + 이번 프레임
+    """
+    if frame.empty:
+        return pd.Series(None, index=frame.index, dtype=object)
+    half = pd.Timedelta(days=OUTLIER_WINDOW_DAYS // 2 + 1)
+    lo = (pd.to_datetime(frame["trade_date"]).min() - half).strftime("%Y-%m-%d")
+    hi = (pd.to_datetime(frame["trade_date"]).max() + half).strftime("%Y-%m-%d")
+    ids = frame["complex_id"].unique().tolist()
+
+    # 과거 연도 백필이면 창 범위의 cold 파티션까지 함께 읽음 (기간이 hot 안이면 SQLite만 조회)
+    from services.db_svc import db_svc
+    from services.partition_store import read_rows
+    existing = read_rows(cursor, db_svc.db_path, "transactions",
+                         ["complex_id", "trade_date", "area_sqm", "floor", "price_won"], lo, hi, ids)
+
+    new = frame[["complex_id", "trade_date", "area_sqm", "floor", "price_won"]].assign(_row=frame.index)
+    history = pd.concat([existing.assign(_row=-1), new], ignore_index=True)
+    # 재적재 시 같은 거래가 두 번 세어지지 않도록 자연키 기준 중복 제거 (이번 프레임 쪽을 남김)
+    history = history.drop_duplicates(["complex_id", "trade_date", "area_sqm", "floor", "price_won"], keep="last")
+    history["ppsqm"] = history["price_won"].astype(float) / history["area_sqm"].astype(float)
+    fenced = rolling_fences(history)
+    fenced = fenced[fenced["_row"] >= 0].set_index("_row")
+
+    k = IQR_K
+    if "trade_type" in frame:
+        k = pd.Series(np.where(frame["trade_type"] == "직거래", IQR_K_DIRECT, IQR_K), index=frame.index)
+        k = k.reindex(fenced.index)
+    lower = fenced["q1"] - k * fenced["iqr"]
+    upper = fenced["q3"] + k * fenced["iqr"]
+    hit = (fenced["ppsqm"] < lower) | (fenced["ppsqm"] > upper)
+    detail = ("ppsqm=" + fenced["ppsqm"].round(1).astype(str) + " fence=[" + lower.round(1).astype(str)
+              + ", " + upper.round(1).astype(str) + "]").where(hit, None)
+    detail = detail.reindex(frame.index)
+    # 이미 적재된 거래는 재적재 시 울타리가 달라져도 격리하지 않음 (적재 단계에서 중복으로 건너뜀)
+    key = ["complex_id", "trade_date", "area_sqm", "floor", "price_won"]
+    loaded = pd.MultiIndex.from_frame(new[key]).isin(pd.MultiIndex.from_frame(existing[key]))
+    return detail.where(~loaded, None)
+
+def write_quarantine(cursor, rows, kind, source_file, amount_col="price_won"):
+    """거부된 행을 quarantine 테이블에 기록 (rows에는 reason 컬럼 필요). 사유별 새로 기록된 건수 dict 반환"""
+    if rows.empty:
+        return 0
+    out = pd.DataFrame({
+        "kind": kind,
+        "reason": rows["reason"],
+        "source_file": source_file,
+        "complex_name": rows["complex_name"],
+        "dong": rows["dong"],
+        "trade_date": rows["trade_date"],
+        "area_sqm": rows["area_sqm"],
+        "floor": rows["floor"],
+        "amount_won": rows[amount_col],
+        "monthly_rent_won": rows["monthly_rent_won"] if "monthly_rent_won" in rows else None,
+        "detail": rows["detail"] if "detail" in rows else None,
+        "quarantined_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }).astype(object)
+    out = out.where(out.notna(), None)
+    # 자연키 + 사유가 이미 격리된 행(다른 파일로 재적재된 같은 거래)은 건너뜀 (ux_quarantine_natural)
+    written = {}
+    for reason, group in out.groupby("reason", sort=False):
+        cursor.executemany(f"""
+            INSERT INTO quarantine ({", ".join(QUARANTINE_COLUMNS)})
+            VALUES ({", ".join("?" * len(QUARANTINE_COLUMNS))})
+            ON CONFLICT DO NOTHING
+        """, group[QUARANTINE_COLUMNS].itertuples(index=False, name=None))
+        written[reason] = cursor.rowcount
+    return written
+
+def quarantine_legacy_rows(conn):
+    """
+    v5.1 이전 적재분 중 날짜/면적 오류 행과 층 미기록 중복 행을 transactions에서 quarantine으로 이동 (1회)
+    영향을 받은 (complex_id, area_bucket) 키 집합 반환 (rt_stats 재계산용)
+    """
+    cursor = conn.cursor()
+    # (사유 SQL 식, 조건, 파라미터)
+    checks = [
+        (f"'{REASON_BAD_DATE}'", "t.trade_date IS NULL OR date(t.trade_date) IS NOT t.trade_date "
+                                 "OR t.trade_date < ? OR t.trade_date > date('now', 'localtime')", (MIN_TRADE_DATE,)),
+        (f"'{REASON_BAD_AREA}'", "t.area_sqm IS NULL OR t.area_sqm < ? OR t.area_sqm > ?", (MIN_AREA_SQM, MAX_AREA_SQM)),
+        (f"'{REASON_BAD_PRICE}'", "t.price_won IS NULL OR t.price_won <= 0", ()),
+        # 층 정보 없이 적재된 구버전 행: 같은 거래가 층과 함께 다시 적재되어 있으면 중복
+        (f"'{REASON_DUPLICATE}'", """t.floor = 0 AND EXISTS (
+                                       SELECT 1 FROM transactions d
+                                       WHERE d.complex_id = t.complex_id AND d.trade_date = t.trade_date
+                                         AND d.area_sqm = t.area_sqm AND d.price_won = t.price_won AND d.floor <> 0)""", ()),
+        # 재적재 시 해제/이상치로 격리된 거래의 구버전 사본은 같은 사유로 격리
+        ("""(SELECT q.reason FROM quarantine q
+             WHERE q.kind = 'sale' AND q.source_file <> 'legacy' AND q.complex_name = m.complex_name
+               AND q.trade_date = t.trade_date AND q.area_sqm = t.area_sqm AND q.amount_won = t.price_won LIMIT 1)""",
+         "t.floor = 0", ()),
+    ]
+    from services.csv_processor import area_bucket
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    touched = set()
+    for reason_sql, cond, params in checks:
+        cursor.execute(f"""
+            SELECT * FROM (
+                SELECT t.id, {reason_sql} AS reason, t.complex_id, m.complex_name, m.dong,
+                       t.trade_date, t.area_sqm, t.floor, t.price_won
+                FROM transactions t LEFT JOIN complex_master m ON m.complex_id = t.complex_id
+                WHERE {cond}
+            ) WHERE reason IS NOT NULL
+        """, params)
+        rows = cursor.fetchall()
+        if not rows:
+            continue
+        cursor.executemany(f"""
+            INSERT INTO quarantine ({", ".join(QUARANTINE_COLUMNS)})
+            VALUES ('sale', ?, 'legacy', ?, ?, ?, ?, ?, ?, NULL, ?, ?)
+            ON CONFLICT DO NOTHING
+        """, [(reason, name, dong, t_date, area, floor, price, f"complex_id={c_id}", now)
+              for _, reason, c_id, name, dong, t_date, area, floor, price in rows])
+        cursor.executemany("DELETE FROM transactions WHERE id = ?", [(r[0],) for r in rows])
+        for r in rows:
+            if r[6] is not None:
+                touched.add((r[2], area_bucket(r[6])))
+    conn.commit()
+    return touched
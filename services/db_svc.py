@@ -1,9 +1,378 @@
+import glob
 import sqlite3
 import os
+import queue
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# 연결 풀/PRAGMA 프로파일 (v5.1): 조회마다 connect 하지 않고 같은 연결(+문장 캐시)을 재사용
+POOL_SIZE = 8                      # 유휴 연결 최대 보관 수 (초과분은 반환 시 닫음)
+STATEMENT_CACHE_SIZE = 256         # 연결별 prepared statement LRU 캐시 크기
+CACHE_SIZE_KB = 64 * 1024          # 연결별 페이지 캐시 64MB (PRAGMA cache_size 음수 = KB)
+MMAP_SIZE = 256 * 1024 * 1024      # 메모리 맵 I/O 256MB
+BUSY_TIMEOUT_MS = 5000             # 시작 시 스키마 작업 등 게시 파일을 직접 쓰는 동안의 대기
+STAGING_SUFFIX = ".staging"        # 적재 Writer가 쓰는 사본 (Writer마다 고유 이름, 완료 시 게시 파일로 원자적 교체)
+LOCK_SUFFIX = ".lock"              # Writer 간 배타 잠금 파일 (앱 백그라운드 작업 / CLI / 스크립트 등 여러 프로세스)
+DRAIN_SUFFIX = ".drain"            # 게시 교체 중 표시 파일: 있는 동안 모든 프로세스의 조회 풀이 게시 파일 연결을 내려놓음
+PUBLISH_RETRIES = 50               # 게시 파일 교체 재시도 (Windows는 열린 파일을 교체할 수 없음)
+PUBLISH_RETRY_SEC = 0.1
+
+class SnapshotConflictError(RuntimeError):
+    """스테이징 복사 이후 게시 스냅샷이 다른 Writer에 의해 바뀜 (이번 쓰기는 버림)"""
+
+def _lock_file(fd):
+    if os.name == "nt":
+        # LK_LOCK은 약 10초 재시도 후 실패하므로 잠금이 풀릴 때까지 반복
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+    fcntl.flock(fd, fcntl.LOCK_EX)
+
+def _unlock_file(fd):
+    if os.name == "nt":
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+class WriterLock:
+    """
+    게시 DB의 Writer 배타 잠금 (프로세스 간: 잠금 파일의 OS 잠금, 프로세스 안: threading.Lock)
+    프로세스가 비정상 종료해도 OS가 잠금을 풀어 주므로 남은 잠금 파일은 그대로 재사용
+    """
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                _lock_file(fd)
+            except BaseException:
+                os.close(fd)
+                raise
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._fd = fd
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            _unlock_file(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            self._thread_lock.release()
+
+class _TimedCursor(sqlite3.Cursor):
+    """execute 계열 호출 횟수/소요 시간을 풀 통계에 누적하는 커서"""
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            self.connection._pool._record((time.perf_counter() - started) * 1000)
+
+    def execute(self, *args):
+        return self._timed(sqlite3.Cursor.execute, *args)
+
+    def executemany(self, *args):
+        return self._timed(sqlite3.Cursor.executemany, *args)
+
+    def executescript(self, *args):
+        return self._timed(sqlite3.Cursor.executescript, *args)
+
+class _PooledConnection(sqlite3.Connection):
+    """close()가 실제로 닫지 않고 풀에 반납하는 연결 (진행 중 트랜잭션은 롤백)"""
+    _pool = None
+
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def executescript(self, *args):
+        return self.cursor().executescript(*args)
+
+    def close(self):
+        self._pool.release(self)
+
+class ConnectionPool:
+    """
+    게시된 DB 스냅샷에 대한 읽기 전용 연결 풀 (스레드 간 공유, 한 번에 한 스레드만 사용)
+    mode=ro&immutable=1 로 열어 잠금/변경 감지 없이 읽고, 파일이 교체(inode/mtime/크기 변화)되면
+    epoch를 올려 이전 스냅샷 연결을 버림. 열린 연결 수/쿼리 수/누적 ms를 집계
+    다른 프로세스의 Writer가 교체 표시 파일(<db>.drain)을 만들면 새 연결을 내주지 않고 반납 연결은 닫음
+    (Windows는 열린 파일을 교체할 수 없으므로 감시 스레드가 유휴 연결도 닫음)
+    """
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.db_path = db_path
+        self.drain_path = db_path + DRAIN_SUFFIX
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._signature = None
+        self._watcher = None
+        self.epoch = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {"opened": 0, "reused": 0, "closed": 0, "queries": 0, "total_ms": 0.0}
+
+    def _record(self, elapsed_ms):
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["total_ms"] += elapsed_ms
+
+    def _open(self):
+        from pathlib import Path
+        uri = f"{Path(self.db_path).as_uri()}?mode=ro&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, factory=_PooledConnection, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn._pool = self
+        conn._epoch = self.epoch
+        apply_pragmas(conn)
+        with self._lock:
+            self._stats["opened"] += 1
+            if os.name == "nt" and self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch_drain, name="db-pool-drain", daemon=True)
+                self._watcher.start()
+        return conn
+
+    def draining(self) -> bool:
+        """다른 Writer가 게시 파일을 교체하는 중인지 (교체 표시 파일 존재)"""
+        return os.path.exists(self.drain_path)
+
+    def _wait_drain(self):
+        # 교체가 끝날 때까지 대기. 비정상 종료한 Writer가 남긴 표시 파일이면 게시 재시도 시간만큼만 기다림
+        deadline = time.monotonic() + PUBLISH_RETRIES * PUBLISH_RETRY_SEC
+        while self.draining() and time.monotonic() < deadline:
+            time.sleep(PUBLISH_RETRY_SEC / 10)
+
+    def _watch_drain(self):
+        # [Windows] 요청이 없는 동안에도 유휴 연결이 게시 파일을 붙잡지 않도록 교체 표시를 주기적으로 확인
+        while True:
+            time.sleep(PUBLISH_RETRY_SEC)
+            if self._idle.qsize() and self.draining():
+                self.close_all()
+
+    def refresh(self) -> bool:
+        """게시 파일이 바뀌었으면 epoch를 올리고 유휴 연결을 닫음. 바뀌었으면 True"""
+        try:
+            st = os.stat(self.db_path)
+            signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature == self._signature:
+            return False
+        with self._lock:
+            self._signature = signature
+            self.epoch += 1
+        self.close_all()
+        return True
+
+    def acquire(self):
+        if os.getpid() != self._pid:
+            # fork된 적재 워커는 부모의 연결을 공유하지 않고 새 풀로 시작
+            self._idle = queue.LifoQueue(maxsize=self.size)
+            self._pid = os.getpid()
+        if self.draining():
+            self.close_all()
+            self._wait_drain()
+        self.refresh()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+        with self._lock:
+            self._stats["reused"] += 1
+        return conn
+
+    def release(self, conn):
+        if conn._epoch != self.epoch or self.draining():
+            # 사용 중에 새 스냅샷이 게시됨(또는 교체 중): 이전 파일을 보는 연결은 반납하지 않음
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            self._discard(conn)
+
+    def _discard(self, conn):
+        sqlite3.Connection.close(conn)
+        with self._lock:
+            self._stats["closed"] += 1
+
+    def close_all(self):
+        """유휴 연결을 모두 닫음 (DB 파일 교체/종료 시)"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+        out["idle"] = self._idle.qsize()
+        out["total_ms"] = round(out["total_ms"], 1)
+        out["avg_ms"] = round(out["total_ms"] / out["queries"], 3) if out["queries"] else None
+        return out
+
+def apply_pragmas(conn, synchronous="NORMAL"):
+    """연결 단위 PRAGMA"""
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
+def _m001_query_indexes(cursor):
+    # (complex_id, trade_date) 조회는 자연키 유니크 인덱스(ux_transactions_natural)의 앞 두 컬럼으로 처리됨
+    # (별도 인덱스를 두면 적재 시 쓰기 비용만 늘어남) + 기간 조건만 있는 전체 통계 재빌드/트렌드 조회용 거래일 인덱스
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_transactions_date ON transactions (trade_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_lease_date ON lease_transactions (trade_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_complex_alias_id ON complex_alias (complex_id)")
+
+def _m002_complex_name_fts(cursor):
+    # 단지명 부분 일치 검색: complex_alias(원본명 + 정규화명) 위 FTS5 trigram 색인
+    # FTS5/trigram 미지원 SQLite(3.34 미만)에서는 건너뛰고 LIKE 검색으로 동작
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS complex_alias_fts
+            USING fts5(alias, complex_id UNINDEXED, tokenize = 'trigram')
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 trigram unavailable, using LIKE search: {e}")
+        return
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS complex_alias_fts_ai AFTER INSERT ON complex_alias BEGIN
+            INSERT INTO complex_alias_fts (alias, complex_id) VALUES (new.alias, new.complex_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS complex_alias_fts_ad AFTER DELETE ON complex_alias BEGIN
+            DELETE FROM complex_alias_fts WHERE alias = old.alias AND complex_id = old.complex_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS complex_alias_fts_au AFTER UPDATE ON complex_alias BEGIN
+            DELETE FROM complex_alias_fts WHERE alias = old.alias AND complex_id = old.complex_id;
+            INSERT INTO complex_alias_fts (alias, complex_id) VALUES (new.alias, new.complex_id);
+        END
+    """)
+    cursor.execute("DELETE FROM complex_alias_fts")
+    cursor.execute("INSERT INTO complex_alias_fts (alias, complex_id) SELECT DISTINCT alias, complex_id FROM complex_alias")
+
+def _m003_snapshot_meta(cursor):
+    # 게시 스냅샷 세대 번호 (캐시 무효화 키). write_snapshot() 게시마다 1 증가
+    cursor.execute("CREATE TABLE IF NOT EXISTS snapshot_meta (key TEXT PRIMARY KEY, value TEXT)")
+    cursor.execute("INSERT OR IGNORE INTO snapshot_meta (key, value) VALUES ('generation', '0')")
+
+def _m004_partition_manifest(cursor):
+    # 연도별 cold 파티션(Parquet) 목록. 스냅샷과 함께 게시되어 조회 시점의 파일 집합이 항상 일관됨
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS partition_manifest (
+            table_name TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            file TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            min_date TEXT NOT NULL,
+            max_date TEXT NOT NULL,
+            PRIMARY KEY (table_name, year)
+        )
+    """)
+
+def _m005_monthly_stats(cursor):
+    # 월별 매매 통계: (동, 단지, 면적버킷, 월) 칸 + 'ALL' 상위 집계(단지 전체 / 동 전체 / 전체).
+    # 트렌드 차트는 원본 거래 대신 이 표를 읽음 (적재 시 바뀐 달만 재계산)
+    # 칸 수가 거래 수에 가까우므로 별도 인덱스 없이 기본키 순서로 저장 (단지 조회도 동을 붙여 기본키로 탐색)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_stats (
+            dong TEXT NOT NULL,
+            complex_id TEXT NOT NULL,
+            area_bucket TEXT NOT NULL,
+            month TEXT NOT NULL,
+            median_won INTEGER NOT NULL,
+            mean_won REAL NOT NULL,
+            count INTEGER NOT NULL,
+            mean_ppp REAL NOT NULL,
+            last_updated TEXT NOT NULL,
+            PRIMARY KEY (dong, complex_id, area_bucket, month)
+        ) WITHOUT ROWID
+    """)
+
+def _m006_monthly_sketch(cursor):
+    # 월별 칸의 가격 분위수 스케치 (병합해서 임의 기간/여러 칸의 중위가·IQR 계산, services.quantile_sketch)
+    existing = {r[1] for r in cursor.execute("PRAGMA table_info(monthly_stats)").fetchall()}
+    if "sketch" not in existing:
+        cursor.execute("ALTER TABLE monthly_stats ADD COLUMN sketch BLOB")
+
+def _m007_decay_stats(cursor):
+    # 단지·면적 버킷별 시간 감쇠 가격 상태 (services.decay_stats.DecayedLevel 직렬화). 반감기 설정별로 보관
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS decay_stats (
+            complex_id TEXT NOT NULL,
+            area_bucket TEXT NOT NULL,
+            half_life_days REAL NOT NULL,
+            state BLOB NOT NULL,
+            last_updated TEXT NOT NULL,
+            PRIMARY KEY (complex_id, area_bucket, half_life_days)
+        )
+    """)
+
+QUARANTINE_KEY_NULLABLE = ["complex_name", "dong", "trade_date", "area_sqm", "floor", "amount_won", "monthly_rent_won"]
+
+def _m008_quarantine_natural_key(cursor):
+    # 격리 행 자연키(종류, 사유, 단지명, 동, 거래일, 면적, 층, 금액) 유니크 인덱스: 같은 거래를 다른 파일(해시)로
+    # 재적재해도 격리 건수가 늘지 않도록 ON CONFLICT DO NOTHING 대상으로 사용.
+    # NULL끼리는 UNIQUE에서 서로 다른 값이므로 IFNULL 식으로 묶음 (detail/출처 파일/시각은 키에서 제외)
+    key = ", ".join(["kind", "reason"] + [f"IFNULL({c}, '')" for c in QUARANTINE_KEY_NULLABLE])
+    cursor.execute(f"DELETE FROM quarantine WHERE id NOT IN (SELECT MIN(id) FROM quarantine GROUP BY {key})")
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_quarantine_natural ON quarantine ({key})")
+
+# 버전 관리 마이그레이션 (PRAGMA user_version 기준, v5.1). 새 스키마 변경은 목록 끝에 추가
+MIGRATIONS = [
+    (1, "거래/전월세 조회 인덱스", _m001_query_indexes),
+    (2, "단지명 FTS5 trigram 검색", _m002_complex_name_fts),
+    (3, "스냅샷 세대 메타", _m003_snapshot_meta),
+    (4, "연도 파티션 manifest", _m004_partition_manifest),
+    (5, "월별 매매 통계", _m005_monthly_stats),
+    (6, "월별 분위수 스케치", _m006_monthly_sketch),
+    (7, "시간 감쇠 가격 상태", _m007_decay_stats),
+    (8, "격리 행 자연키 유니크", _m008_quarantine_natural_key),
+]
+
 class DatabaseService:
     def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = os.environ.get("MARKET_DB_PATH")  # 벤치마크/테스트용 DB 경로 지정 (v5.1)
         if db_path is None:
             # Pathlib을 사용하여 경로를 더 견고하게 잡음
             from pathlib import Path
@@ -12,15 +381,51 @@ class DatabaseService:
         else:
             self.db_path = os.path.abspath(db_path)
             
+        self.pool = ConnectionPool(self.db_path)
+        self._write_lock = WriterLock(self.db_path + LOCK_SUFFIX)
+        self._generation = (None, None)  # (pool epoch, generation)
         self._init_db()
 
     def _init_db(self):
+        """
+        스키마 생성/마이그레이션/1회성 정리·백필. 조회 연결이 immutable로 열고 있는 게시 파일을 직접 고치지 않도록
+        할 일이 있을 때만 write_snapshot()으로 적용해 게시 (이미 최신이면 스냅샷 복사 없이 시작)
+        """
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        
-        # PRAGMA 설정으로 성능 및 무결성 강화
-        conn.execute("PRAGMA foreign_keys = ON")
-        
+        if not self._needs_init():
+            return
+        with self.write_snapshot() as conn:
+            self._init_schema(conn)
+
+    def _needs_init(self) -> bool:
+        if not os.path.exists(self.db_path) or os.path.getsize(self.db_path) == 0:
+            return True
+        from services.complex_registry import has_legacy_ids
+        conn = self.get_connection()
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < MIGRATIONS[-1][0]:
+                return True
+            return has_legacy_ids(conn.cursor()) or bool(self._pending_backfills(conn))
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _pending_backfills(conn) -> set:
+        """도입 전 DB에 1회 전체 빌드가 필요한 파생 테이블 ({"monthly", "decay"} 부분집합)"""
+        from services.decay_stats import HALF_LIFE_DAYS
+        if conn.execute("SELECT 1 FROM transactions LIMIT 1").fetchone() is None:
+            return set()
+        pending = set()
+        # 월별 통계(스케치 포함) 도입 전 DB
+        if conn.execute("SELECT 1 FROM monthly_stats WHERE sketch IS NOT NULL LIMIT 1").fetchone() is None:
+            pending.add("monthly")
+        # 감쇠 상태 도입 전 DB 또는 반감기 설정 변경
+        if conn.execute("SELECT 1 FROM decay_stats WHERE half_life_days = ? LIMIT 1", (HALF_LIFE_DAYS,)).fetchone() is None:
+            pending.add("decay")
+        return pending
+
+    def _init_schema(self, conn):
+        """[write_snapshot 연결 전용] 모든 단계는 멱등 (이미 적용된 DB에서는 변경 없음)"""
         cursor = conn.cursor()
         
         # 1. Complex Master
@@ -62,19 +467,277 @@ class DatabaseService:
             )
         """)
 
+        # 2-1. 거래 자연키 유니크 인덱스 (행 단위 멱등 적재, v5.1)
+        # 인덱스 생성 전 기존 중복 행을 정리해야 UNIQUE 제약을 걸 수 있음
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_transactions_natural'")
+        if not cursor.fetchone():
+            cursor.execute("""
+                DELETE FROM transactions WHERE id NOT IN (
+                    SELECT MIN(id) FROM transactions
+                    GROUP BY complex_id, trade_date, area_sqm, floor, price_won
+                )
+            """)
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS ux_transactions_natural
+                ON transactions (complex_id, trade_date, area_sqm, floor, price_won)
+            """)
+
+        # 3-1. rt_stats 확장 컬럼 (v5.1 다기간 통계: 평당가 평균 / 최저 / 최고)
+        existing = {r[1] for r in cursor.execute("PRAGMA table_info(rt_stats)").fetchall()}
+        for col, ddl in [("mean_ppp", "REAL"), ("min_won", "INTEGER"), ("max_won", "INTEGER")]:
+            if col not in existing:
+                cursor.execute(f"ALTER TABLE rt_stats ADD COLUMN {col} {ddl}")
+
+        # 3-2. 단지명 별칭 -> 결정적 complex_id (v5.1)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS complex_alias (
+                alias TEXT NOT NULL,
+                dong TEXT NOT NULL,
+                complex_id TEXT NOT NULL,
+                PRIMARY KEY (alias, dong),
+                FOREIGN KEY (complex_id) REFERENCES complex_master(complex_id)
+            )
+        """)
+
         # 4. Ingested Files Tracking (v4.30 Accurate Mode)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS ingested_files (
                 sha256 TEXT PRIMARY KEY,
                 file_path TEXT,
-                ingested_at TEXT NOT NULL
+                ingested_at TEXT NOT NULL,
+                kind TEXT
+            )
+        """)
+        # kind: sale / lease (NULL = v5.0 이전 매매 경로로 적재된 파일)
+        existing = {r[1] for r in cursor.execute("PRAGMA table_info(ingested_files)").fetchall()}
+        if "kind" not in existing:
+            cursor.execute("ALTER TABLE ingested_files ADD COLUMN kind TEXT")
+        # 파일 크기/mtime 지문: 변경 없는 파일은 sha256 재계산 없이 건너뜀 (v5.1)
+        if "file_size" not in existing:
+            cursor.execute("ALTER TABLE ingested_files ADD COLUMN file_size INTEGER")
+        if "file_mtime_ns" not in existing:
+            cursor.execute("ALTER TABLE ingested_files ADD COLUMN file_mtime_ns INTEGER")
+
+        # 5. Lease Transactions (전월세 전용, v5.1)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lease_transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                complex_id TEXT NOT NULL,
+                trade_date TEXT NOT NULL,
+                area_sqm REAL NOT NULL,
+                floor INTEGER,
+                deposit_won INTEGER NOT NULL,
+                monthly_rent_won INTEGER NOT NULL DEFAULT 0,
+                lease_type TEXT NOT NULL,
+                contract_start TEXT,
+                contract_end TEXT,
+                contract_type TEXT,
+                renewal_used INTEGER NOT NULL DEFAULT 0,
+                prev_deposit_won INTEGER,
+                prev_monthly_won INTEGER,
+                FOREIGN KEY (complex_id) REFERENCES complex_master(complex_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_lease_natural
+            ON lease_transactions (complex_id, trade_date, area_sqm, floor, deposit_won, monthly_rent_won)
+        """)
+
+        # 6. Lease Stats (단지/면적버킷별 전세가율·전월세 전환율 사전 계산, area_bucket='ALL'은 단지 전체)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lease_stats (
+                complex_id TEXT NOT NULL,
+                area_bucket TEXT NOT NULL,
+                window_days INTEGER NOT NULL,
+                jeonse_ratio REAL,
+                conversion_rate REAL,
+                jeonse_count INTEGER NOT NULL,
+                wolse_count INTEGER NOT NULL,
+                sale_count INTEGER NOT NULL,
+                jeonse_median_won REAL,
+                wolse_deposit_median_won REAL,
+                wolse_rent_median_won REAL,
+                last_updated TEXT NOT NULL,
+                PRIMARY KEY (complex_id, area_bucket, window_days)
             )
         """)
+
+        # 7. Quarantine (품질 검증에서 걸러진 행 + 사유 코드, v5.1)
+        has_quarantine = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'quarantine'").fetchone() is not None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS quarantine (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                source_file TEXT,
+                complex_name TEXT,
+                dong TEXT,
+                trade_date TEXT,
+                area_sqm REAL,
+                floor INTEGER,
+                amount_won INTEGER,
+                monthly_rent_won INTEGER,
+                detail TEXT,
+                quarantined_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_quarantine_source ON quarantine (source_file)")
         
         conn.commit()
-        conn.close()
+        self._migrate(conn)
+
+        # 구버전 hash() 기반 단지 ID 재매핑
+        from services.complex_registry import migrate_legacy_ids
+        migrate_legacy_ids(conn)
+        if not has_quarantine:
+            # 품질 검증 도입 전 적재분(날짜/면적 오류, 층 미기록 중복)을 1회 격리하고 해당 통계 재계산
+            from services.data_quality import quarantine_legacy_rows
+            from services.csv_processor import build_db_stats
+            touched = quarantine_legacy_rows(conn)
+            if touched:
+                build_db_stats(conn, touched)
+        pending = self._pending_backfills(conn)
+        if "monthly" in pending:
+            # cold 파티션 포함 1회 전체 빌드
+            from services.csv_processor import build_monthly_stats
+            build_monthly_stats(conn, db_path=self.db_path)
+        if "decay" in pending:
+            from services.decay_stats import build_decay_stats
+            build_decay_stats(conn, db_path=self.db_path)
+
+    def _migrate(self, conn):
+        """user_version 이후의 마이그레이션을 버전별 트랜잭션으로 순서대로 적용"""
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, desc, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                migrate(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"DB migration {version} applied: {desc}")
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """
+        게시된 스냅샷의 읽기 전용 연결을 풀에서 꺼냄. 사용 후 close()하면 닫지 않고 풀에 반납
+        (쓰기는 write_snapshot() 사용)
+        """
+        return self.pool.acquire()
+
+    def generation(self) -> int:
+        """현재 게시 스냅샷의 세대 번호 (조회 결과 캐시 키로 사용)"""
+        self.pool.refresh()
+        epoch, generation = self._generation
+        if epoch != self.pool.epoch:
+            conn = self.get_connection()
+            try:
+                row = conn.execute("SELECT value FROM snapshot_meta WHERE key = 'generation'").fetchone()
+            finally:
+                conn.close()
+            generation = int(row[0]) if row else 0
+            self._generation = (self.pool.epoch, generation)
+        return generation
+
+    @staticmethod
+    def _file_generation(conn):
+        """연결한 DB 파일의 세대 번호 (snapshot_meta 도입 전/빈 DB는 0)"""
+        try:
+            row = conn.execute("SELECT value FROM snapshot_meta WHERE key = 'generation'").fetchone()
+        except sqlite3.OperationalError:
+            return 0
+        return int(row[0]) if row else 0
+
+    def _published_generation(self):
+        """게시 파일의 현재 세대 번호 (파일이 없으면 None)"""
+        if not os.path.exists(self.db_path):
+            return None
+        from pathlib import Path
+        conn = sqlite3.connect(f"{Path(self.db_path).as_uri()}?mode=ro", uri=True)
+        try:
+            return self._file_generation(conn)
+        finally:
+            conn.close()
+
+    def _publish(self, staging_path):
+        # Windows는 열린 파일을 교체할 수 없으므로 교체 표시 파일로 모든 프로세스의 조회 풀에 연결을 내려놓게 함
+        # (이 프로세스 유휴 연결은 직접 닫고, 다른 프로세스는 감시 스레드/반납 시점에 닫음)
+        open(self.pool.drain_path, "w").close()
+        try:
+            for attempt in range(PUBLISH_RETRIES):
+                self.pool.close_all()
+                try:
+                    os.replace(staging_path, self.db_path)
+                    return
+                except PermissionError:
+                    # 사용 중인 연결이 반납될 때까지 재시도
+                    if attempt == PUBLISH_RETRIES - 1:
+                        raise
+                    time.sleep(PUBLISH_RETRY_SEC)
+        finally:
+            os.remove(self.pool.drain_path)
+
+    @contextmanager
+    def write_snapshot(self):
+        """
+        쓰기 작업용 스테이징 연결 (v5.1)
+        게시 파일을 Writer별 스테이징 파일로 복사(backup API)해 쓰고, 정상 종료 시 세대 번호를 올려
+        os.replace로 원자적으로 교체. 조회 쪽은 교체 전까지 이전 스냅샷을 잠금 없이 계속 읽음.
+        예외 시 스테이징 파일을 버리므로 게시 파일은 변경되지 않음.
+        매 호출마다 게시 DB 전체를 복사하므로 비용은 DB 크기에 비례 (작은 쓰기는 묶어서 한 번에 호출)
+        Writer는 프로세스를 넘어 한 번에 하나 (잠금 파일), 복사 후 게시 세대가 바뀌었으면 SnapshotConflictError
+        """
+        with self._write_lock:
+            # 잠금을 쥔 동안 다른 스테이징은 비정상 종료한 Writer가 남긴 것
+            for stale in glob.glob(glob.escape(self.db_path) + "*" + STAGING_SUFFIX):
+                os.remove(stale)
+            if self.pool.draining():
+                os.remove(self.pool.drain_path)
+            fd, staging_path = tempfile.mkstemp(prefix=os.path.basename(self.db_path) + ".", suffix=STAGING_SUFFIX,
+                                                dir=os.path.dirname(self.db_path))
+            os.close(fd)
+            base_generation = None
+            conn = None
+            try:
+                conn = sqlite3.connect(staging_path)
+                if os.path.exists(self.db_path):
+                    source = sqlite3.connect(self.db_path)
+                    try:
+                        base_generation = self._file_generation(source)
+                        source.backup(conn)
+                    finally:
+                        source.close()
+                # 스테이징은 실패 시 버리는 파일이므로 fsync는 게시 직전 1회만
+                conn.execute("PRAGMA journal_mode = MEMORY")
+                apply_pragmas(conn, synchronous="OFF")
+                yield conn
+                conn.commit()
+                conn.execute("""
+                    UPDATE snapshot_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'
+                """)
+                conn.commit()
+                conn.close()
+                with open(staging_path, "rb+") as f:
+                    os.fsync(f.fileno())
+                # 잠금을 따르지 않는 Writer(구버전 프로세스 등)가 그 사이 게시했으면 덮어쓰지 않음
+                if self._published_generation() != base_generation:
+                    raise SnapshotConflictError(f"published snapshot changed during write: {self.db_path}")
+                self._publish(staging_path)
+            except BaseException:
+                if conn is not None:
+                    conn.close()
+                if os.path.exists(staging_path):
+                    os.remove(staging_path)
+                raise
+        self.pool.refresh()
+
+    def connection_stats(self) -> dict:
+        """연결 풀 카운터 (opened/reused/queries/total_ms/avg_ms)"""
+        return self.pool.stats()
 
 db_svc = DatabaseService()
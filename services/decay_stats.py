@@ -0,0 +1,212 @@
+import math
+import os
+import struct
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from services.quantile_sketch import GAMMA, sketch_keys
+
+# 시간 감쇠 가격 수준 (v5.1): 거래 가중치 = 2^(-경과일 / 반감기). rt_stats의 평평한 기간 창 대신 최근 거래를 더 크게 반영
+HALF_LIFE_DAYS = float(os.environ.get("MOLIT_DECAY_HALF_LIFE_DAYS", "180"))
+# 기준일 대비 지수가 이 값을 넘으면 기준일을 옮겨 가중치를 다시 스케일 (float 오버플로 방지, 드물게 O(구간 수))
+REBASE_EXPONENT = 64.0
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+_HEADER = struct.Struct("<qddddq")  # anchor_day, sum_w, sum_wx, min, max, count
+
+def day_numbers(dates) -> np.ndarray:
+    """'YYYY-MM-DD' -> 1970-01-01 기준 일수 (int64)"""
+    return pd.to_datetime(pd.Series(dates), format="%Y-%m-%d", errors="coerce").to_numpy("datetime64[D]").astype("int64")
+
+def today_number(today=None) -> int:
+    return (today or datetime.now().date()).toordinal() - EPOCH_ORDINAL
+
+class DecayedLevel:
+    """
+    단지·면적 버킷 하나의 지수 시간가중 가격 상태.
+    가중치를 기준일(anchor) 대비 2^((거래일 - anchor) / 반감기)로 저장해 새 거래는 합계/로그 구간에 더하기만 함 (건당 O(1)),
+    조회 시점의 감쇠는 공통 배수라 수준(가중 중위가/평균)에는 영향이 없고 유효 표본 수에만 곱함.
+    늦게 신고된 과거 거래도 같은 식(음수 지수)으로 그대로 반영
+    """
+    __slots__ = ("half_life", "anchor", "sum_w", "sum_wx", "bins", "min", "max", "count")
+
+    def __init__(self, half_life_days=HALF_LIFE_DAYS):
+        self.half_life = float(half_life_days)
+        self.anchor = None
+        self.sum_w = 0.0
+        self.sum_wx = 0.0
+        self.bins = {}  # 가격 로그 구간 번호(quantile_sketch) -> 가중치 합
+        self.min = math.inf
+        self.max = -math.inf
+        self.count = 0
+
+    def _rebase(self, day):
+        scale = 2.0 ** ((self.anchor - day) / self.half_life)
+        self.sum_w *= scale
+        self.sum_wx *= scale
+        # 0으로 내려간(수십 반감기 이전) 구간은 버려 상태 크기를 유지
+        self.bins = {k: w * scale for k, w in self.bins.items() if w * scale > 0.0}
+        self.anchor = day
+
+    def add(self, day, price) -> "DecayedLevel":
+        """거래 1건 반영 (day: 1970-01-01 기준 일수)"""
+        if self.anchor is None:
+            self.anchor = day
+        elif (day - self.anchor) / self.half_life > REBASE_EXPONENT:
+            self._rebase(day)
+        w = 2.0 ** ((day - self.anchor) / self.half_life)
+        self.sum_w += w
+        self.sum_wx += w * price
+        k = int(sketch_keys([price])[0])
+        self.bins[k] = self.bins.get(k, 0.0) + w
+        self.min = min(self.min, float(price))
+        self.max = max(self.max, float(price))
+        self.count += 1
+        return self
+
+    def add_many(self, days, prices) -> "DecayedLevel":
+        """여러 건을 한 번에 반영 (add를 반복한 것과 같은 상태, 적재/재빌드용 벡터 경로)"""
+        days = np.asarray(days, dtype="int64")
+        prices = np.asarray(prices, dtype="float64")
+        if not len(days):
+            return self
+        if self.anchor is None:
+            self.anchor = int(days.min())
+        top = int(days.max())
+        if (top - self.anchor) / self.half_life > REBASE_EXPONENT:
+            self._rebase(top)
+        w = np.exp2((days - self.anchor) / self.half_life)
+        self.sum_w += float(w.sum())
+        self.sum_wx += float((w * prices).sum())
+        keys, inverse = np.unique(sketch_keys(prices), return_inverse=True)
+        for k, wk in zip(keys.tolist(), np.bincount(inverse, weights=w).tolist()):
+            self.bins[k] = self.bins.get(k, 0.0) + wk
+        self.min = min(self.min, float(prices.min()))
+        self.max = max(self.max, float(prices.max()))
+        self.count += len(days)
+        return self
+
+    def quantiles(self, qs) -> list:
+        """가중 분위수 (누적 가중치가 q 이상이 되는 구간의 대표값, 상대 오차 quantile_sketch.RELATIVE_ACCURACY 이내)"""
+        if self.sum_w <= 0:
+            return [None] * len(qs)
+        keys = sorted(self.bins)
+        cum = np.cumsum([self.bins[k] for k in keys])
+        out = []
+        for q in qs:
+            i = min(int(np.searchsorted(cum, q * cum[-1], side="left")), len(keys) - 1)
+            out.append(min(max(2 * GAMMA ** keys[i] / (GAMMA + 1), self.min), self.max))
+        return out
+
+    def summary(self, today=None) -> dict:
+        """
+        조회 시점 기준 요약. level: 시간가중 중위가, ess: 유효 표본 수(오늘 거래 1건 = 1, 반감기마다 절반),
+        iqr: 시간가중 사분위 범위, mean: 시간가중 평균
+        """
+        if self.count == 0 or self.sum_w <= 0:
+            return None
+        q1, level, q3 = self.quantiles((0.25, 0.5, 0.75))
+        ess = self.sum_w * 2.0 ** ((self.anchor - today_number(today)) / self.half_life)
+        return {
+            "level": float(int(level)),
+            "mean": round(self.sum_wx / self.sum_w, 1),
+            # 표본 4건 미만은 IQR 신뢰 불가 -> 0 (rt_stats와 동일)
+            "iqr": float(int(q3 - q1)) if self.count >= 4 else 0.0,
+            "ess": round(ess, 3),
+            "count": self.count,
+            "half_life_days": self.half_life,
+        }
+
+    def to_bytes(self) -> bytes:
+        keys = np.fromiter(self.bins.keys(), "int64", len(self.bins))
+        weights = np.fromiter(self.bins.values(), "float64", len(self.bins))
+        return (_HEADER.pack(self.anchor, self.sum_w, self.sum_wx, self.min, self.max, self.count)
+                + keys.astype("<i2").tobytes() + weights.astype("<f8").tobytes())
+
+    @classmethod
+    def from_bytes(cls, blob, half_life_days=HALF_LIFE_DAYS) -> "DecayedLevel":
+        state = cls(half_life_days)
+        state.anchor, state.sum_w, state.sum_wx, state.min, state.max, state.count = _HEADER.unpack_from(blob)
+        n = (len(blob) - _HEADER.size) // 10
+        keys = np.frombuffer(blob, "<i2", n, _HEADER.size).tolist()
+        weights = np.frombuffer(blob, "<f8", n, _HEADER.size + 2 * n).tolist()
+        state.bins = dict(zip(keys, weights))
+        return state
+
+def build_decay_stats(conn, keys=None, since_id=None, db_path=None, half_life_days=HALF_LIFE_DAYS):
+    """
+    decay_stats 갱신 (반감기별 (complex_id, area_bucket) 상태)
+    - since_id 지정: transactions.id > since_id 인 새 거래만 기존 상태에 누적 (과거 거래를 다시 읽지 않음)
+    - keys 지정: 해당 (complex_id, area_bucket) 상태를 전체 이력(hot + cold)으로 다시 만듦
+    - 둘 다 None: 전체 재빌드
+    반환: 갱신한 상태 수
+    """
+    from services.csv_processor import TX_COLUMNS, area_buckets
+    from services.partition_store import hot_cutoff, read_rows
+    if db_path is None:
+        from services.db_svc import db_svc
+        db_path = db_svc.db_path
+    cursor = conn.cursor()
+    if since_id is not None:
+        cursor.execute(f"SELECT {', '.join(TX_COLUMNS)} FROM transactions WHERE id > ?", (since_id,))
+        df = pd.DataFrame(cursor.fetchall(), columns=TX_COLUMNS)
+    elif keys is not None:
+        if not keys:
+            return 0
+        df = read_rows(cursor, db_path, "transactions", TX_COLUMNS, complex_ids={c_id for c_id, _ in keys})
+    else:
+        df = read_rows(cursor, db_path, "transactions", TX_COLUMNS)
+    if since_id is None:
+        # 압축 전 과거 연도 재적재분은 hot/cold 양쪽에 있을 수 있어 자연키로 한 번만 반영
+        df = df.drop_duplicates(TX_COLUMNS)
+    df = df.assign(area_bucket=area_buckets(df["area_sqm"]) if not df.empty else pd.Series(dtype=str),
+                   day=day_numbers(df["trade_date"]) if not df.empty else pd.Series(dtype="int64"))
+    if keys is not None and since_id is None and not df.empty:
+        df = df[pd.MultiIndex.from_frame(df[["complex_id", "area_bucket"]]).isin(list(keys))]
+
+    states, rebuilt = {}, 0
+    if since_id is not None and not df.empty:
+        # cold로 옮겨진 연도를 다시 적재한 거래는 Parquet 쪽과 중복일 수 있어 해당 키만 전체 이력으로 재빌드
+        stale = set(df.loc[df["trade_date"] < hot_cutoff(), ["complex_id", "area_bucket"]].itertuples(index=False, name=None))
+        if stale:
+            rebuilt = build_decay_stats(conn, keys=stale, db_path=db_path, half_life_days=half_life_days)
+            df = df[~pd.MultiIndex.from_frame(df[["complex_id", "area_bucket"]]).isin(list(stale))]
+    if since_id is not None:
+        if df.empty:
+            conn.commit()
+            return rebuilt
+        # 새 거래가 들어온 키의 기존 상태를 읽어 이어서 누적
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS decay_keys (complex_id TEXT, area_bucket TEXT, PRIMARY KEY (complex_id, area_bucket))")
+        cursor.execute("DELETE FROM decay_keys")
+        cursor.executemany("INSERT OR IGNORE INTO decay_keys VALUES (?, ?)",
+                           df[["complex_id", "area_bucket"]].drop_duplicates().itertuples(index=False, name=None))
+        cursor.execute("""
+            SELECT s.complex_id, s.area_bucket, s.state FROM decay_keys k CROSS JOIN decay_stats s
+              ON s.complex_id = k.complex_id AND s.area_bucket = k.area_bucket AND s.half_life_days = ?
+        """, (half_life_days,))
+        states = {(c_id, bucket): DecayedLevel.from_bytes(blob, half_life_days) for c_id, bucket, blob in cursor.fetchall()}
+    elif keys is None:
+        cursor.execute("DELETE FROM decay_stats WHERE half_life_days = ?", (half_life_days,))
+    else:
+        # 지정 키는 거래가 모두 빠졌을 수 있으므로 먼저 지움
+        cursor.executemany("DELETE FROM decay_stats WHERE complex_id = ? AND area_bucket = ? AND half_life_days = ?",
+                           [(c_id, bucket, half_life_days) for c_id, bucket in keys])
+
+    if df.empty:
+        conn.commit()
+        return rebuilt
+    # (키, 거래일) 정렬 1회 후 키 경계로 잘라 누적 (그룹이 수만 개라 pandas groupby 반복을 피함)
+    codes, group_keys = pd.MultiIndex.from_frame(df[["complex_id", "area_bucket"]]).factorize()
+    days = df["day"].to_numpy("int64")
+    order = np.lexsort((days, codes))
+    codes, days, prices = codes[order], days[order], df["price_won"].to_numpy("float64")[order]
+    bounds = np.searchsorted(codes, np.arange(len(group_keys) + 1))
+    for key, lo, hi in zip(group_keys, bounds[:-1].tolist(), bounds[1:].tolist()):
+        states.setdefault(key, DecayedLevel(half_life_days)).add_many(days[lo:hi], prices[lo:hi])
+    now = datetime.now().strftime("%Y-%m-%d")
+    cursor.executemany("""
+        INSERT OR REPLACE INTO decay_stats (complex_id, area_bucket, half_life_days, state, last_updated)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(c_id, bucket, half_life_days, state.to_bytes(), now) for (c_id, bucket), state in states.items()])
+    conn.commit()
+    return rebuilt + len(states)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from pathlib import Path
 import pandas as pd
+from services.xlsx_reader import read_xlsx
 
 # Define path relative to where this script is run (likely root or pages)
 # We assume this file is in services/excel_loader.py, so we look for ../data/properties.xlsx if run from services
@@ -44,7 +45,8 @@ def load_properties_from_excel(path: Path = EXCEL_PATH) -> list[dict]:
         # For now, just raise if missing as per instructions
         raise FileNotFoundError(f"엑셀 파일이 없습니다: {path}")
 
-    df = pd.read_excel(path, sheet_name=0)
+    # openpyxl read_only 단일 패스 로드 (v5.1)
+    df = read_xlsx(path)
     # Normalize column names
     df.columns = [str(c).strip() for c in df.columns]
 
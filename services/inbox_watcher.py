@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+# 국토부 실거래가 파일을 떨궈두는 수신 폴더 / 처리 후 보관 폴더 (환경변수로 변경 가능)
+INBOX_DIR = Path(os.environ.get("MOLIT_INBOX_DIR", BASE_DIR / "data" / "inbox"))
+ARCHIVE_DIR = Path(os.environ.get("MOLIT_ARCHIVE_DIR", BASE_DIR / "data" / "archive"))
+POLL_INTERVAL_SEC = float(os.environ.get("MOLIT_INBOX_POLL_SEC", 30))
+DATA_SUFFIXES = (".csv", ".xlsx", ".xls")
+
+class InboxWatcher:
+    """
+    수신 폴더 폴링 감시자 (v5.1)
+    크기/mtime이 두 번 연속 같은(복사가 끝난) 파일만 백그라운드 적재 작업에 넘기고,
+    적재가 끝난 파일은 보관 폴더로 이동하므로 매번 전체 디렉터리를 해시하지 않음
+    """
+    def __init__(self, inbox_dir=INBOX_DIR, archive_dir=ARCHIVE_DIR, interval=POLL_INTERVAL_SEC):
+        self.inbox_dir = Path(inbox_dir)
+        self.archive_dir = Path(archive_dir)
+        self.interval = interval
+        self._seen = {}  # path -> (size, mtime_ns), 직전 폴링 시점
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_poll = None
+        self.last_enqueued = []
+
+    def _list_inbox(self) -> dict:
+        found = {}
+        if not self.inbox_dir.is_dir():
+            return found
+        for entry in os.scandir(self.inbox_dir):
+            if entry.is_file() and entry.name.lower().endswith(DATA_SUFFIXES) and not entry.name.startswith((".", "~$")):
+                st = entry.stat()
+                found[entry.path] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def pending_files(self) -> list:
+        """수신 폴더에 남아 있는 (아직 적재되지 않은) 파일 목록"""
+        return sorted(self._list_inbox())
+
+    def poll_once(self) -> list:
+        """한 번 폴링하여 안정화된 파일을 적재 작업에 등록. 등록한 파일 목록 반환"""
+        from services.ingest_job import ingest_job
+        current = self._list_inbox()
+        stable = sorted(p for p, sig in current.items() if self._seen.get(p) == sig)
+        self._seen = current
+        self.last_poll = time.strftime("%Y-%m-%d %H:%M:%S")
+        # 적재 작업이 돌고 있으면 다음 폴링에서 재시도 (단일 Writer 유지)
+        if not stable or not ingest_job.start(trigger="inbox", files=stable, archive_dir=self.archive_dir):
+            return []
+        for p in stable:
+            self._seen.pop(p, None)
+        self.last_enqueued = stable
+        return stable
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Inbox Watcher Error: {e}")
+            self._stop.wait(self.interval)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        if self.is_running():
+            return False
+        os.makedirs(self.inbox_dir, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="inbox-watcher", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+inbox_watcher = InboxWatcher()
+
+if __name__ == "__main__":
+    import sys
+    sys.path.append(str(BASE_DIR))
+    print(f"📂 감시 중: {INBOX_DIR} -> {ARCHIVE_DIR} ({POLL_INTERVAL_SEC}s 간격)")
+    inbox_watcher.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        inbox_watcher.stop()
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SUMMARY_PATH = BASE_DIR / "data" / "csv_summary.json"
+
+# 작업 상태: idle(미실행) / running / done / error
+STAGE_LABELS = {"queued": "대기", "scan": "파일 해시 검사", "ingest": "파일 적재", "stats": "통계 재계산",
+                "analytics": "분석용 사본 생성"}
+
+class IngestJobRunner:
+    """
+    실거래 CSV/Excel 적재(process_csv_files)를 백그라운드 스레드에서 실행하는 단일 작업 러너 (v5.1)
+    앱은 기존 DB로 즉시 서비스하고, 진행률/최근 실행 결과는 status()로 조회
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._state = {
+            "status": "idle",
+            "stage": None,
+            "done": 0,
+            "total": 0,
+            "current_file": None,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "trigger": None,
+            "summary": self._load_last_summary(),
+        }
+
+    @staticmethod
+    def _load_last_summary():
+        """이전 프로세스의 마지막 적재 결과 (csv_summary.json)"""
+        try:
+            with open(SUMMARY_PATH, "r", encoding="utf-8") as jf:
+                return json.load(jf)
+        except (OSError, ValueError):
+            return None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> dict:
+        with self._lock:
+            return dict(self._state)
+
+    def start(self, trigger: str = "manual", **kwargs) -> bool:
+        """적재 작업 시작. 이미 실행 중이면 False (중복 실행 방지)"""
+        with self._lock:
+            if self.is_running():
+                return False
+            self._state.update(status="running", stage="queued", done=0, total=0, current_file=None,
+                               started_at=datetime.now().isoformat(timespec="seconds"),
+                               finished_at=None, error=None, trigger=trigger)
+            self._thread = threading.Thread(target=self._run, kwargs=kwargs, name="ingest-job", daemon=True)
+            self._thread.start()
+        return True
+
+    def _progress(self, stage, done, total, file_path):
+        with self._lock:
+            self._state.update(stage=stage, done=done, total=total,
+                               current_file=os.path.basename(file_path) if file_path else None)
+
+    def _run(self, **kwargs):
+        try:
+            from services.csv_processor import process_csv_files
+            summary = process_csv_files(progress=self._progress, **kwargs)
+            # 새 스냅샷의 분석용 Parquet 사본을 미리 만들어 첫 트렌드 조회가 기다리지 않게 함
+            from services.analytics_svc import analytics_svc
+            if analytics_svc.engine == "duckdb":
+                self._progress("analytics", 0, 1, None)
+                analytics_svc.export_snapshot()
+            # 비교사례 배열도 새 세대로 교체 (교체 전까지 조회는 이전 배열 사용)
+            from services.comps_store import comps_store
+            comps_store.load()
+            result = {"status": "done", "summary": summary}
+        except Exception as e:
+            traceback.print_exc()
+            result = {"status": "error", "error": str(e)}
+        with self._lock:
+            if result["status"] == "done":
+                result["done"] = self._state["total"]
+            self._state.update(result, current_file=None,
+                               finished_at=datetime.now().isoformat(timespec="seconds"))
+
+    def wait(self, timeout=None) -> dict:
+        """작업 종료까지 대기 (스크립트/CLI용)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.status()
+
+ingest_job = IngestJobRunner()
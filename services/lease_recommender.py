@@ -24,9 +24,11 @@ def compress_price(p_str):
     except:
         return 0
 
-def recommend_jeonse_wolse(sale_price_str: str, area_pyeong: float, ai_grade: str, ai_score: float) -> dict:
+def recommend_jeonse_wolse(sale_price_str: str, area_pyeong: float, ai_grade: str, ai_score: float,
+                           complex_name: str = None) -> dict:
     """
     Calculates recommend Jeonse/Wolse ranges based on sale price and AI score.
+    If complex_name has precomputed lease_stats, the real jeonse ratio / conversion rate are used instead.
     Returns a dict with range tuples and logic notes.
     """
     # 1. Parse Sale Price (e.g. "33.5" or "33억 5000")
@@ -47,6 +49,23 @@ def recommend_jeonse_wolse(sale_price_str: str, area_pyeong: float, ai_grade: st
     elif ai_score >= 90: base_rate = 0.55
     elif ai_score >= 85: base_rate = 0.52
     
+    # 2-1. Real ratios from ingested 전월세/매매 transactions (O(1) lookup, v5.1)
+    conv_rate = 0.045
+    notes = [f"AI 전세가율 {int(base_rate*100)}% 적용", "월세전환율 4.5% 기준"]
+    if complex_name:
+        try:
+            from services.stats_svc import stats_svc
+            ratios = stats_svc.get_lease_ratios(complex_name)
+        except Exception:
+            ratios = None
+        if (ratios and ratios["jeonse_ratio"] and 0 < ratios["jeonse_ratio"] < 1.2
+                and ratios["jeonse_count"] >= 3 and ratios["sale_count"] >= 3):
+            base_rate = ratios["jeonse_ratio"]
+            notes[0] = f"실거래 전세가율 {base_rate*100:.0f}% (전세 {ratios['jeonse_count']}건 / 매매 {ratios['sale_count']}건)"
+        if ratios and ratios["conversion_rate"] and ratios["wolse_count"] >= 3:
+            conv_rate = ratios["conversion_rate"]
+            notes[1] = f"실거래 월세전환율 {conv_rate*100:.1f}% (월세 {ratios['wolse_count']}건)"
+
     jeonse_val = sale_val * base_rate
     
     # Range +/- 5%
@@ -68,7 +87,7 @@ def recommend_jeonse_wolse(sale_price_str: str, area_pyeong: float, ai_grade: st
     def calc_monthly(deposit):
         gap = jeonse_val - deposit
         if gap < 0: return 0
-        annual_rent = gap * 100000000 * 0.045 # 4.5% conversion
+        annual_rent = gap * 100000000 * conv_rate # 4.5% conversion (or real rate)
         return int(annual_rent / 12 / 10000) # Manwon
         
     m_high = calc_monthly(dep_low)
@@ -78,7 +97,7 @@ def recommend_jeonse_wolse(sale_price_str: str, area_pyeong: float, ai_grade: st
         "jeonse_range_eok": (j_low, j_high),
         "wolse_dep_range_eok": (dep_low, dep_high),
         "wolse_month_range_manwon": (m_low, m_high),
-        "notes": [f"AI 전세가율 {int(base_rate*100)}% 적용", "월세전환율 4.5% 기준"]
+        "notes": notes
     }
 
 
@@ -186,14 +205,16 @@ def render(properties=None):
     sample_area = 27
 
     p0 = None
+    p0_complex = None
     if properties:
         if isinstance(properties, list) and len(properties) > 0:
             p0 = properties[0]
         elif isinstance(properties, dict):
             # Flatten or pick first value list
-            for sublist in properties.values():
+            for complex_key, sublist in properties.items():
                 if sublist and isinstance(sublist, list) and len(sublist) > 0:
                     p0 = sublist[0]
+                    p0_complex = complex_key
                     break
         
     if p0:
@@ -207,7 +228,8 @@ def render(properties=None):
         sale_price_str=str(sample_sale),
         area_pyeong=float(sample_area or 0),
         ai_grade=str(ai_grade),
-        ai_score=float(ai_score)
+        ai_score=float(ai_score),
+        complex_name=p0_complex
     )
 
     # Intro logic
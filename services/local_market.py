@@ -63,24 +63,31 @@ class LocalMarketService:
                 return self.configs[key]
         return {"education_weight": 0.5, "risk_factors": ["일반리스크"], "district": "대치동"}
 
-    def calculate_undervalue_score_precise(self, ask_price, rt_median, rt_count, rt_iqr, bonuses=0, penalties=0):
+    def calculate_undervalue_score_precise(self, ask_price, rt_median, rt_count, rt_iqr, bonuses=0, penalties=0,
+                                           decayed=None):
         """
         [2026.2.5 MLOps Precise Version]
         score = clamp(50 + 400 * discount_rate * conf - vol_penalty + bonus - penalty)
+        decayed: stats_svc.get_decayed_level 결과 (v5.1). 있으면 기준가 = 시간가중 중위가,
+        conf는 건수 대신 유효 표본 수(ess)로 계산 (기간 창 경계에서 점수가 튀지 않음)
         """
         import math
         
-        if rt_count < 1 or rt_median <= 0:
+        use_decay = bool(decayed) and decayed["level"] > 0 and decayed["ess"] > 0
+        if not use_decay and (rt_count < 1 or rt_median <= 0):
             return 50.0, {"msg": "No transaction data"}
 
+        ref_price, ref_n, ref_iqr = ((decayed["level"], decayed["ess"], decayed["iqr"]) if use_decay
+                                     else (rt_median, rt_count, rt_iqr))
+
         # 1. Discount Rate
-        discount_rate = (rt_median - ask_price) / rt_median
+        discount_rate = (ref_price - ask_price) / ref_price
         
         # 2. Confidence (sqrt scaling)
-        conf = min(1.0, math.sqrt(rt_count / 20.0))
+        conf = min(1.0, math.sqrt(ref_n / 20.0))
         
         # 3. Volatility Penalty (IQR focus)
-        vol_penalty = max(0, min(8.0, (rt_iqr / rt_median) * 100))
+        vol_penalty = max(0, min(8.0, (ref_iqr / ref_price) * 100))
         
         # 4. Final Calculation
         impact = 400 * discount_rate * conf
@@ -96,27 +103,20 @@ class LocalMarketService:
             "vol_penalty": round(vol_penalty, 2),
             "bonus": bonuses,
             "penalty": penalties,
-            "calc_impact": round(impact, 2)
+            "calc_impact": round(impact, 2),
+            "ref_price": ref_price,
+            "ref_method": "ewma_median" if use_decay else "window"
         }
+        if use_decay:
+            evidence["ess"] = decayed["ess"]
+            evidence["half_life_days"] = decayed["half_life_days"]
         
         return round(final_score, 1), evidence
 
-    def calculate_decision_score(self, property_id, property_data):
-        import os
-        from services.stats_svc import stats_svc
-        
+    def _listing_key(self, property_data):
+        """매물 dict -> (단지명, 호가 숫자, 면적 버킷). 단건/일괄 점수 계산이 같은 통계 키를 쓰도록 분리"""
         name = property_data.get("name", "")
-        config = self.get_district_config(name)
-        
-        # 1. Map name to standard complex_id
-        name_map = {"래미안대치팰리스": "APT_RDP", "대치SK뷰": "APT_SKV", "대치은마": "APT_ENM"}
-        complex_id = "APT_RDP" # Default
-        for k, v in name_map.items():
-            if k in name:
-                complex_id = v
-                break
-        
-        # 2. Get Price and Area Bucket
+
         # Handle price string like '35억 5,000' -> numeric (using services.money_parser.money_parser if available, else simple)
         try:
             from services.money_parser import money_parser
@@ -132,10 +132,56 @@ class LocalMarketService:
         spec = property_data.get("spec", "84")
         area_match = [int(s) for s in spec.split() if s.isdigit()]
         area_bucket = area_match[0] if area_match else 84.0
+        return name, ask_price_val, area_bucket
+
+    def calculate_decision_scores(self, properties):
+        """
+        여러 매물의 의사결정 점수를 한 번에 계산 (v5.1)
+        페이지의 모든 (단지, 면적, 180/730일) 통계와 시간 감쇠 수준을 각각 1회 일괄 조회한 뒤 매물별로 점수화.
+        반환 순서는 입력 순서와 같음
+        """
+        from services.stats_svc import stats_svc
+        items = list(properties)
+        keys, decay_keys = [], []
+        for item in items:
+            name, _, area_bucket = self._listing_key(item)
+            keys += [(name, area_bucket, 180), (name, area_bucket, 730)]
+            decay_keys.append((name, area_bucket))
+        lookup = stats_svc.get_complex_stats_many(keys)
+        decay_lookup = stats_svc.get_decayed_levels_many(decay_keys)
+        return [self.calculate_decision_score(item.get("id"), item, stats_lookup=lookup, decay_lookup=decay_lookup)
+                for item in items]
 
-        # 3. Query Real Stats from stats_svc (v4.30 Upgrade)
-        stats = stats_svc.get_complex_stats(name, area_bucket)
+    def calculate_decision_score(self, property_id, property_data, stats_lookup=None, decay_lookup=None):
+        """
+        stats_lookup: calculate_decision_scores가 미리 조회한 {(단지명, 면적 버킷, 기간): 통계} (없으면 단건 조회)
+        decay_lookup: 같은 방식의 {(단지명, 면적 버킷): 시간 감쇠 수준}
+        """
+        from services.stats_svc import stats_svc
+        
+        name, ask_price_val, area_bucket = self._listing_key(property_data)
+        config = self.get_district_config(name)
         
+        # 1. Map name to standard complex_id
+        name_map = {"래미안대치팰리스": "APT_RDP", "대치SK뷰": "APT_SKV", "대치은마": "APT_ENM"}
+        complex_id = "APT_RDP" # Default
+        for k, v in name_map.items():
+            if k in name:
+                complex_id = v
+                break
+
+        # 2. Query Real Stats from stats_svc (v4.30 Upgrade)
+        # 근거 라벨(rt_median_180d)과 맞도록 180일 통계 우선, 표본이 없으면 730일로 확장
+        if stats_lookup is not None:
+            stats = stats_lookup.get((name, area_bucket, 180)) or stats_lookup.get((name, area_bucket, 730))
+        else:
+            stats = stats_svc.get_complex_stats(name, area_bucket, window_days=180)
+            if not stats:
+                stats = stats_svc.get_complex_stats(name, area_bucket, window_days=730)
+        
+        decayed = (decay_lookup.get((name, area_bucket)) if decay_lookup is not None
+                   else stats_svc.get_decayed_level(name, area_bucket))
+
         if stats:
             rt_median = stats["median"]
             rt_count = stats["count"]
@@ -148,8 +194,10 @@ class LocalMarketService:
         bonuses = 5 if "급매" in property_data.get("features", "") else 0
         
         score, evidence = self.calculate_undervalue_score_precise(
-            ask_price_val, rt_median, rt_count, rt_iqr, bonuses, penalties
+            ask_price_val, rt_median, rt_count, rt_iqr, bonuses, penalties, decayed=decayed
         )
+        if stats:
+            evidence["rt_window_days"] = stats["window_days"]
         
         # --- UI-safe Normalization (v4.31) ---
         safe_score = int(round(float(score))) if score is not None else 0
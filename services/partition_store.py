@@ -0,0 +1,186 @@
+import os
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+
+# Try to import pyarrow, handle if missing (압축 보관 없이 전체를 SQLite에 유지)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 연도 파티션 (v5.1): 최근 HOT_DAYS가 걸친 연도부터는 SQLite(hot), 그 이전 연도는 연도별 Parquet(cold)
+# 통계 기간(최대 730일) + 이상치 판정 창(±183일)이 항상 hot 안에 들어오도록 3년
+HOT_DAYS = 1095
+COMPRESSION = "zstd"
+PARTITION_TABLES = {
+    # 테이블: 자연키 컬럼 수 (컬럼 목록 csv_processor.TX_COLUMNS / LEASE_COLUMNS의 앞쪽)
+    "transactions": 5,
+    "lease_transactions": 6,
+}
+FILE_PATTERN = re.compile(r"^(?P<table>\w+)_(?P<year>\d{4})\.g(?P<generation>\d+)\.parquet$")
+
+def table_columns(table) -> list:
+    from services.csv_processor import TX_COLUMNS, LEASE_COLUMNS
+    return TX_COLUMNS if table == "transactions" else LEASE_COLUMNS
+
+def hot_cutoff(today=None) -> str:
+    """이 날짜 이전 거래는 cold 파티션 대상 (연 단위로 잘라 'YYYY-01-01')"""
+    today = today or datetime.now().date()
+    return f"{(today - timedelta(days=HOT_DAYS)).year}-01-01"
+
+def partition_dir(db_path) -> Path:
+    """DB 파일 옆 partitions/<DB 이름>/ (MARKET_DB_PATH로 다른 DB를 쓰면 파티션도 분리)"""
+    return Path(db_path).parent / "partitions" / Path(db_path).stem
+
+def manifest(cursor, table, start=None, end=None) -> list:
+    """
+    이 스냅샷이 참조하는 cold 파일 중 [start, end] 기간과 겹치는 것만 (파티션 프루닝)
+    반환: [(year, file, rows, min_date, max_date)]
+    """
+    sql = "SELECT year, file, rows, min_date, max_date FROM partition_manifest WHERE table_name = ?"
+    params = [table]
+    if start:
+        sql += " AND max_date >= ?"
+        params.append(str(start)[:10])
+    if end:
+        sql += " AND min_date <= ?"
+        params.append(str(end)[:10])
+    try:
+        cursor.execute(sql + " ORDER BY year", params)
+    except Exception:
+        return []  # 마이그레이션 이전 DB
+    return cursor.fetchall()
+
+def read_cold(cursor, db_path, table, columns=None, start=None, end=None, complex_ids=None) -> pd.DataFrame:
+    """기간과 겹치는 연도 파일만 읽고, 파일 내부는 row group 통계로 거래일/단지 조건을 걸러 DataFrame 반환"""
+    columns = columns or table_columns(table)
+    files = manifest(cursor, table, start, end)
+    if not files or not HAS_PYARROW:
+        return pd.DataFrame(columns=columns)
+    filters = []
+    if start:
+        filters.append(("trade_date", ">=", str(start)[:10]))
+    if end:
+        filters.append(("trade_date", "<=", str(end)[:10]))
+    if complex_ids is not None:
+        filters.append(("complex_id", "in", list(complex_ids)))
+    base = partition_dir(db_path)
+    frames = [pq.read_table(base / f, columns=columns, filters=filters or None).to_pandas()
+              for _, f, _, _, _ in files]
+    return pd.concat(frames, ignore_index=True)
+
+def read_rows(cursor, db_path, table, columns=None, start=None, end=None, complex_ids=None) -> pd.DataFrame:
+    """hot(SQLite) + 기간이 겹치는 cold 파티션을 합쳐 반환. 기간이 hot 안이면 cold 파일을 열지 않음"""
+    columns = columns or table_columns(table)
+    where, params = [], []
+    if start:
+        where.append("trade_date >= ?")
+        params.append(str(start)[:10])
+    if end:
+        where.append("trade_date <= ?")
+        params.append(str(end)[:10])
+    if complex_ids is not None:
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS partition_ids (complex_id TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM partition_ids")
+        cursor.executemany("INSERT OR IGNORE INTO partition_ids VALUES (?)", [(c,) for c in complex_ids])
+        where.append("complex_id IN (SELECT complex_id FROM partition_ids)")
+    cursor.execute(f"SELECT {', '.join(columns)} FROM {table}" + (" WHERE " + " AND ".join(where) if where else ""),
+                   params)
+    hot = pd.DataFrame(cursor.fetchall(), columns=columns)
+    cold = read_cold(cursor, db_path, table, columns, start, end, complex_ids)
+    if cold.empty:
+        return hot
+    if hot.empty:
+        return cold
+    return pd.concat([cold, hot], ignore_index=True)
+
+def drop_cold_duplicates(cursor, db_path, table, frame, today=None) -> pd.DataFrame:
+    """
+    적재할 프레임에서 기준일 이전 행 중 cold 파티션에 자연키가 이미 있는 행을 제외
+    (hot 테이블의 자연키 유니크 인덱스는 Parquet로 옮겨진 거래를 보지 못해 재적재분이 새 거래로 들어감)
+    """
+    old = frame["trade_date"] < hot_cutoff(today)
+    if not old.any() or not HAS_PYARROW:
+        return frame
+    keys = table_columns(table)[:PARTITION_TABLES[table]]
+    past = frame.loc[old, keys]
+    cold = read_cold(cursor, db_path, table, keys, past["trade_date"].min(), past["trade_date"].max(),
+                     past["complex_id"].unique())
+    if cold.empty:
+        return frame
+
+    def _key_index(df):
+        # 양쪽 dtype(int/Int64/float/object)이 달라도 같은 값이면 같은 키가 되도록 숫자 컬럼은 float로 맞춤
+        return pd.MultiIndex.from_frame(df[keys].astype({c: "float64" for c in keys[2:]}))
+
+    dup = pd.Series(False, index=frame.index)
+    dup[old] = _key_index(past).isin(_key_index(cold))
+    return frame[~dup]
+
+def compact(conn, db_path, today=None) -> dict:
+    """
+    [write_snapshot 연결 전용] hot 테이블에서 기준일 이전 거래를 연도별 Parquet로 옮김
+    기존 연도 파일과 병합 후 자연키로 중복 제거, zstd 압축으로 새 세대 파일을 쓰고 manifest 갱신
+    (파일은 세대 번호가 붙은 새 이름이라 게시 전까지 기존 스냅샷의 조회에 영향 없음)
+    반환: {테이블: 이동한 행 수}
+    """
+    if not HAS_PYARROW:
+        return {}
+    cursor = conn.cursor()
+    cutoff = hot_cutoff(today)
+    generation = int(cursor.execute("SELECT value FROM snapshot_meta WHERE key = 'generation'").fetchone()[0]) + 1
+    base = partition_dir(db_path)
+    moved = {}
+    for table, key_len in PARTITION_TABLES.items():
+        columns = table_columns(table)
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE trade_date < ?", (cutoff,))
+        old = pd.DataFrame(cursor.fetchall(), columns=columns)
+        if old.empty:
+            continue
+        os.makedirs(base, exist_ok=True)
+        old["_year"] = old["trade_date"].str[:4].astype(int)
+        existing = {year: f for year, f, _, _, _ in manifest(cursor, table)}
+        for year, part in old.groupby("_year"):
+            part = part.drop(columns="_year")
+            if year in existing:
+                part = pd.concat([pq.read_table(base / existing[year]).to_pandas(), part], ignore_index=True)
+            # 단지 -> 거래일 순 정렬: row group min/max 통계로 단지/기간 조건 프루닝이 잘 걸리도록
+            part = (part.drop_duplicates(columns[:key_len], keep="last")
+                    .sort_values(["complex_id", "trade_date"], kind="stable").reset_index(drop=True))
+            name = f"{table}_{year}.g{generation}.parquet"
+            pq.write_table(pa.Table.from_pandas(part, preserve_index=False), base / name,
+                           compression=COMPRESSION, row_group_size=64_000)
+            cursor.execute("""
+                INSERT OR REPLACE INTO partition_manifest (table_name, year, file, rows, min_date, max_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (table, int(year), name, len(part), part["trade_date"].min(), part["trade_date"].max()))
+        cursor.execute(f"DELETE FROM {table} WHERE trade_date < ?", (cutoff,))
+        moved[table] = len(old)
+    conn.commit()
+    if moved:
+        # 옮긴 행의 빈 페이지를 반환해 게시 파일(및 다음 스냅샷 복사) 크기를 hot 데이터 수준으로 유지
+        conn.execute("VACUUM")
+    return moved
+
+def remove_stale_files(cursor, db_path, keep_generations=1) -> int:
+    """
+    게시된 manifest가 참조하지 않는 cold 파일 삭제 (직전 세대 파일은 읽는 중일 수 있어 keep_generations만큼 유지)
+    실패한 스테이징이 남긴 파일도 여기서 정리. 삭제한 파일 수 반환
+    """
+    base = partition_dir(db_path)
+    if not base.is_dir():
+        return 0
+    current = int(cursor.execute("SELECT value FROM snapshot_meta WHERE key = 'generation'").fetchone()[0])
+    cursor.execute("SELECT file FROM partition_manifest")
+    referenced = {r[0] for r in cursor.fetchall()}
+    removed = 0
+    for path in base.iterdir():
+        m = FILE_PATTERN.match(path.name)
+        if m and path.name not in referenced and int(m.group("generation")) <= current - keep_generations:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -0,0 +1,122 @@
+import math
+import struct
+import numpy as np
+
+# 병합 가능한 분위수 스케치 (v5.1): 로그 구간 히스토그램 (DDSketch 방식)
+# 값 v는 구간 k = ceil(log_γ v)에 세고, 구간 대표값 2γ^k/(γ+1)은 구간 안 어떤 값과도 상대 오차 α 이내
+RELATIVE_ACCURACY = 0.005  # α: 중위가 20억이면 ±1천만 이내
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+# 직렬화: 최소/최대(float64) + 구간 번호(int16, 1조원까지 여유) + 구간 건수(uint32)
+_HEADER = struct.Struct("<dd")
+
+def sketch_keys(values) -> np.ndarray:
+    """양수 값 -> 로그 구간 번호 (int32)"""
+    return np.ceil(np.log(np.asarray(values, dtype="float64")) / _LOG_GAMMA).astype("int32")
+
+class QuantileSketch:
+    """
+    구간 건수를 더하기만 하면 병합되는 분위수 스케치.
+    월 스케치를 합쳐 임의 기간의 분위수를 계산하고, 새 거래는 과거 거래를 다시 읽지 않고 add로 반영.
+    분위수는 pandas quantile 기본값(선형 보간)과 같은 순위 정의로, 참값 대비 상대 오차 RELATIVE_ACCURACY 이내
+    """
+    __slots__ = ("keys", "counts", "min", "max")
+
+    def __init__(self, keys=None, counts=None, min_value=math.inf, max_value=-math.inf):
+        self.keys = np.empty(0, "int32") if keys is None else keys        # 정렬된 구간 번호
+        self.counts = np.empty(0, "int64") if counts is None else counts  # 구간별 건수
+        self.min = min_value
+        self.max = max_value
+
+    @classmethod
+    def from_values(cls, values) -> "QuantileSketch":
+        values = np.asarray(values, dtype="float64")
+        values = values[values > 0]
+        if not len(values):
+            return cls()
+        keys, counts = np.unique(sketch_keys(values), return_counts=True)
+        return cls(keys.astype("int32"), counts.astype("int64"), float(values.min()), float(values.max()))
+
+    @classmethod
+    def merge_all(cls, sketches) -> "QuantileSketch":
+        sketches = [s for s in sketches if s is not None and len(s.keys)]
+        if not sketches:
+            return cls()
+        if len(sketches) == 1:
+            s = sketches[0]
+            return cls(s.keys, s.counts, s.min, s.max)
+        keys, inverse = np.unique(np.concatenate([s.keys for s in sketches]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([s.counts for s in sketches]))
+        return cls(keys.astype("int32"), counts.astype("int64"),
+                   min(s.min for s in sketches), max(s.max for s in sketches))
+
+    def merge(self, other) -> "QuantileSketch":
+        merged = QuantileSketch.merge_all([self, other])
+        self.keys, self.counts, self.min, self.max = merged.keys, merged.counts, merged.min, merged.max
+        return self
+
+    def add(self, values) -> "QuantileSketch":
+        return self.merge(QuantileSketch.from_values(values))
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def quantiles(self, qs) -> list:
+        """선형 보간 분위수 목록 (비어 있으면 None). 양 끝 순위는 실제 최소/최대로 제한해 0/1 분위수는 정확"""
+        n = self.count
+        if n == 0:
+            return [None] * len(qs)
+        cum = np.cumsum(self.counts)
+
+        def value(rank):
+            k = self.keys[int(np.searchsorted(cum, rank, side="right"))]
+            return min(max(2 * GAMMA ** float(k) / (GAMMA + 1), self.min), self.max)
+
+        out = []
+        for q in qs:
+            h = (n - 1) * q
+            lo = int(h)
+            v_lo = value(lo)
+            out.append(v_lo + (h - lo) * (value(min(lo + 1, n - 1)) - v_lo))
+        return out
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def to_bytes(self) -> bytes:
+        return (_HEADER.pack(self.min, self.max) + self.keys.astype("<i2").tobytes()
+                + self.counts.astype("<u4").tobytes())
+
+    @classmethod
+    def from_bytes(cls, blob) -> "QuantileSketch":
+        if not blob:
+            return cls()
+        lo, hi = _HEADER.unpack_from(blob)
+        n = (len(blob) - _HEADER.size) // 6
+        keys = np.frombuffer(blob, "<i2", n, _HEADER.size).astype("int32")
+        counts = np.frombuffer(blob, "<u4", n, _HEADER.size + 2 * n).astype("int64")
+        return cls(keys, counts, lo, hi)
+
+def group_sketches(groups, values, n_groups) -> list:
+    """
+    그룹 번호(0..n_groups-1) 배열과 값 배열 -> 그룹별 직렬화 스케치 목록 (정렬 1회로 일괄 생성)
+    monthly_stats 재빌드처럼 그룹이 수십만 개일 때 그룹마다 np.unique를 부르지 않기 위한 경로.
+    모든 그룹에 양수 값이 하나 이상 있어야 함
+    """
+    groups = np.asarray(groups, dtype="int64")
+    values = np.asarray(values, dtype="float64")
+    keys = sketch_keys(values)
+    order = np.lexsort((keys, groups))
+    groups, keys, values = groups[order], keys[order], values[order]
+    # (그룹, 구간) 경계마다 구간 하나
+    starts = np.flatnonzero(np.r_[True, (groups[1:] != groups[:-1]) | (keys[1:] != keys[:-1])])
+    bin_group = groups[starts]
+    bin_counts = np.diff(np.r_[starts, len(groups)]).astype("<u4").tobytes()
+    bin_keys = keys[starts].astype("<i2").tobytes()
+    bin_bounds = np.searchsorted(bin_group, np.arange(n_groups + 1))
+    row_bounds = np.searchsorted(groups, np.arange(n_groups + 1))
+    mins = np.minimum.reduceat(values, row_bounds[:-1])
+    maxs = np.maximum.reduceat(values, row_bounds[:-1])
+    return [_HEADER.pack(lo_v, hi_v) + bin_keys[2 * a:2 * b] + bin_counts[4 * a:4 * b]
+            for lo_v, hi_v, a, b in zip(mins.tolist(), maxs.tolist(), bin_bounds[:-1].tolist(), bin_bounds[1:].tolist())]
@@ -1,35 +1,282 @@
 import json
 import os
-import pandas as pd
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data"
+# 단지 통계 조회 백엔드: memory(인메모리 비교사례 배열, 적재 전에는 rt_stats) / sqlite(rt_stats만)
+STATS_BACKEND = os.environ.get("MOLIT_STATS_BACKEND", "memory")
+# 단지 통계 조회 캐시: 스냅샷 세대가 바뀌면 전체 무효화, TTL은 날짜 경과(기간 창 이동) 대비 안전장치
+STATS_CACHE_SIZE = 4096
+STATS_CACHE_TTL_SEC = 3600
+
+class GenerationCache:
+    """
+    스냅샷 세대 번호로 무효화되는 LRU + TTL 캐시 (스레드 안전)
+    None 결과도 저장하여 통계가 없는 단지도 반복 조회하지 않음
+    """
+    _MISSING = object()
+
+    def __init__(self, maxsize=STATS_CACHE_SIZE, ttl=STATS_CACHE_TTL_SEC):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._generation = None
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def get(self, key, generation):
+        """캐시 값 반환, 없으면 GenerationCache._MISSING"""
+        with self._lock:
+            if generation != self._generation:
+                if self._data:
+                    self.counters["invalidations"] += 1
+                self._data.clear()
+                self._generation = generation
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return entry[1]
+                del self._data[key]
+                self.counters["expired"] += 1
+            self.counters["misses"] += 1
+            return self._MISSING
+
+    def put(self, key, value, generation):
+        with self._lock:
+            if generation != self._generation:
+                return  # 계산하는 사이 새 스냅샷이 게시됨: 이전 세대 결과는 저장하지 않음
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self.counters, size=len(self._data), maxsize=self.maxsize, generation=self._generation)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 3) if lookups else None
+        return out
 
 class StatisticsService:
     def __init__(self):
         from services.db_svc import db_svc
         self.db_svc = db_svc
+        self.cache = GenerationCache()
+
+    def _resolve_complex_id(self, cursor, complex_name, dong=None):
+        """
+        단지명(+법정동) -> (complex_id,) 행. 별칭은 complex_registry와 같이 (법정동, 별칭) 단위라
+        동이 주어지면 그 동의 별칭만 봄 (다른 동의 동명 단지로 해석되지 않도록). 동이 없으면 원본명 일치, 동 이름 순
+        """
+        from services.complex_registry import canonical_name
+        sql = "SELECT complex_id FROM complex_alias WHERE alias IN (?, ?)"
+        params = [complex_name, canonical_name(complex_name)]
+        if dong:
+            sql += " AND dong = ?"
+            params.append(dong)
+        cursor.execute(sql + " ORDER BY alias <> ?, dong LIMIT 1", params + [complex_name])
+        row = cursor.fetchone()
+        if not row:
+            row = self._search_complex_id(cursor, complex_name, dong)
+        return row
+
+    def _search_complex_id(self, cursor, complex_name, dong=None):
+        """단지명 부분 일치 (FTS5 trigram 색인, 가장 짧은 별칭 우선). 3자 미만이거나 FTS 미지원이면 LIKE. 동이 주어지면 그 동 단지만"""
+        from services.complex_registry import canonical_name
+        in_dong, dong_params = "", []
+        if dong:
+            in_dong, dong_params = "AND complex_id IN (SELECT complex_id FROM complex_master WHERE dong = ?)", [dong]
+        terms = [t for t in dict.fromkeys([complex_name.strip(), canonical_name(complex_name)]) if t]
+        if terms and all(len(t) >= 3 for t in terms):
+            query = " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
+            try:
+                cursor.execute(f"""
+                    SELECT complex_id FROM complex_alias_fts WHERE complex_alias_fts MATCH ? {in_dong}
+                    ORDER BY length(alias) LIMIT 1
+                """, [query] + dong_params)
+                return cursor.fetchone()
+            except sqlite3.OperationalError:
+                pass
+        cursor.execute(f"SELECT complex_id FROM complex_master WHERE complex_name LIKE ? {in_dong}",
+                       [f"%{complex_name}%"] + dong_params)
+        return cursor.fetchone()
+
+    def get_complex_stats(self, complex_name: str, area_bucket: float = None, window_days: int = 730):
+        """SQLite DB에서 특정 단지의 실거래 통계(중위값, 건수 등)를 직접 조회 (window_days: 90/180/365/730)"""
+        key = (complex_name, int(round(area_bucket)) if area_bucket else None, window_days)
+        generation = self.db_svc.generation()
+        stats = self.cache.get(key, generation)
+        if stats is GenerationCache._MISSING:
+            stats = self._get_complex_stats_uncached(complex_name, area_bucket, window_days)
+            self.cache.put(key, stats, generation)
+        # 호출 측에서 dict를 수정해도 캐시 값이 바뀌지 않도록 사본 반환
+        return dict(stats) if stats is not None else None
+
+    def cache_stats(self) -> dict:
+        """get_complex_stats 캐시 카운터 (hits/misses/evictions/expired/invalidations/hit_rate)"""
+        return self.cache.stats()
+
+    def get_complex_stats_many(self, keys) -> dict:
+        """
+        (complex_name, area_bucket, window_days) 키 목록의 통계를 한 번에 조회 (v5.1)
+        캐시에 없는 키만 모아 단지명은 별칭 IN 조회 1회로 해석하고, 통계는 인메모리 배열 또는
+        rt_stats 키 목록 조인 1회로 가져옴. 반환: {키: get_complex_stats 결과}
+        """
+        generation = self.db_svc.generation()
+        results, misses = {}, []
+        for key in dict.fromkeys(keys):
+            name, area_bucket, window_days = key
+            cache_key = (name, int(round(area_bucket)) if area_bucket else None, window_days)
+            stats = self.cache.get(cache_key, generation)
+            if stats is GenerationCache._MISSING:
+                misses.append((key, cache_key))
+            else:
+                results[key] = stats
+        if misses:
+            fetched = self._fetch_stats_many([k for k, _ in misses])
+            for key, cache_key in misses:
+                results[key] = fetched.get(key)
+                self.cache.put(cache_key, results[key], generation)
+        return {key: dict(v) if v is not None else None for key, v in results.items()}
+
+    def _resolve_complex_ids(self, cursor, names, store=None, dong=None) -> dict:
+        """
+        단지명 목록 -> {단지명: complex_id 또는 None} (인메모리 별칭 또는 별칭 IN 조회 1회, 정확 일치가 없을 때만 부분 일치 검색)
+        dong이 주어지면 _resolve_complex_id와 같이 그 동의 별칭만 봄 (인메모리 별칭은 동 구분이 없어 사용하지 않음)
+        """
+        from services.complex_registry import canonical_name
+        names = list(dict.fromkeys(names))
+        if store is not None and not dong:
+            ids = {n: store.resolve(n) for n in names}
+        else:
+            forms = {n: (n, canonical_name(n)) for n in names}
+            aliases = list(dict.fromkeys(a for pair in forms.values() for a in pair))
+            sql = f"SELECT alias, complex_id FROM complex_alias WHERE alias IN ({','.join('?' * len(aliases))})"
+            if dong:
+                sql += " AND dong = ?"
+            cursor.execute(sql + " ORDER BY dong", aliases + ([dong] if dong else []))
+            found = {}
+            for alias, c_id in cursor.fetchall():
+                found.setdefault(alias, c_id)
+            ids = {n: found.get(raw) or found.get(canon) for n, (raw, canon) in forms.items()}
+        for n in names:
+            if ids[n] is None:
+                row = self._search_complex_id(cursor, n, dong)
+                ids[n] = row[0] if row else None
+        return ids
+
+    def _fetch_stats_many(self, keys) -> dict:
+        store = None
+        if STATS_BACKEND == "memory":
+            from services.comps_store import comps_store
+            store = comps_store if comps_store.ready() else None
 
-    def get_complex_stats(self, complex_name: str, area_bucket: float = None):
-        """SQLite DB에서 특정 단지의 실거래 통계(중위값, 건수 등)를 직접 조회"""
+        conn = self.db_svc.get_connection()
+        try:
+            cursor = conn.cursor()
+            # 1. 단지명 -> complex_id
+            ids = self._resolve_complex_ids(cursor, [k[0] for k in keys], store)
+
+            # 2. 통계
+            resolved = [(k, ids[k[0]]) for k in keys if ids[k[0]] is not None]
+            if store is not None:
+                return {k: store.window_stats(c_id, k[1] or 84, k[2]) for k, c_id in resolved}
+            wanted = {}  # (complex_id, area_bucket, window_days) -> 요청 키 목록 (별칭이 달라도 같은 단지일 수 있음)
+            for k, c_id in resolved:
+                wanted.setdefault((c_id, f"{int(round(k[1]))}±2" if k[1] else "84±2", k[2]), []).append(k)
+            if not wanted:
+                return {}
+            # 키 목록을 바깥 루프로 고정 (CROSS JOIN): 행 값 IN (VALUES ...)은 목록이 길면 rt_stats 전체 스캔으로 계획됨
+            cursor.execute(f"""
+                WITH k(complex_id, area_bucket, window_days) AS (VALUES {",".join(["(?, ?, ?)"] * len(wanted))})
+                SELECT s.complex_id, s.area_bucket, s.window_days, s.median_won, s.count, s.iqr_won, s.mean_ppp, s.min_won, s.max_won
+                FROM k CROSS JOIN rt_stats s
+                  ON s.complex_id = k.complex_id AND s.area_bucket = k.area_bucket AND s.window_days = k.window_days
+            """, [v for triple in wanted for v in triple])
+            return {k: self._stats_dict(rest, w)
+                    for c_id, bucket, w, *rest in cursor.fetchall() for k in wanted[(c_id, bucket, w)]}
+        finally:
+            conn.close()
+
+    def get_decayed_level(self, complex_name: str, area_bucket: float = None, today=None):
+        """
+        단지·면적의 시간 감쇠 가격 수준 (v5.1, decay_stats).
+        반환: {"level", "mean", "iqr", "ess", "count", "half_life_days"} / 상태가 없으면 None
+        """
+        return self.get_decayed_levels_many([(complex_name, area_bucket)], today).get((complex_name, area_bucket))
+
+    def get_decayed_levels_many(self, keys, today=None) -> dict:
+        """
+        (complex_name, area_bucket) 키 목록의 시간 감쇠 가격 수준을 한 번에 조회 (v5.1)
+        상태(DecayedLevel)를 세대 캐시에 두고, 유효 표본 수는 조회 시점(today) 기준으로 매번 계산.
+        반환: {키: get_decayed_level 결과}
+        """
+        from services.decay_stats import HALF_LIFE_DAYS, DecayedLevel
+        generation = self.db_svc.generation()
+        states, misses = {}, []
+        for key in dict.fromkeys(keys):
+            name, area_bucket = key
+            cache_key = ("decay", name, int(round(area_bucket)) if area_bucket else None, HALF_LIFE_DAYS)
+            state = self.cache.get(cache_key, generation)
+            if state is GenerationCache._MISSING:
+                misses.append((key, cache_key))
+            else:
+                states[key] = state
+        if misses:
+            conn = self.db_svc.get_connection()
+            try:
+                cursor = conn.cursor()
+                ids = self._resolve_complex_ids(cursor, [k[0] for k, _ in misses])
+                wanted = {}  # (complex_id, area_bucket) -> 요청 키 목록
+                for key, _ in misses:
+                    if ids[key[0]] is not None:
+                        wanted.setdefault((ids[key[0]], f"{int(round(key[1]))}±2" if key[1] else "84±2"), []).append(key)
+                fetched = {}
+                if wanted:
+                    # get_complex_stats_many와 같은 이유로 키 목록을 바깥 루프로 고정
+                    cursor.execute(f"""
+                        WITH k(complex_id, area_bucket) AS (VALUES {",".join(["(?, ?)"] * len(wanted))})
+                        SELECT s.complex_id, s.area_bucket, s.state
+                        FROM k CROSS JOIN decay_stats s
+                          ON s.complex_id = k.complex_id AND s.area_bucket = k.area_bucket AND s.half_life_days = ?
+                    """, [v for pair in wanted for v in pair] + [HALF_LIFE_DAYS])
+                    for c_id, bucket, blob in cursor.fetchall():
+                        state = DecayedLevel.from_bytes(blob, HALF_LIFE_DAYS)
+                        fetched.update((k, state) for k in wanted[(c_id, bucket)])
+            finally:
+                conn.close()
+            for key, cache_key in misses:
+                states[key] = fetched.get(key)
+                self.cache.put(cache_key, states[key], generation)
+        return {key: state.summary(today) if state is not None else None for key, state in states.items()}
+
+    def _get_complex_stats_uncached(self, complex_name, area_bucket=None, window_days=730):
+        if STATS_BACKEND == "memory":
+            from services.comps_store import comps_store
+            if comps_store.ready():
+                return self._get_complex_stats_memory(comps_store, complex_name, area_bucket, window_days)
         conn = self.db_svc.get_connection()
         try:
             cursor = conn.cursor()
             try:
-                # 1. 먼저 Complex ID 찾기 (complex_name 기준)
-                cursor.execute("SELECT complex_id FROM complex_master WHERE complex_name LIKE ?", (f"%{complex_name}%",))
-                row = cursor.fetchone()
+                # 1. 먼저 Complex ID 찾기 (별칭 정확 일치 -> complex_name 부분 일치)
+                row = self._resolve_complex_id(cursor, complex_name)
                 
             except sqlite3.OperationalError as e:
                 if "no such table" in str(e).lower():
                     # 테이블이 없으면 DB 초기화 재시도
                     from services.db_svc import db_svc
                     db_svc._init_db()
-                    cursor.execute("SELECT complex_id FROM complex_master WHERE complex_name LIKE ?", (f"%{complex_name}%",))
-                    row = cursor.fetchone()
+                    row = self._resolve_complex_id(cursor, complex_name)
                 else:
                     raise e
             if not row:
@@ -39,39 +286,186 @@ class StatisticsService:
             bucket_str = f"{int(round(area_bucket))}±2" if area_bucket else "84±2"
             
             cursor.execute("""
-                SELECT median_won, count, iqr_won FROM rt_stats 
-                WHERE complex_id = ? AND area_bucket = ?
-            """, (c_id, bucket_str))
+                SELECT median_won, count, iqr_won, mean_ppp, min_won, max_won FROM rt_stats 
+                WHERE complex_id = ? AND area_bucket = ? AND window_days = ?
+            """, (c_id, bucket_str, window_days))
             
             stat_row = cursor.fetchone()
-            if stat_row:
-                med, cnt, iqr = stat_row
-                return {
-                    "median": float(med),
-                    "count": int(cnt),
-                    "iqr": float(iqr)
-                }
+            return self._stats_dict(stat_row, window_days) if stat_row else None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _stats_dict(stat_row, window_days):
+        med, cnt, iqr, ppp, lo, hi = stat_row
+        return {
+            "median": float(med),
+            "count": int(cnt),
+            "iqr": float(iqr),
+            "mean_ppp": float(ppp) if ppp is not None else None,
+            "min": float(lo) if lo is not None else None,
+            "max": float(hi) if hi is not None else None,
+            "window_days": window_days
+        }
+
+    def _get_complex_stats_memory(self, store, complex_name, area_bucket, window_days):
+        """인메모리 배열에서 오늘 기준 창으로 통계 계산 (별칭 정확 일치가 없을 때만 DB 검색)"""
+        c_id = store.resolve(complex_name)
+        if c_id is None:
+            conn = self.db_svc.get_connection()
+            try:
+                row = self._search_complex_id(conn.cursor(), complex_name)
+            finally:
+                conn.close()
+            if not row:
+                return None
+            c_id = row[0]
+        return store.window_stats(c_id, area_bucket or 84, window_days)
+
+    def get_lease_ratios(self, complex_name: str, area_bucket: float = None):
+        """lease_stats에서 단지의 실거래 전세가율/전월세 전환율 조회 (면적 미지정 시 단지 전체 'ALL')"""
+        conn = self.db_svc.get_connection()
+        try:
+            cursor = conn.cursor()
+            row = self._resolve_complex_id(cursor, complex_name)
+            if not row:
+                return None
+            bucket_str = f"{int(round(area_bucket))}±2" if area_bucket else "ALL"
+            cursor.execute("""
+                SELECT jeonse_ratio, conversion_rate, jeonse_count, wolse_count, sale_count
+                FROM lease_stats WHERE complex_id = ? AND area_bucket = ?
+            """, (row[0], bucket_str))
+            stat_row = cursor.fetchone()
+            if not stat_row:
+                return None
+            ratio, conv, j_cnt, w_cnt, s_cnt = stat_row
+            return {
+                "jeonse_ratio": float(ratio) if ratio is not None else None,
+                "conversion_rate": float(conv) if conv is not None else None,
+                "jeonse_count": int(j_cnt),
+                "wolse_count": int(w_cnt),
+                "sale_count": int(s_cnt)
+            }
+        except sqlite3.OperationalError:
             return None
         finally:
             conn.close()
 
-    def get_market_trends(self):
-        """전체 매매 시장 트렌드 (SQLite 기반)"""
+    def _monthly_filter(self, cursor, complex_name=None, dong=None, area_min=None, area_max=None, start=None, end=None):
+        """
+        monthly_stats WHERE 절과 파라미터. 면적 조건이 없으면 필터에 맞는 가장 좁은 'ALL' 집계 행(단지 > 동 > 전체)을,
+        있으면 면적 버킷(반올림 ㎡) 칸들을 고름. 기간은 월 단위
+        """
+        from services.csv_processor import MONTHLY_ALL
+        clauses, params = [], []
+        if complex_name:
+            row = self._resolve_complex_id(cursor, complex_name, dong)
+            c_id = row[0] if row else None
+            # 동을 함께 걸어 기본키(dong, complex_id, ...)로 탐색
+            clauses.append("dong = (SELECT COALESCE(dong, '') FROM complex_master WHERE complex_id = ?) AND complex_id = ?")
+            params += [c_id, c_id]
+        if dong:
+            clauses.append("dong = ?")
+            params.append(dong)
+        if area_min is None and area_max is None:
+            clauses.append("area_bucket = ?")
+            params.append(MONTHLY_ALL)
+            if not complex_name:
+                clauses.append("complex_id = ?")
+                params.append(MONTHLY_ALL)
+                if not dong:
+                    clauses.append("dong = ?")
+                    params.append(MONTHLY_ALL)
+        else:
+            clauses.append("area_bucket <> ?")
+            params.append(MONTHLY_ALL)
+            if area_min is not None:
+                clauses.append("CAST(area_bucket AS INTEGER) >= ?")
+                params.append(float(area_min))
+            if area_max is not None:
+                clauses.append("CAST(area_bucket AS INTEGER) <= ?")
+                params.append(float(area_max))
+        if start:
+            clauses.append("month >= ?")
+            params.append(str(start)[:7])
+        if end:
+            clauses.append("month <= ?")
+            params.append(str(end)[:7])
+        return " WHERE " + " AND ".join(clauses), params
+
+    def get_market_trends(self, complex_name=None, dong=None, area_min=None, area_max=None, start=None, end=None):
+        """
+        매매 시장 월별 트렌드 (date, mean, median, count, mean_ppp)
+        적재 시 증분 갱신되는 monthly_stats에서 조회 (v5.1). 면적 조건이 없으면 'ALL' 집계 행을 그대로 쓰고 (정확한 중위가),
+        면적 조건이 있으면 달마다 해당 칸들의 분위수 스케치를 병합 (중위가 상대 오차 quantile_sketch.RELATIVE_ACCURACY 이내)
+        원본 거래 기준의 정확한 집계는 analytics_svc.trends 사용
+        """
+        import pandas as pd
+        from services.quantile_sketch import QuantileSketch
+        conn = self.db_svc.get_connection()
+        try:
+            cursor = conn.cursor()
+            where, params = self._monthly_filter(cursor, complex_name, dong, area_min, area_max, start, end)
+            merge = area_min is not None or area_max is not None
+            cursor.execute(f"SELECT month, median_won, mean_won, count, mean_ppp{', sketch' if merge else ''} "
+                           f"FROM monthly_stats{where} ORDER BY month", params)
+            cells = pd.DataFrame(cursor.fetchall(),
+                                 columns=["month", "median_won", "mean_won", "count", "mean_ppp"] + (["sketch"] if merge else []))
+        finally:
+            conn.close()
+
+        if cells.empty:
+            return pd.DataFrame({"date": pd.to_datetime(pd.Series([], dtype=str)), "mean": [], "median": [],
+                                 "count": pd.Series([], dtype="int64"), "mean_ppp": []})
+        if cells["month"].is_unique:
+            # 상위 집계 행 또는 달마다 칸이 하나: 합산 없이 그대로 사용
+            df = cells.rename(columns={"month": "date", "median_won": "median", "mean_won": "mean"})
+            df["median"] = df["median"].astype(float)
+            df["mean_ppp"] = df["mean_ppp"].round(1)
+        else:
+            cells["sum_won"] = cells["mean_won"] * cells["count"]
+            cells["sum_ppp"] = cells["mean_ppp"] * cells["count"]
+            g = cells.groupby("month", sort=True)
+            df = g[["count", "sum_won", "sum_ppp"]].sum()
+            df["median"] = g["sketch"].agg(
+                lambda blobs: QuantileSketch.merge_all(map(QuantileSketch.from_bytes, blobs)).quantile(0.5))
+            df["mean"] = df["sum_won"] / df["count"]
+            df["mean_ppp"] = (df["sum_ppp"] / df["count"]).round(1)
+            df = df.reset_index().rename(columns={"month": "date"})
+        df["date"] = pd.to_datetime(df["date"])
+        df["count"] = df["count"].astype("int64")
+        return df[["date", "mean", "median", "count", "mean_ppp"]]
+
+    def get_period_quantiles(self, complex_name=None, dong=None, area_min=None, area_max=None, start=None, end=None,
+                             q=(0.25, 0.5, 0.75)):
+        """
+        임의 기간(월 단위)의 매매가 분위수 (v5.1). 필터는 get_market_trends와 같고,
+        해당 달/칸의 분위수 스케치를 병합해 원본 거래를 다시 읽지 않고 계산 (상대 오차 RELATIVE_ACCURACY 이내)
+        반환: {"count", "mean", "median", "iqr", "quantiles": {q: 값}, "min", "max"} / 거래가 없으면 None
+        """
+        from services.quantile_sketch import QuantileSketch
         conn = self.db_svc.get_connection()
-        # 월별 평균가 및 거래량 집계
-        query = """
-            SELECT strftime('%Y-%m', trade_date) as date,
-                   AVG(price_won) as mean,
-                   COUNT(*) as count
-            FROM transactions
-            GROUP BY date
-            ORDER BY date ASC
-        """
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        
-        if not df.empty:
-            df['date'] = pd.to_datetime(df['date'])
-        return df
+        try:
+            cursor = conn.cursor()
+            where, params = self._monthly_filter(cursor, complex_name, dong, area_min, area_max, start, end)
+            cursor.execute(f"SELECT mean_won, count, sketch FROM monthly_stats{where}", params)
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        sketch = QuantileSketch.merge_all(QuantileSketch.from_bytes(blob) for _, _, blob in rows)
+        if sketch.count == 0:
+            return None
+        count = sum(n for _, n, _ in rows)
+        q1, med, q3, *values = sketch.quantiles((0.25, 0.5, 0.75) + tuple(q))
+        return {
+            "count": count,
+            "mean": sum(mean * n for mean, n, _ in rows) / count,
+            "median": med,
+            # 표본 4건 미만은 IQR 신뢰 불가 -> 0 (rt_stats와 동일)
+            "iqr": q3 - q1 if count >= 4 else 0.0,
+            "quantiles": dict(zip(q, values)),
+            "min": sketch.min,
+            "max": sketch.max,
+        }
 
 stats_svc = StatisticsService()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import pandas as pd
+from openpyxl import load_workbook
+
+# 헤더 탐색 범위 (국토부 엑셀은 상단 10여 줄이 검색조건 안내문)
+MAX_HEADER_SCAN = 30
+
+def _is_header(row, keywords, min_cells) -> bool:
+    cells = [str(c) for c in row if c is not None and str(c).strip()]
+    if len(cells) < min_cells:
+        return False
+    if not keywords:
+        return True
+    line = " ".join(cells)
+    return any(k in line for k in keywords)
+
+def _header_names(row) -> list[str]:
+    return [str(c).strip() if c is not None else f"Unnamed:{i}" for i, c in enumerate(row)]
+
+def iter_xlsx_frames(path, chunksize: int = 50_000, keywords=None, min_cells: int = 6, sheet_index: int = 0):
+    """
+    openpyxl read_only 스트리밍으로 첫 시트를 한 번만 순회하며
+    헤더 행을 찾고(keywords 포함 + 셀 min_cells개 이상) 이후 데이터 행을 chunksize 단위 DataFrame으로 반환
+    """
+    wb = load_workbook(str(path), read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_index]
+        # 일부 내보내기 파일은 dimension 정보가 틀려 행이 잘리므로 재계산
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+
+        header = None
+        for i, row in enumerate(rows):
+            if i >= MAX_HEADER_SCAN:
+                break
+            if _is_header(row, keywords, min_cells):
+                header = _header_names(row)
+                break
+        if header is None:
+            return
+
+        width = len(header)
+        buf = []
+        for row in rows:
+            if not any(c is not None for c in row):
+                continue
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            buf.append(row)
+            if len(buf) >= chunksize:
+                yield pd.DataFrame(buf, columns=header)
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=header)
+    finally:
+        wb.close()
+
+def read_xlsx(path, keywords=None, min_cells: int = 1) -> pd.DataFrame:
+    """엑셀 첫 시트를 단일 패스로 읽어 DataFrame 반환 (헤더 행 자동 탐색)"""
+    frames = list(iter_xlsx_frames(path, chunksize=1_000_000, keywords=keywords, min_cells=min_cells))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)